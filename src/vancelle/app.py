@@ -7,16 +7,18 @@ import frozendict
 import svcs.flask
 
 from vancelle.blueprints.board import bp as bp_board
+from .blueprints.cache import bp as bp_cache
 from .blueprints.data import bp as bp_data
 from .blueprints.entry import bp as bp_entry
 from .blueprints.errors import bp as bp_errors
 from .blueprints.health import bp as bp_health
 from .blueprints.home import bp as bp_home
+from .blueprints.job import bp as bp_job
 from .blueprints.record import bp as bp_record
 from .blueprints.source import bp as bp_source
 from .blueprints.user import bp as bp_user
 from .blueprints.work import bp as bp_works
-from .clients.client import HttpClientBuilder
+from .clients.client import HttpClientBuilder, HttpClientPool
 from .clients.goodreads.http import GoodreadsPublicScraper
 from .clients.images.client import ImageCache
 from .clients.openlibrary.client import OpenLibraryAPI
@@ -24,8 +26,10 @@ from .clients.royalroad.client import RoyalRoadScraper
 from .clients.steam.client_store_api import SteamStoreAPI
 from .clients.steam.client_web_api import SteamWebAPI
 from .clients.tmdb.client import TmdbAPI
+from .controllers.cache import ResultCache
 from .ext.structlog import configure_logging
 from .extensions import alembic, cors, db, htmx, login_manager, sentry
+from .shelf import Shelf
 
 root = pathlib.Path(__file__).parent
 
@@ -49,6 +53,10 @@ def create_app(config: typing.Mapping[str, typing.Any] = frozendict.frozendict()
     app.config["SQLALCHEMY_RECORD_QUERIES"] = True
     app.config["TEMPLATES_AUTO_RELOAD"] = True
     app.config["REMEMBER_COOKIE_SAMESITE"] = "Lax"
+    app.config["RESULT_CACHE_SIZE"] = 256
+    app.config["SOURCE_SEARCH_TIMEOUT"] = 10.0
+    app.config["SOURCE_REFRESH_CONCURRENCY"] = 4
+    app.config["RELEASE_WATCH_SHELF"] = Shelf.UNSORTED
     app.config.from_mapping(config)
     app.config.from_prefixed_env("VANCELLE")
 
@@ -57,7 +65,9 @@ def create_app(config: typing.Mapping[str, typing.Any] = frozendict.frozendict()
 
     svcs.flask.init_app(app)
     svcs.flask.register_value(app, flask.Flask, app)
-    svcs.flask.register_factory(app, HttpClientBuilder, HttpClientBuilder.factory)
+    svcs.flask.register_value(app, ResultCache, ResultCache(maxsize=app.config["RESULT_CACHE_SIZE"]))
+    http_client_pool = HttpClientPool(HttpClientBuilder.from_app(app), app.config)
+    svcs.flask.register_value(app, HttpClientPool, http_client_pool, on_registry_close=http_client_pool.close)
     svcs.flask.register_factory(app, GoodreadsPublicScraper, GoodreadsPublicScraper.factory)
     svcs.flask.register_factory(app, ImageCache, ImageCache.factory)
     svcs.flask.register_factory(app, OpenLibraryAPI, OpenLibraryAPI.factory)
@@ -74,9 +84,11 @@ def create_app(config: typing.Mapping[str, typing.Any] = frozendict.frozendict()
     sentry.init_app(app)
 
     app.register_blueprint(bp_board)
+    app.register_blueprint(bp_cache)
     app.register_blueprint(bp_errors)
     app.register_blueprint(bp_health)
     app.register_blueprint(bp_home)
+    app.register_blueprint(bp_job)
     app.register_blueprint(bp_data)
     app.register_blueprint(bp_user)
 
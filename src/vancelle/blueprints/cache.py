@@ -0,0 +1,79 @@
+import click
+import flask
+import humanize
+import structlog
+import svcs
+
+from vancelle.clients.client import HttpClientPool
+from vancelle.clients.goodreads.http import GoodreadsPublicScraper
+from vancelle.clients.images.client import ImageCache
+from vancelle.clients.openlibrary.client import OpenLibraryAPI
+from vancelle.clients.royalroad.client import RoyalRoadScraper
+from vancelle.clients.steam.client_store_api import SteamStoreAPI
+from vancelle.clients.steam.client_web_api import SteamWebAPI
+from vancelle.clients.storage import ClientCache
+from vancelle.clients.tmdb.client import TmdbAPI
+
+logger = structlog.get_logger(logger_name=__name__)
+
+CACHED_CLIENTS = (
+    GoodreadsPublicScraper,
+    ImageCache,
+    OpenLibraryAPI,
+    RoyalRoadScraper,
+    SteamStoreAPI,
+    SteamWebAPI,
+    TmdbAPI,
+)
+
+bp = flask.Blueprint("cache", __name__)
+bp.cli.short_help = "Maintain the HTTP cache."
+
+
+def client_caches(names: tuple[str, ...]) -> list[ClientCache]:
+    builder = svcs.flask.get(HttpClientPool).builder
+    caches = [builder.cache_for(cls) for cls in CACHED_CLIENTS]
+
+    if unknown := set(names) - {cache.name for cache in caches}:
+        raise click.BadParameter(f"Unknown clients: {', '.join(sorted(unknown))}", param_hint="CLIENTS")
+
+    builder.cache_usage.flush()
+    return [cache for cache in caches if not names or cache.name in names]
+
+
+@bp.cli.command("stats")
+@click.argument("clients", nargs=-1)
+def cli_stats(clients: tuple[str, ...]) -> None:
+    """Show the entries, size and hit ratio of each client's cache."""
+    click.echo(f"{'Client':<24} {'Entries':>8} {'Size':>10} {'Budget':>10} {'Hits':>8} {'Misses':>8} {'Hit ratio':>10}")
+    for cache in client_caches(clients):
+        stats = cache.stats()
+        ratio = f"{stats.hit_ratio:.1%}" if stats.hit_ratio is not None else "-"
+        click.echo(
+            f"{stats.name:<24} {stats.entries:>8} {humanize.naturalsize(stats.bytes, binary=True):>10} "
+            f"{humanize.naturalsize(stats.budget, binary=True):>10} {stats.hits:>8} {stats.misses:>8} {ratio:>10}"
+        )
+
+
+@bp.cli.command("prune")
+@click.argument("clients", nargs=-1)
+@click.option("--dry-run", is_flag=True, help="Show what would be removed without removing it.")
+def cli_prune(clients: tuple[str, ...], dry_run: bool) -> None:
+    """
+    Remove expired and least recently used responses until each client's cache is within its budget.
+
+    Budgets are set by CACHE_BUDGETS. This is safe to run while the app is serving requests, e.g. from a cron job.
+    """
+    for cache in client_caches(clients):
+        evicted = cache.prune(dry_run=dry_run)
+        size = humanize.naturalsize(sum(entry.size for entry in evicted), binary=True)
+        click.echo(f"{cache.name}: {'would remove' if dry_run else 'removed'} {len(evicted)} entries ({size})")
+
+
+@bp.cli.command("clear")
+@click.argument("clients", nargs=-1)
+@click.confirmation_option(prompt="Remove every cached response?")
+def cli_clear(clients: tuple[str, ...]) -> None:
+    """Remove every cached response, and the usage statistics for each cache."""
+    for cache in client_caches(clients):
+        click.echo(f"{cache.name}: removed {cache.clear()} entries")
@@ -4,16 +4,24 @@ import structlog
 import pathlib
 
 import click
+import sqlalchemy
 
+from vancelle.clients.goodreads.common import GoodreadsWriter
 from vancelle.clients.goodreads.csv import GoodreadsCsvImporter
 from vancelle.clients.goodreads.html import GoodreadsHtmlImporter
+from vancelle.controllers.job import JobController
+from vancelle.controllers.tasks import import_goodreads
 from vancelle.ext.flask_login import get_user
 from vancelle.extensions import db
+from vancelle.models import Work
+from vancelle.models.loaders import work_detail
 from vancelle.shelf import Shelf
 
 
 logger = structlog.get_logger(logger_name=__name__)
 
+job_controller = JobController()
+
 bp = flask.Blueprint("data", __name__)
 bp.cli.short_help = "Import and export data."
 
@@ -45,7 +53,13 @@ def before_request():
 @bp.cli.command("migrate")
 def migrate():
     """Run temporary data migrations."""
-    pass
+    statement = sqlalchemy.select(Work).filter(~Work.details.has()).options(*work_detail())
+    count = 0
+    for work in db.session.execute(statement).scalars():
+        work.refresh_details()
+        count += 1
+    db.session.commit()
+    logger.warning("Created missing work details", count=count)
 
 
 @bp.cli.command("import-goodreads-csv")
@@ -55,7 +69,8 @@ def migrate():
     default="goodreads_library_export.csv",
 )
 @click.option("--username", required=True)
-def cli_import_csv(path: pathlib.Path, username: str) -> None:
+@click.option("--background", is_flag=True, help="Queue a job for a worker instead of importing now.")
+def cli_import_csv(path: pathlib.Path, username: str, background: bool) -> None:
     """
     Import from a goodreads_library_export.csv file.
 
@@ -63,24 +78,49 @@ def cli_import_csv(path: pathlib.Path, username: str) -> None:
 
     https://github.com/internetarchive/openlibrary/blob/master/openlibrary/plugins/upstream/account.py#L1143
     """
+    if background:
+        queue_goodreads_import(path, username, "csv")
+        return
+
     loader = GoodreadsCsvImporter(
         shelf_mapping=flask.current_app.config["GOODREADS_SHELF_MAPPING"],
         user=get_user(username),
     )
-    for item in loader.load_file(path):
-        db.session.add(item)
-        db.session.commit()
+    with GoodreadsWriter() as writer:
+        for item in loader.load_file(path):
+            writer.add(item)
+
+    logger.warning("Imported books from Goodreads", count=writer.written)
 
 
 @bp.cli.command("import-goodreads-html")
 @click.argument("path", type=click.Path(exists=True, file_okay=True, dir_okay=False, path_type=pathlib.Path))
 @click.option("--username", required=True)
-def cli_import_html(path: pathlib.Path, username: str) -> None:
+@click.option("--background", is_flag=True, help="Queue a job for a worker instead of importing now.")
+def cli_import_html(path: pathlib.Path, username: str, background: bool) -> None:
     """Import books from manually scraped HTML."""
+    if background:
+        queue_goodreads_import(path, username, "html")
+        return
+
     loader = GoodreadsHtmlImporter(
         shelf_mapping=flask.current_app.config["GOODREADS_SHELF_MAPPING"],
         user=get_user(username),
     )
-    for item in loader.load_file(path):
-        db.session.add(item)
-        db.session.commit()
+    with GoodreadsWriter() as writer:
+        for item in loader.load_file(path):
+            writer.add(item)
+
+    logger.warning("Imported books from Goodreads", count=writer.written)
+
+
+def queue_goodreads_import(path: pathlib.Path, username: str, format: str) -> None:
+    """The file's contents are stored with the job, so the worker doesn't need access to the file."""
+    job = job_controller.enqueue(
+        import_goodreads,
+        user=get_user(username),
+        format=format,
+        filename=path.name,
+        content=path.read_text("utf-8"),
+    )
+    logger.warning("Queued Goodreads import", job=job.id)
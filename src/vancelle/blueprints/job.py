@@ -0,0 +1,82 @@
+import datetime
+import signal
+import threading
+import uuid
+
+import click
+import flask
+import flask_login
+import structlog
+
+from vancelle.controllers import tasks  # noqa: F401 (registers the tasks that workers run)
+from vancelle.controllers.job import JobController
+from vancelle.html.vancelle.components.job import JobStatus
+from vancelle.lib.heavymetal import render
+
+logger = structlog.get_logger(logger_name=__name__)
+
+controller = JobController()
+
+bp = flask.Blueprint("job", __name__, url_prefix="/jobs", cli_group="jobs")
+bp.cli.short_help = "Run background jobs."
+
+
+@bp.record_once
+def setup(state: flask.sansio.blueprints.BlueprintSetupState):
+    state.app.config.setdefault("JOB_CONCURRENCY", 2)
+    state.app.config.setdefault("JOB_POLL_INTERVAL", 2.0)
+    state.app.config.setdefault("JOB_TIMEOUT", datetime.timedelta(hours=1))
+    state.app.config.setdefault("JOB_MAX_ATTEMPTS", 3)
+
+
+@bp.before_request
+@flask_login.login_required
+def before_request():
+    pass
+
+
+@bp.route("/<uuid:job_id>")
+def status(job_id: uuid.UUID):
+    return render(JobStatus(controller.get_or_404(job_id)))
+
+
+@bp.cli.command("worker")
+@click.option("--concurrency", type=click.IntRange(min=1), help="Run this many jobs at once. [default: JOB_CONCURRENCY]")
+@click.option("--burst", is_flag=True, help="Exit once the queue is empty.")
+def cli_worker(concurrency: int | None, burst: bool) -> None:
+    """
+    Run queued jobs until stopped.
+
+    Each thread claims one job at a time, so --concurrency bounds how many jobs run at once. Any number of workers can
+    share the queue. Stopping a worker (with SIGINT or SIGTERM) lets running jobs finish first.
+    """
+    app = flask.current_app._get_current_object()  # type: ignore[attr-defined]
+    concurrency = concurrency or app.config["JOB_CONCURRENCY"]
+    stop = threading.Event()
+
+    def work() -> None:
+        with app.app_context():
+            controller.work(stop=stop, burst=burst)
+
+    def shutdown(signum: int, frame: object) -> None:
+        logger.warning("Stopping worker after running jobs finish", signal=signal.Signals(signum).name)
+        stop.set()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+    logger.warning("Starting worker", concurrency=concurrency, burst=burst)
+    threads = [threading.Thread(target=work, name=f"worker-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@bp.cli.command("purge")
+@click.option("--days", type=click.IntRange(min=0), default=7, show_default=True)
+def cli_purge(days: int) -> None:
+    """Delete finished jobs older than some days."""
+    count = controller.purge(datetime.timedelta(days=days))
+    logger.warning("Purged jobs", count=count)
@@ -7,7 +7,7 @@ import structlog
 from werkzeug.exceptions import BadRequest
 
 from vancelle.controllers.record import RecordController
-from vancelle.extensions import db, htmx
+from vancelle.extensions import htmx
 from vancelle.forms.record import RecordForm
 from vancelle.html.vancelle.pages.record import record_update_page
 from vancelle.lib.heavymetal import render
@@ -49,8 +49,7 @@ def detail(record_id: uuid.UUID):
             record_form.date_stopped.data = record_form.date_started.data
 
         record_form.populate_obj(record)
-        db.session.add(record)
-        db.session.commit()
+        controller.save(record)
         return htmx.redirect(record.work.url_for())
 
     if htmx and record_form.errors:
@@ -1,18 +1,32 @@
+import datetime
+import typing
 import uuid
 
+import click
 import flask
 import flask_login
+import structlog
 
+from vancelle.controllers.job import JobController
+from vancelle.controllers.release import ReleaseController
 from vancelle.controllers.source import SourceController
+from vancelle.controllers.tasks import refresh_stale as refresh_stale_task, watch_releases as watch_releases_task
 from vancelle.controllers.work import WorkController
+from vancelle.ext.flask_login import get_user
 from vancelle.extensions import htmx
 from vancelle.forms.source import SourceSearchArgs
-from vancelle.html.vancelle.pages.source import SourceDetailPage, ExternalSearchPage, ExternalIndexPage
+from vancelle.html.vancelle.components.source import SourceResultSection
+from vancelle.html.vancelle.pages.source import SourceDetailPage, ExternalSearchPage, ExternalIndexPage, FederatedSearchPage
 from vancelle.lib.heavymetal import render
 
-bp = flask.Blueprint("source", __name__, url_prefix="/sources")
+logger = structlog.get_logger(logger_name=__name__)
+
+bp = flask.Blueprint("source", __name__, url_prefix="/sources", cli_group="sources")
+bp.cli.short_help = "Manage entries from external sources."
 
 controller = SourceController()
+job_controller = JobController()
+release_controller = ReleaseController()
 work_controller = WorkController()
 
 
@@ -24,7 +38,31 @@ def before_request():
 
 @bp.route("/")
 def index():
-    return render(ExternalIndexPage())
+    args = SourceSearchArgs(formdata=flask.request.args)
+    return render(ExternalIndexPage(args=args))
+
+
+@bp.route("/-/search")
+def federated_search():
+    args = SourceSearchArgs(formdata=flask.request.args)
+
+    work_id = flask.request.args.get("work_id", type=uuid.UUID)
+    work = work_controller.get(work_id)
+
+    query = args.search.data or (work and work.resolve_title()) or ""
+
+    # The page is rendered around a placeholder, and each source's results are sent as soon as it answers.
+    placeholder = f"federated-search-{uuid.uuid4()}"
+    page = render(FederatedSearchPage(query=query, args=args, work=work, results=[placeholder]))
+    before, after = page.split(placeholder)
+
+    def stream() -> typing.Iterator[str]:
+        yield before
+        for result in controller.federated_search(query=query):
+            yield render(SourceResultSection(result, query=query, work=work))
+        yield after
+
+    return flask.Response(flask.stream_with_context(stream()), headers={"X-Accel-Buffering": "no"})
 
 
 @bp.route("/<string:entry_type>")
@@ -74,3 +112,77 @@ def refresh(entry_type: str, entry_id: str):
     controller.refresh(entry_type=entry_type, entry_id=entry_id)
 
     return htmx.refresh()
+
+
+@bp.route("/-/refresh", methods={"post"})
+def refresh_stale():
+    """Queue a job to refresh the current user's stale entries."""
+    days = flask.request.form.get("days", default=30, type=int)
+    job_controller.enqueue(refresh_stale_task, user=flask_login.current_user, days=days)
+    flask.flash("Stale entries will be refreshed in the background.", "Refresh queued")
+    return flask.redirect(flask.url_for("user.settings"))
+
+
+@bp.cli.command("refresh")
+@click.option("--days", type=click.IntRange(min=0), default=30, show_default=True, help="Refresh entries older than this.")
+@click.option("--type", "entry_types", multiple=True, type=click.Choice(sorted(SourceController.mapping)))
+@click.option("--username", help="Only refresh this user's entries.")
+@click.option("--limit", type=click.IntRange(min=1), help="Refresh at most this many entries.")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=100, show_default=True)
+def cli_refresh(days: int, entry_types: tuple[str, ...], username: str | None, limit: int | None, chunk_size: int) -> None:
+    """
+    Refresh entries that haven't been fetched from their source for some days.
+
+    Entries are written as they are fetched, so an interrupted refresh can be resumed by running it again.
+    """
+    user = get_user(username) if username else None
+    stale = controller.stale_entries(older_than=datetime.timedelta(days=days), entry_types=entry_types, user=user, limit=limit)
+
+    failures = []
+    with click.progressbar(controller.refresh_many(stale, chunk_size=chunk_size), length=len(stale)) as results:
+        for result in results:
+            if result.error:
+                failures.append(result)
+
+    for failure in failures:
+        click.echo(f"Failed to refresh {failure.entry_type} {failure.entry_id}: {failure.error}", err=True)
+
+    logger.warning("Refreshed stale entries", count=len(stale) - len(failures), failed=len(failures))
+    if failures:
+        raise click.exceptions.Exit(1)
+
+
+@bp.cli.command("watch-releases")
+@click.option("--username", help="Only check this user's works.")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=100, show_default=True)
+@click.option("--background", is_flag=True, help="Queue a job for a worker instead of checking now.")
+def cli_watch_releases(username: str | None, chunk_size: int, background: bool) -> None:
+    """
+    Check works on the Unreleased shelf for their release, e.g. from a daily cron job.
+
+    Entries are checked more often as their work's release date gets closer: daily within a month, weekly within a
+    year, and monthly otherwise (or with no known release date). Works whose release date has passed are then moved to
+    the RELEASE_WATCH_SHELF shelf.
+    """
+    user = get_user(username) if username else None
+
+    if background:
+        job = job_controller.enqueue(watch_releases_task, user=user)
+        logger.warning("Queued release check", job=job.id)
+        return
+
+    due = release_controller.due_entries(user=user)
+
+    failures = []
+    with click.progressbar(release_controller.check(due, chunk_size=chunk_size), length=len(due)) as results:
+        for result in results:
+            if result.error:
+                failures.append(result)
+
+    for failure in failures:
+        click.echo(f"Failed to check {failure.entry_type} {failure.entry_id}: {failure.error}", err=True)
+
+    moved = release_controller.shelve_released(user=user)
+    logger.warning("Checked unreleased works", checked=len(due) - len(failures), failed=len(failures), moved=moved)
+    if failures:
+        raise click.exceptions.Exit(1)
@@ -1,3 +1,4 @@
+import datetime
 import gzip
 import uuid
 
@@ -11,7 +12,10 @@ import structlog
 import werkzeug.exceptions
 import werkzeug.security
 
+from vancelle.controllers.job import JobController
 from vancelle.controllers.settings import ApplicationSettingsController, UserSettingsController
+from vancelle.controllers.tasks import import_backup, reload_steam_cache as reload_steam_cache_task
+from vancelle.controllers.work import WorkController
 from vancelle.ext.flask_login import get_user
 from vancelle.extensions import db, login_manager
 from vancelle.forms.user import ImportForm, LoginForm
@@ -23,7 +27,8 @@ logger = structlog.get_logger(logger_name=__name__)
 BACKUP_FILENAME = "vancelle-backup.json.gz"
 
 user_settings = UserSettingsController()
-application_settings = ApplicationSettingsController()
+job_controller = JobController()
+work_controller = WorkController()
 
 bp = flask.Blueprint("user", __name__, url_prefix="/user")
 bp.cli.short_help = "Manage users."
@@ -67,11 +72,13 @@ def settings():
 
     if form.validate_on_submit():
         data = gzip.decompress(form.backup.data.read()).decode("utf-8")
-        user_settings.import_json(data, user=flask_login.current_user)
+        job_controller.enqueue(import_backup, user=flask_login.current_user, data=data)
+        flask.flash("Your backup will be imported in the background.", "Import queued")
         return flask.redirect(flask.url_for(".settings"))
 
     work_count = flask_login.current_user.works.count()
-    page = SettingsPage(import_form=form, work_count=work_count, filename=BACKUP_FILENAME)
+    jobs = job_controller.recent()
+    page = SettingsPage(import_form=form, work_count=work_count, filename=BACKUP_FILENAME, jobs=jobs)
     return page.render()
 
 
@@ -85,15 +92,20 @@ def export():
     )
 
 
-@bp.route("/reload-steam-cache", methods={"GET", "POST"})
+@bp.route("/reload-steam-cache", methods={"POST"})
 def reload_steam_cache():
-    application_settings.reload_steam_cache()
+    job_controller.enqueue(reload_steam_cache_task, user=flask_login.current_user)
+    flask.flash("The Steam AppID list will be reloaded in the background.", "Reload queued")
     return flask.redirect(flask.url_for(".settings"))
 
 
 @bp.cli.command("reload-steam-cache")
-def cli_reload_steam_cache():
-    application_settings.reload_steam_cache()
+@click.option("--background", is_flag=True, help="Queue a job for a worker instead of reloading now.")
+def cli_reload_steam_cache(background: bool):
+    if background:
+        job_controller.enqueue(reload_steam_cache_task, user=None)
+    else:
+        ApplicationSettingsController().reload_steam_cache()
 
 
 @login_manager.user_loader
@@ -133,6 +145,15 @@ def cli_create_user(id: uuid.UUID, username: str, password: str):
 def cli_clear_user(username: str) -> None:
     """Delete all works belonging to a user."""
     user = get_user(username)
-    for work in user.works:
-        db.session.delete(work)
-    db.session.commit()
+    count = work_controller.purge_user(user)
+    logger.warning("Deleted works", user=user.id, count=count)
+
+
+@bp.cli.command("purge-deleted")
+@click.option("--username", required=True)
+@click.option("--days", type=click.IntRange(min=0), default=30, show_default=True)
+def cli_purge_deleted(username: str, days: int) -> None:
+    """Permanently delete works, entries and records that were deleted more than some days ago."""
+    user = get_user(username)
+    count = work_controller.purge_deleted(datetime.timedelta(days=days), user=user)
+    logger.warning("Purged deleted", user=user.id, count=count)
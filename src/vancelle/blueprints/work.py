@@ -10,8 +10,9 @@ from vancelle.clients.images.client import ImageCache
 from vancelle.controllers.source import SourceController
 from vancelle.controllers.work import WorkController
 from vancelle.exceptions import ApplicationError
-from vancelle.extensions import db, htmx
-from vancelle.forms.work import WorkForm, WorkIndexArgs, WorkShelfForm
+from vancelle.extensions import htmx
+from vancelle.forms.work import WorkBulkForm, WorkForm, WorkIndexArgs, WorkShelfForm
+from vancelle.inflect import count_plural
 from vancelle.html.vancelle.pages.work import work_create_page, work_detail_page, work_index_page, work_update_page
 from vancelle.lib.heavymetal import render
 from vancelle.models.work import Work
@@ -37,8 +38,7 @@ def create():
     if form.validate_on_submit():
         work = Work(id=uuid.uuid4(), user=flask_login.current_user)
         form.populate_obj(work)
-        db.session.add(work)
-        db.session.commit()
+        controller.save(work)
         return flask.redirect(work.url_for())
 
     return render(work_create_page(work_form=form))
@@ -49,7 +49,33 @@ def index():
     work_index_args = WorkIndexArgs(formdata=flask.request.args)
     works = work_index_args.paginate()
 
-    return render(work_index_page(works, work_index_args))
+    return render(work_index_page(works, work_index_args, WorkBulkForm()))
+
+
+@bp.route("/-/bulk", methods={"post"})
+def bulk():
+    """Apply an action to the selected works, or to every work matching the filters in the query string."""
+    form = WorkBulkForm()
+    if not form.validate_on_submit():
+        raise ApplicationError(form.errors)
+
+    where = form.where(WorkIndexArgs(formdata=flask.request.args))
+    match form.action.data:
+        case "shelve":
+            count = controller.bulk_shelve(where, form.shelf.data)
+            flask.flash(f"Moved {count_plural('work', count)} to the {form.shelf.data.title} shelf.", "Shelved works")
+        case "delete":
+            count = controller.bulk_delete(where)
+            flask.flash(f"Deleted {count_plural('work', count)}.", "Deleted works")
+        case "restore":
+            count = controller.bulk_restore(where)
+            flask.flash(f"Restored {count_plural('work', count)}.", "Restored works")
+        case "tag":
+            add, remove = form.split_tags(form.add_tags.data), form.split_tags(form.remove_tags.data)
+            count = controller.bulk_tag(where, add=add, remove=remove)
+            flask.flash(f"Updated tags on {count_plural('work', count)}.", "Tagged works")
+
+    return htmx.refresh()
 
 
 @bp.route("/<uuid:work_id>")
@@ -84,7 +110,7 @@ def shelve(work_id: uuid.UUID):
 
     if work_shelf_form.validate_on_submit():
         work_shelf_form.populate_obj(work)
-        db.session.commit()
+        controller.save(work)
         flask.flash(f"Moved {work.resolve_details().title} to the {work.shelf.title} shelf.", "Shelved work")
         return htmx.refresh()
 
@@ -98,7 +124,7 @@ def update(work_id: uuid.UUID):
 
     if work_form.validate_on_submit():
         work_form.populate_obj(work)
-        db.session.commit()
+        controller.save(work)
         return htmx.redirect(work.url_for())
 
     return render(work_update_page(work, work_form))
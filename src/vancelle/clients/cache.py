@@ -0,0 +1,184 @@
+"""
+Cache policies for HTTP clients.
+
+Upstream cache headers are inconsistent (and scraped HTML is usually uncacheable), so each client declares how long
+its responses stay fresh, instead of relying on whatever headers the upstream sends.
+"""
+
+import contextlib
+import contextvars
+import dataclasses
+import datetime
+import hashlib
+import typing
+
+import hishel
+import httpcore
+import httpx
+
+State = typing.Literal["fresh", "stale", "expired"]
+
+
+class PolicyController(hishel.Controller):
+    """
+    A hishel controller that understands the 'refresh' request extension, and never force-caches errors.
+
+    A refresh skips the stored response entirely and replaces it if the new response can be cached, so an error while
+    refreshing leaves the old response in place (which is what makes stale-if-error possible).
+    """
+
+    def construct_response_from_cache(
+        self,
+        request: httpcore.Request,
+        response: httpcore.Response,
+        original_request: httpcore.Request,
+    ) -> httpcore.Request | httpcore.Response | None:
+        if request.extensions.get("refresh"):
+            return None
+
+        return super().construct_response_from_cache(request, response, original_request)
+
+    def is_cachable(self, request: httpcore.Request, response: httpcore.Response) -> bool:
+        return response.status in self._cacheable_status_codes and super().is_cachable(request, response)
+
+
+@dataclasses.dataclass(frozen=True)
+class CachePolicy:
+    """
+    Without a `ttl`, responses are cached according to their headers.
+
+    With a `ttl`, responses are cached for that long whatever their headers say. After that they're "stale": for
+    `stale_while_revalidate` they're still used while a background request refreshes them, and for `stale_if_error`
+    they're used if refreshing them fails.
+    """
+
+    ttl: datetime.timedelta | None = None
+    stale_while_revalidate: datetime.timedelta = datetime.timedelta(0)
+    stale_if_error: datetime.timedelta = datetime.timedelta(0)
+
+    # Query parameters that don't change the response, and shouldn't change the cache key.
+    ignore_params: frozenset[str] = frozenset()
+
+    def controller(self) -> PolicyController:
+        return PolicyController(cacheable_methods=["GET", "HEAD"], key_generator=self.key)
+
+    def extensions(self, *, refresh: bool = False) -> dict[str, typing.Any]:
+        if self.ttl is None:
+            return {}
+
+        return {"force_cache": True, "refresh": refresh}
+
+    def key(self, request: httpcore.Request, body: bytes | None = b"") -> str:
+        """
+        The same key for the same URL, whatever order its parameters are in.
+
+        >>> policy = CachePolicy(ignore_params=frozenset({"ref"}))
+        >>> a = policy.key(httpcore.Request("GET", "https://example.invalid/search?q=a&page=2&ref=nav"))
+        >>> b = policy.key(httpcore.Request("GET", "https://example.invalid/search?page=2&q=a"))
+        >>> a == b
+        True
+        """
+        url = httpx.URL(bytes(request.url).decode("ascii"))
+        params = sorted((k, v) for k, v in url.params.multi_items() if k not in self.ignore_params)
+        normalized = httpx.URL(url.copy_with(query=None), params=params)
+
+        key = hashlib.blake2b(digest_size=16)
+        for part in (request.method, str(normalized).encode("ascii"), body or b""):
+            key.update(part)
+        return key.hexdigest()
+
+    def state(self, response: httpx.Response) -> State | None:
+        """How a response from the cache can be used, or None if the policy doesn't apply to it."""
+        if self.ttl is None or not response.extensions.get("from_cache"):
+            return None
+
+        age = self._age(response)
+        if age <= self.ttl:
+            return "fresh"
+        if age <= self.ttl + self.stale_while_revalidate:
+            return "stale"
+        return "expired"
+
+    def usable_on_error(self, response: httpx.Response) -> bool:
+        return self.ttl is not None and self._age(response) <= self.ttl + self.stale_if_error
+
+    @staticmethod
+    def _age(response: httpx.Response) -> datetime.timedelta:
+        # Stored responses are serialized with a GMT timestamp, which hishel parses into a naive datetime.
+        created_at: datetime.datetime = response.extensions["cache_metadata"]["created_at"]
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+        return datetime.datetime.now(datetime.timezone.utc) - created_at
+
+
+@dataclasses.dataclass(frozen=True)
+class Validators:
+    """
+    The validators of an upstream document, which make a conditional request for it answer 304 if it hasn't changed.
+
+    >>> Validators(etag='"abc"').headers()
+    {'If-None-Match': '"abc"'}
+    >>> bool(Validators())
+    False
+    """
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> typing.Self:
+        return cls(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class NotModified(Exception):
+    """Raised when a conditional request finds that the upstream document hasn't changed."""
+
+
+@dataclasses.dataclass()
+class Conditional:
+    """The first GET in a conditional() block: the validators it was made with, and those of the response."""
+
+    stored: Validators
+    fetched: Validators | None = None
+    used: bool = False
+
+
+_conditional: contextvars.ContextVar[Conditional | None] = contextvars.ContextVar("conditional", default=None)
+
+
+@contextlib.contextmanager
+def conditional(validators: Validators) -> typing.Iterator[Conditional]:
+    """
+    Make the first GET by an HttpClient in this block a conditional request, e.g. for the upstream document of an
+    entry being refreshed. Sources fetch that document before anything else, so this doesn't need to be threaded through
+    each client's methods.
+
+    With validators, the request skips the cache and raises NotModified if upstream answers 304. Without them, it's an
+    ordinary request. Either way, the validators of the response are kept for next time.
+    """
+    token = _conditional.set(request := Conditional(validators))
+    try:
+        yield request
+    finally:
+        _conditional.reset(token)
+
+
+def take_conditional() -> Conditional | None:
+    """The conditional request for this block, if it hasn't been made yet."""
+    request = _conditional.get()
+    if request is None or request.used:
+        return None
+
+    request.used = True
+    return request
@@ -1,78 +1,403 @@
+import asyncio
+import contextlib
 import dataclasses
+import functools
+import os
 import pathlib
 import sqlite3
+import threading
 import typing
 
 import bs4
 import flask
 import hishel
 import httpx
+import anysqlite
 import platformdirs
 import structlog
 import svcs
 
+from vancelle.clients.cache import CachePolicy, Conditional, NotModified, Validators, take_conditional
+from vancelle.clients.metadata import MetadataCache
+from vancelle.clients.policy import AsyncPolicyTransport, HostPolicies, PolicyTransport
+from vancelle.clients.storage import DEFAULT_CACHE_BUDGETS, ClientCache, CacheUsage
+
 logger = structlog.get_logger(logger_name=__name__)
 
+C = typing.TypeVar("C", bound="HttpClient")
+A = typing.TypeVar("A", bound="AsyncHttpClient")
+
+# Rate limits are set below what each API documents (or tolerates, for scraped sites). See HostPolicy for fields.
+DEFAULT_HTTP_POLICIES: typing.Mapping[str, typing.Mapping[str, typing.Any]] = {
+    "*": {},
+    "api.themoviedb.org": {"rate": 20.0, "burst": 20},
+    "openlibrary.org": {"rate": 3.0, "burst": 5},
+    "store.steampowered.com": {"rate": 0.5, "burst": 10},
+    "www.goodreads.com": {"rate": 1.0, "burst": 3},
+    "www.royalroad.com": {"rate": 1.0, "burst": 3},
+}
+
 
 @dataclasses.dataclass
 class HttpClientBuilder:
     cache_directory: pathlib.Path
+    http2: bool = False
+    limits: httpx.Limits = dataclasses.field(default_factory=httpx.Limits)
+    policies: HostPolicies = dataclasses.field(default_factory=HostPolicies)
+    budgets: typing.Mapping[str, int] = dataclasses.field(default_factory=lambda: DEFAULT_CACHE_BUDGETS)
 
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        app = svcs_container.get(flask.Flask)
+    def from_app(cls, app: flask.Flask) -> typing.Self:
         key = "CACHE_PATH"
 
         default = platformdirs.user_cache_path(appname=app.name, appauthor="borntyping").as_posix()
         app.config.setdefault(key, default)
+        app.config.setdefault("HTTP2", False)
+        app.config.setdefault("HTTP_MAX_CONNECTIONS", 20)
+        app.config.setdefault("HTTP_POLICIES", DEFAULT_HTTP_POLICIES)
+        app.config.setdefault("CACHE_BUDGETS", DEFAULT_CACHE_BUDGETS)
 
         path = pathlib.Path(app.config[key])
         path.mkdir(exist_ok=True)
         app.logger.info(f"Outgoing requests will be cached in {path}")
 
-        return cls(path)
+        max_connections = app.config["HTTP_MAX_CONNECTIONS"]
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        policies = HostPolicies.from_config(app.config["HTTP_POLICIES"])
+        budgets = app.config["CACHE_BUDGETS"]
+        return cls(path, http2=app.config["HTTP2"], limits=limits, policies=policies, budgets=budgets)
+
+    @staticmethod
+    def cache_name(cls: typing.Type) -> str:
+        """Async clients share the cache of their synchronous twin, e.g. AsyncOpenLibraryAPI uses OpenLibraryAPI.sqlite."""
+        return cls.__name__.removeprefix("Async")
+
+    def cache_client(self, cls: type["HttpClient"], storage: hishel.BaseStorage, **kwargs: typing.Any) -> hishel.CacheClient:
+        """
+        A caching client for `cls`, following its cache policy and using the shared connection settings and host
+        policies. HTTP/2 needs the 'h2' package.
+        """
+        name, policy = self.cache_name(cls), cls.cache_policy
+
+        def record(response: httpx.Response) -> None:
+            self.cache_usage.record(name, policy, response)
+
+        transport = PolicyTransport(httpx.HTTPTransport(http2=self.http2, limits=self.limits), self.policies)
+        return hishel.CacheClient(
+            storage=storage,
+            controller=policy.controller(),
+            transport=transport,
+            event_hooks={"response": [record]},
+            **kwargs,
+        )
 
     def sqlite_storage_for(self, cls: typing.Type) -> hishel.SQLiteStorage:
-        connection = sqlite3.connect(self.cache_directory / f"{cls.__name__}.sqlite")
+        # Clients are shared between threads, and SQLiteStorage holds a lock around each use of the connection.
+        connection = sqlite3.connect(self.cache_directory / f"{cls.__name__}.sqlite", check_same_thread=False)
         return hishel.SQLiteStorage(connection=connection)
 
     def filesystem_storage_for(self, cls: typing.Type) -> hishel.FileStorage:
         return hishel.FileStorage(base_path=self.cache_directory / cls.__name__)
 
+    @functools.cached_property
+    def metadata_cache(self) -> MetadataCache:
+        """Shared by every client in the process, so that each value is only kept in memory once."""
+        return MetadataCache(self.cache_directory / "metadata.sqlite")
+
+    @functools.cached_property
+    def cache_usage(self) -> CacheUsage:
+        return CacheUsage(self.cache_directory / "usage.sqlite")
+
+    def cache_for(self, cls: typing.Type) -> ClientCache:
+        """The stored responses of a client's cache, for maintenance by `flask cache`."""
+        name = self.cache_name(cls)
+        budget = self.budgets.get(name, self.budgets["*"])
+        return ClientCache.for_client(self.cache_directory, cls, budget=budget, usage=self.cache_usage)
+
+    def async_cache_client(
+        self,
+        cls: type["AsyncHttpClient"],
+        storage: hishel.AsyncBaseStorage,
+        **kwargs: typing.Any,
+    ) -> hishel.AsyncCacheClient:
+        name, policy = self.cache_name(cls), cls.cache_policy
+
+        async def record(response: httpx.Response) -> None:
+            self.cache_usage.record(name, policy, response)
+
+        transport = AsyncPolicyTransport(httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits), self.policies)
+        return hishel.AsyncCacheClient(
+            storage=storage,
+            controller=policy.controller(),
+            transport=transport,
+            event_hooks={"response": [record]},
+            **kwargs,
+        )
+
+    async def async_sqlite_storage_for(self, cls: typing.Type) -> hishel.AsyncSQLiteStorage:
+        connection = await anysqlite.connect(self.cache_directory / f"{self.cache_name(cls)}.sqlite", check_same_thread=False)
+        return hishel.AsyncSQLiteStorage(connection=connection)
+
+    def async_filesystem_storage_for(self, cls: typing.Type) -> hishel.AsyncFileStorage:
+        return hishel.AsyncFileStorage(base_path=self.cache_directory / self.cache_name(cls))
+
+
+class HttpClientPool:
+    """
+    Long-lived HTTP clients, shared by every request (and thread) in a worker process.
+
+    Keeping one client per class means connections and TLS sessions are reused between requests. Clients are created
+    on first use, and forgotten if the process forks so that a child never shares a connection with its parent.
+    """
+
+    def __init__(self, builder: HttpClientBuilder, config: flask.Config) -> None:
+        self.builder = builder
+        self.config = config
+        self._clients: dict[type[HttpClient], HttpClient] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def get(self, cls: type[C]) -> C:
+        with self._lock:
+            if self._pid != os.getpid():
+                logger.info("Discarding HTTP clients inherited from parent process", clients=len(self._clients))
+                self._clients.clear()
+                self._pid = os.getpid()
+
+            if cls not in self._clients:
+                self._clients[cls] = cls.build(self.builder, self.config)
+
+            return typing.cast(C, self._clients[cls])
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+        self.builder.cache_usage.flush()
+
+    @contextlib.asynccontextmanager
+    async def open_async(self, cls: type[A]) -> typing.AsyncIterator[A]:
+        """
+        Async clients are bound to the event loop they were created in, and Flask runs each async view in a new loop.
+
+        They are opened for the duration of a block instead of being pooled, e.g.
+        `async with pool.open_async(AsyncOpenLibraryAPI) as openlibrary: ...`.
+        """
+        client = await cls.build(self.builder, self.config)
+        try:
+            yield client
+        finally:
+            await client.aclose()
+
+
+_refreshing: set[tuple[typing.Any, ...]] = set()
+_refreshing_lock = threading.Lock()
+
+
+class ResponseMixin:
+    """Handling for responses that doesn't depend on whether the client is sync or async."""
+
+    def _debug(self, response: httpx.Response) -> None:
+        logger.debug(
+            "Finished request",
+            url=str(response.url),
+            status_code=response.status_code,
+            elapsed=response.elapsed.total_seconds(),
+            from_cache=response.extensions["from_cache"],
+            cache_metadata=response.extensions.get("cache_metadata"),
+        )
+
+    def request_into_soup(self, response: httpx.Response) -> bs4.BeautifulSoup:
+        return bs4.BeautifulSoup(response.text, features="html.parser")
+
 
 @dataclasses.dataclass()
-class HttpClient:
+class HttpClient(ResponseMixin):
     client: hishel.CacheClient
 
+    # Followed by the client built by HttpClientBuilder.cache_client(), and by get().
+    cache_policy: typing.ClassVar[CachePolicy] = CachePolicy()
+
+    @classmethod
+    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
+        return svcs_container.get(HttpClientPool).get(cls)
+
+    @classmethod
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.client.close()
+
     def get(
         self,
         url: str,
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
     ) -> httpx.Response:
-        response = self.client.get(url, params=params, headers=headers, follow_redirects=True)
+        if request := take_conditional():
+            return self._get_conditional(url, params, headers, request)
+
+        response = self._get(url, params, headers)
+        state = self.cache_policy.state(response)
+
+        if state == "stale":
+            self._refresh_in_background(url, params, headers)
+        elif state == "expired":
+            try:
+                return self._get(url, params, headers, refresh=True)
+            except (httpx.TransportError, httpx.HTTPStatusError) as error:
+                if not self.cache_policy.usable_on_error(response):
+                    raise
+                logger.warning("Using stale response after error", url=str(response.url), error=repr(error))
+
         self._debug(response)
         response.raise_for_status()
         return response
 
+    def _get(
+        self,
+        url: str,
+        params: dict[str, str] | None,
+        headers: dict[str, str] | None,
+        refresh: bool = False,
+    ) -> httpx.Response:
+        extensions = self.cache_policy.extensions(refresh=refresh)
+        response = self.client.get(url, params=params, headers=headers, follow_redirects=True, extensions=extensions)
+        if refresh:
+            self._debug(response)
+            response.raise_for_status()
+        return response
+
+    def _get_conditional(
+        self,
+        url: str,
+        params: dict[str, str] | None,
+        headers: dict[str, str] | None,
+        request: Conditional,
+    ) -> httpx.Response:
+        # The caller is refreshing what it stored, so a cached response would only hide changes.
+        extensions = self.cache_policy.extensions(refresh=True)
+        if request.stored:
+            headers = {**(headers or {}), **request.stored.headers()}
+        response = self.client.get(url, params=params, headers=headers, follow_redirects=True, extensions=extensions)
+        self._debug(response)
+
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            raise NotModified(str(response.url))
+
+        response.raise_for_status()
+        request.fetched = Validators.from_response(response)
+        return response
+
+    def _refresh_in_background(self, url: str, params: dict[str, str] | None, headers: dict[str, str] | None) -> None:
+        key = (id(self), url, repr(params), repr(headers))
+        with _refreshing_lock:
+            if key in _refreshing:
+                return
+            _refreshing.add(key)
+
+        def refresh() -> None:
+            try:
+                self._get(url, params, headers, refresh=True)
+            except httpx.HTTPError as error:
+                logger.warning("Failed to refresh stale response", url=url, error=repr(error))
+            finally:
+                with _refreshing_lock:
+                    _refreshing.discard(key)
+
+        logger.info("Refreshing stale response in the background", url=url)
+        threading.Thread(target=refresh, name=f"refresh-{url}", daemon=True).start()
+
     def head(self, url: str) -> httpx.Response:
         response = self.client.head(url)
         self._debug(response)
         response.raise_for_status()
         return response
 
-    def _debug(self, response: httpx.Response):
-        logger.debug(
-            "Finished request",
-            url=str(response.url),
-            status_code=response.status_code,
-            elapsed=response.elapsed.total_seconds(),
-            from_cache=response.extensions["from_cache"],
-            cache_metadata=response.extensions.get("cache_metadata"),
-        )
-
     def soup(self, url: str, **kwargs: typing.Any) -> bs4.BeautifulSoup:
         return self.request_into_soup(self.get(url, **kwargs))
 
-    def request_into_soup(self, response: httpx.Response) -> bs4.BeautifulSoup:
-        return bs4.BeautifulSoup(response.text, features="html.parser")
+
+@dataclasses.dataclass()
+class AsyncHttpClient(ResponseMixin):
+    """The async twin of HttpClient. Create instances with HttpClientPool.open_async()."""
+
+    client: hishel.AsyncCacheClient
+
+    cache_policy: typing.ClassVar[CachePolicy] = CachePolicy()
+
+    # Background refreshes of stale responses, which are finished before the client is closed.
+    _refreshes: dict[tuple[typing.Any, ...], asyncio.Task] = dataclasses.field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        if self._refreshes:
+            await asyncio.wait(self._refreshes.values())
+        await self.client.aclose()
+
+    async def get(
+        self,
+        url: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
+        response = await self._get(url, params, headers)
+        state = self.cache_policy.state(response)
+
+        if state == "stale":
+            self._refresh_in_background(url, params, headers)
+        elif state == "expired":
+            try:
+                return await self._get(url, params, headers, refresh=True)
+            except (httpx.TransportError, httpx.HTTPStatusError) as error:
+                if not self.cache_policy.usable_on_error(response):
+                    raise
+                logger.warning("Using stale response after error", url=str(response.url), error=repr(error))
+
+        self._debug(response)
+        response.raise_for_status()
+        return response
+
+    async def _get(
+        self,
+        url: str,
+        params: dict[str, str] | None,
+        headers: dict[str, str] | None,
+        refresh: bool = False,
+    ) -> httpx.Response:
+        extensions = self.cache_policy.extensions(refresh=refresh)
+        response = await self.client.get(url, params=params, headers=headers, follow_redirects=True, extensions=extensions)
+        if refresh:
+            self._debug(response)
+            response.raise_for_status()
+        return response
+
+    def _refresh_in_background(self, url: str, params: dict[str, str] | None, headers: dict[str, str] | None) -> None:
+        key = (url, repr(params), repr(headers))
+        if key in self._refreshes:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._get(url, params, headers, refresh=True)
+            except httpx.HTTPError as error:
+                logger.warning("Failed to refresh stale response", url=url, error=repr(error))
+            finally:
+                del self._refreshes[key]
+
+        logger.info("Refreshing stale response in the background", url=url)
+        self._refreshes[key] = asyncio.create_task(refresh())
+
+    async def head(self, url: str) -> httpx.Response:
+        response = await self.client.head(url)
+        self._debug(response)
+        response.raise_for_status()
+        return response
+
+    async def soup(self, url: str, **kwargs: typing.Any) -> bs4.BeautifulSoup:
+        return self.request_into_soup(await self.get(url, **kwargs))
@@ -6,13 +6,16 @@ import typing
 import uuid
 
 import structlog
-from sqlalchemy import select
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB
 
+from vancelle.controllers.entry import EntryWriter
+from vancelle.ext.sqlalchemy import instance_to_dict, upsert
 from vancelle.models import User
-from vancelle.models.entry import GoodreadsPrivateBook
+from vancelle.models.entry import Entry, GoodreadsPrivateBook
 from vancelle.models.record import Record
-from vancelle.models.work import Book
+from vancelle.models.work import Book, Work
 from vancelle.extensions import db
 from vancelle.shelf import Shelf
 
@@ -36,24 +39,13 @@ class GoodreadsImporter:
 
         return self.shelf_mapping[exclusive_shelf]
 
-    def load_file(self, path: pathlib.Path) -> typing.Iterable[Book | GoodreadsPrivateBook]:
+    def load_file(self, path: pathlib.Path) -> typing.Iterable[GoodreadsPrivateBook]:
         raise NotImplementedError
 
-    def load_stream(self, stream: typing.IO[bytes], *, filename: str) -> typing.Iterable[Book | GoodreadsPrivateBook]:
+    def load_stream(self, stream: typing.IO[bytes], *, filename: str) -> typing.Iterable[GoodreadsPrivateBook]:
         raise NotImplementedError
 
-    def add_items(self, items: typing.Sequence[Book | GoodreadsPrivateBook]) -> None:
-        db.session.add_all(items)
-        db.session.commit()
-        logger.warning("Imported books from Goodreads", count=len(items))
-
-    def get_entry(self, entry_id: str) -> GoodreadsPrivateBook | None:
-        return db.session.execute(select(GoodreadsPrivateBook).filter_by(id=entry_id)).scalar_one_or_none()
-
-    def get_record(self, record_id: uuid.UUID) -> Record | None:
-        return db.session.get(Record, record_id)
-
-    def _create_or_update(
+    def _build_book(
         self,
         *,
         entry_id: str,
@@ -67,48 +59,87 @@ class GoodreadsImporter:
         date_stopped: datetime.date | None,
         isbn13: str | None,
         data: typing.Mapping[str, typing.Any],
-    ):
-        log = logger.bind(entry_id=entry_id, title=title, author=author)
-        if entry := self.get_entry(entry_id):
-            log.info("Updating existing Goodreads book")
-        else:
-            log.info("Creating new Goodreads book")
-            entry = GoodreadsPrivateBook(id=entry_id)
-
-        if title:
-            entry.title = title
-        if author:
-            entry.author = author
-        if release_date:
-            entry.release_date = release_date
-        if cover:
-            entry.cover = cover
-        if shelf:
-            entry.shelf = shelf
-        if tags:
-            entry.tags = tags
-
-        if entry.data is None:
-            entry.data = {}
-
-        entry.data.update(data)  # type: ignore
-        flag_modified(entry, "data")
-
-        if isbn13:
-            entry.data["isbn13"] = isbn13  # type: ignore
-            flag_modified(entry, "data")
-
-        if not entry.work:
-            work_id = self.reproducible_uuid(entry_id)
-            entry.work = Book(user_id=self.user.id, id=work_id, shelf=shelf)
+    ) -> GoodreadsPrivateBook:
+        """
+        Build a book and its work, which GoodreadsWriter merges into the existing entry if there is one.
+
+        Missing values are None, so that they don't replace values from an earlier import.
+        """
+        work_id = self.reproducible_uuid(entry_id)
+        work = Book(user_id=self.user.id, id=work_id, shelf=shelf)
 
         if date_started or date_stopped:
-            record_id = self.reproducible_uuid(entry_id)
-            record = self.get_record(record_id) or Record(id=record_id)
-            if date_started:
-                record.date_started = date_started
-            if date_stopped:
-                record.date_stopped = date_stopped
-            entry.work.records.append(record)
-
-        return entry
+            work.records.append(
+                Record(id=self.reproducible_uuid(entry_id), date_started=date_started, date_stopped=date_stopped)
+            )
+
+        return GoodreadsPrivateBook(
+            id=entry_id,
+            work_id=work_id,
+            work=work,
+            title=title or None,
+            author=author or None,
+            release_date=release_date,
+            cover=cover or None,
+            shelf=shelf,
+            tags=tags or None,
+            data={**data, "isbn13": isbn13} if isbn13 else dict(data),
+        )
+
+
+class GoodreadsWriter(EntryWriter):
+    """
+    Writes imported books in chunks, with a constant number of statements for each chunk.
+
+    Books that were imported before are merged into their existing entries: values missing from the import are kept,
+    their data is merged, and they stay attached to whatever work they were moved to. New books get the work they were
+    built with. Each book's record is merged into any record from an earlier import.
+    """
+
+    columns = ("type", "id", "work_id", "title", "author", "release_date", "cover", "shelf", "tags", "data")
+    work_columns = ("id", "type", "user_id", "shelf")
+    record_columns = ("id", "work_id", "date_started", "date_stopped")
+
+    def write(self, entries: list[Entry]) -> list[Entry]:
+        statement = select(Entry.id, Entry.work_id).filter(
+            Entry.type == GoodreadsPrivateBook.polymorphic_identity(),
+            Entry.id.in_([entry.id for entry in entries]),
+        )
+        existing = dict(db.session.execute(statement).tuples().all())
+
+        works = [entry.work for entry in entries if entry.id not in existing]
+        records = []
+        for entry in entries:
+            entry.work_id = existing.get(entry.id, entry.work_id)
+            for record in entry.work.records:
+                record.work_id = entry.work_id
+                records.append(record)
+
+        if works:
+            values = [instance_to_dict(work, self.work_columns) for work in works]
+            db.session.execute(postgresql.insert(Work).values(values).on_conflict_do_nothing())
+
+        db.session.execute(upsert(Entry, entries, columns=self.columns, update=self.merge_entry))
+
+        if records:
+            db.session.execute(upsert(Record, records, columns=self.record_columns, update=self.merge_record))
+
+        return entries
+
+    @staticmethod
+    def merge_entry(excluded: typing.Any) -> dict[str, typing.Any]:
+        values: dict[str, typing.Any] = {
+            column: func.coalesce(excluded[column], getattr(Entry, column))
+            for column in ("title", "author", "release_date", "cover", "shelf", "tags")
+        }
+        values["data"] = func.coalesce(Entry.data, literal({}, JSONB)).op("||")(excluded.data)
+        values["time_updated"] = func.now()
+        return values
+
+    @staticmethod
+    def merge_record(excluded: typing.Any) -> dict[str, typing.Any]:
+        return {
+            "date_started": func.coalesce(excluded.date_started, Record.date_started),
+            "date_stopped": func.coalesce(excluded.date_stopped, Record.date_stopped),
+            "time_updated": func.now(),
+        }
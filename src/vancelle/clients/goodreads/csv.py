@@ -42,7 +42,7 @@ class GoodreadsCsvImporter(GoodreadsImporter):
         date_read = self.parse_date_optional(row["Date Read"])
         isbn13 = self.parse_isbn(row["ISBN13"])
 
-        return self._create_or_update(
+        return self._build_book(
             entry_id=id,
             title=title,
             author=author,
@@ -55,6 +55,9 @@ class GoodreadsHtmlImporter(GoodreadsImporter):
         with path.open("r") as f:
             yield from self.parse_markup(markup=f, filename=path.name)
 
+    def load_stream(self, stream: typing.IO[bytes], *, filename: str) -> typing.Iterable[GoodreadsPrivateBook]:
+        yield from self.parse_markup(markup=stream, filename=filename)
+
     def parse_markup(
         self, markup: str | typing.IO[str] | typing.IO[bytes], *, filename: str
     ) -> typing.Iterable[GoodreadsPrivateBook]:
@@ -152,7 +155,7 @@ class GoodreadsHtmlImporter(GoodreadsImporter):
         release_date = date_pub_edition or date_pub or None
         shelf = self.parse_shelf(exclusive_shelf, release_date)
 
-        return self._create_or_update(
+        return self._build_book(
             entry_id=resource_id,
             title=title,
             author=author,
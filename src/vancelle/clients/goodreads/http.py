@@ -3,11 +3,12 @@ import json
 import re
 import typing
 
-import hishel
+import bs4
+import flask
 import structlog
-import svcs.flask
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
 from vancelle.clients.common import parse_date
 from vancelle.models.entry import GoodreadsPublicBook
 
@@ -50,14 +51,21 @@ GoodreadsBookSchema = typing.TypedDict(
 
 
 class GoodreadsPublicScraper(HttpClient):
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=7),
+        stale_while_revalidate=datetime.timedelta(days=30),
+        stale_if_error=datetime.timedelta(days=90),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        builder = svcs_container.get(HttpClientBuilder)
-        return cls(client=hishel.CacheClient(storage=builder.filesystem_storage_for(cls)))
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.cache_client(cls, storage=builder.filesystem_storage_for(cls)))
 
     def fetch(self, id: str) -> GoodreadsPublicBook:
-        soup = self.soup(f"https://www.goodreads.com/book/show/{id}")
+        return self._book(id, self.soup(f"https://www.goodreads.com/book/show/{id}"))
 
+    @classmethod
+    def _book(cls, id: str, soup: bs4.BeautifulSoup) -> GoodreadsPublicBook:
         page = soup.select_one(".BookPage")
         series = page.select_one(".BookPageTitleSection h3 a")
         scraped: dict[str, str] = {
@@ -69,11 +77,11 @@ class GoodreadsPublicScraper(HttpClient):
             "genres": [
                 e.string for e in page.select('[data-testid="genresList"] span.BookPageMetadataSection__genreButton span')
             ],
-            "pagesFormat": self.parse_string(page.select_one('[data-testid="pagesFormat"]')),
-            "publicationInfo": self.parse_string(page.select_one('[data-testid="publicationInfo"]')),
+            "pagesFormat": cls.parse_string(page.select_one('[data-testid="pagesFormat"]')),
+            "publicationInfo": cls.parse_string(page.select_one('[data-testid="publicationInfo"]')),
         }
 
-        release_date = self.parse_date(scraped["publicationInfo"])
+        release_date = cls.parse_date(scraped["publicationInfo"])
         data: GoodreadsBookSchema = json.loads(soup.select_one('script[type="application/ld+json"]').string)
 
         return GoodreadsPublicBook(
@@ -89,7 +97,10 @@ class GoodreadsPublicScraper(HttpClient):
         )
 
     def search(self, q: str) -> typing.Iterable[GoodreadsPublicBook]:
-        soup = self.soup("https://www.goodreads.com/search", params={"q": q})
+        return self._search(self.soup("https://www.goodreads.com/search", params={"q": q}))
+
+    @classmethod
+    def _search(cls, soup: bs4.BeautifulSoup) -> typing.Iterable[GoodreadsPublicBook]:
         for element in soup.select('[itemtype="http://schema.org/Book"]'):
             scraped: dict[str, str] = {
                 "id": element.select_one(".u-anchorTarget").attrs["id"],
@@ -97,7 +108,7 @@ class GoodreadsPublicScraper(HttpClient):
                 "authors": [e.string for e in element.select('span[itemprop="author"] span[itemprop="name"]')],
                 "cover": element.select_one("img.bookCover").attrs["src"],
             }
-            published = self.parse_published(*element.select_one("span.uitext").stripped_strings)
+            published = cls.parse_published(*element.select_one("span.uitext").stripped_strings)
             yield GoodreadsPublicBook(
                 id=scraped["id"],
                 title=scraped["title"],
@@ -109,10 +120,12 @@ class GoodreadsPublicScraper(HttpClient):
 
     RE_PUBLISHED = re.compile(r"published\s+(\d{4})")
 
-    def parse_string(self, element) -> str:
+    @staticmethod
+    def parse_string(element) -> str:
         return element.string if element else None
 
-    def parse_published(self, *strings: str) -> typing.Optional[datetime.date]:
+    @classmethod
+    def parse_published(cls, *strings: str) -> typing.Optional[datetime.date]:
         """
         >>> s = GoodreadsPublicScraper(...)
         >>> s.parse_published('3.61 avg rating — 223 ratings', '—\\n                published\\n               2013\\n              —', '4 editions')
@@ -121,7 +134,7 @@ class GoodreadsPublicScraper(HttpClient):
         True
         """
         for string in strings:
-            if match := self.RE_PUBLISHED.search(string):
+            if match := cls.RE_PUBLISHED.search(string):
                 return datetime.date(year=int(match.group(1)), month=1, day=1)
 
         return None
@@ -142,3 +155,20 @@ class GoodreadsPublicScraper(HttpClient):
                 "Expected publication %B %d, %Y",
             ],
         )
+
+
+class AsyncGoodreadsPublicScraper(AsyncHttpClient):
+    """The async twin of GoodreadsPublicScraper."""
+
+    cache_policy = GoodreadsPublicScraper.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.async_cache_client(cls, storage=builder.async_filesystem_storage_for(cls)))
+
+    async def fetch(self, id: str) -> GoodreadsPublicBook:
+        return GoodreadsPublicScraper._book(id, await self.soup(f"https://www.goodreads.com/book/show/{id}"))
+
+    async def search(self, q: str) -> list[GoodreadsPublicBook]:
+        soup = await self.soup("https://www.goodreads.com/search", params={"q": q})
+        return list(GoodreadsPublicScraper._search(soup))
@@ -1,29 +1,36 @@
+import datetime
 import hashlib
 import pathlib
 import typing
 
 import flask
-import hishel
 import httpx
 import structlog
-import svcs
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
 
 logger = structlog.get_logger(logger_name=__name__)
 
 
 class ImageCache(HttpClient):
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=30),
+        stale_while_revalidate=datetime.timedelta(days=365),
+        stale_if_error=datetime.timedelta(days=365),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        builder = svcs_container.get(HttpClientBuilder)
-        return cls(client=hishel.CacheClient(storage=builder.filesystem_storage_for(cls)))
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.cache_client(cls, storage=builder.filesystem_storage_for(cls)))
 
     def as_response(self, url: str) -> flask.Response:
-        response = self.get(url)
+        return self._as_response(self.get(url))
 
+    @classmethod
+    def _as_response(cls, response: httpx.Response) -> flask.Response:
         headers = dict()
-        headers["Content-Disposition"] = f'attachment; filename="{self.filename(response.url)}"'
+        headers["Content-Disposition"] = f'attachment; filename="{cls.filename(response.url)}"'
 
         for header in ["Content-Type", "Last-Modified"]:
             if last_modified := response.headers.get(header):
@@ -41,3 +48,16 @@ class ImageCache(HttpClient):
         'cover.jpg'
         """
         return pathlib.Path(url.path).name
+
+
+class AsyncImageCache(AsyncHttpClient):
+    """The async twin of ImageCache."""
+
+    cache_policy = ImageCache.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.async_cache_client(cls, storage=builder.async_filesystem_storage_for(cls)))
+
+    async def as_response(self, url: str) -> flask.Response:
+        return ImageCache._as_response(await self.get(url))
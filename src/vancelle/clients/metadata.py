@@ -0,0 +1,96 @@
+import contextlib
+import datetime
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+import structlog
+
+logger = structlog.get_logger(logger_name=__name__)
+
+T = typing.TypeVar("T")
+
+
+class MetadataCache:
+    """
+    Small, slow-changing metadata that clients need before they can build results, like TMDB's image configuration.
+
+    Values are shared between workers through a SQLite file, and kept in memory by each process. Reading a value never
+    waits on the network: a stale value is returned while a background thread refreshes it, and the caller's default
+    is returned until the first refresh has finished.
+    """
+
+    def __init__(self, path: pathlib.Path, ttl: datetime.timedelta = datetime.timedelta(days=1)) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._memory: dict[str, tuple[float, typing.Any]] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL, time_fetched REAL NOT NULL)"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        # A connection per use is cheap, and safe to use from background threads and forked workers.
+        with contextlib.closing(sqlite3.connect(self.path)) as connection, connection:
+            yield connection
+
+    def get(self, key: str, default: T, refresh: typing.Callable[[], T]) -> T:
+        entry = self._memory.get(key)
+
+        if entry is None or self._expired(entry):
+            # Until the refresh finishes there's nothing newer to load, so callers don't each open the database.
+            with self._lock:
+                if key in self._refreshing:
+                    return default if entry is None else entry[1]
+
+            entry = self._load(key) or entry
+            if entry is not None:
+                self._memory[key] = entry
+            if entry is None or self._expired(entry):
+                self._refresh_in_background(key, refresh)
+
+        return default if entry is None else entry[1]
+
+    def set(self, key: str, value: typing.Any) -> None:
+        entry = (time.time(), value)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (key, value, time_fetched) VALUES (?, ?, ?)",
+                (key, json.dumps(value), entry[0]),
+            )
+        self._memory[key] = entry
+
+    def refresh(self, key: str, refresh: typing.Callable[[], T]) -> None:
+        log = logger.bind(key=key)
+        try:
+            self.set(key, refresh())
+        except Exception:
+            log.exception("Failed to refresh metadata")
+        else:
+            log.info("Refreshed metadata")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh_in_background(self, key: str, refresh: typing.Callable[[], T]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        threading.Thread(target=self.refresh, args=(key, refresh), name=f"refresh-{key}", daemon=True).start()
+
+    def _load(self, key: str) -> tuple[float, typing.Any] | None:
+        with self._connect() as connection:
+            row = connection.execute("SELECT time_fetched, value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (row[0], json.loads(row[1]))
+
+    def _expired(self, entry: tuple[float, typing.Any]) -> bool:
+        return time.time() - entry[0] > self.ttl.total_seconds()
@@ -0,0 +1,63 @@
+import datetime
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+import structlog
+
+from vancelle.clients.openlibrary.types import Author
+
+logger = structlog.get_logger(logger_name=__name__)
+
+
+class AuthorCache:
+    """
+    Open Library authors, stored in SQLite separately from the HTTP cache.
+
+    Author records rarely change and are shared by every work and edition they wrote. Keeping them here means they
+    outlive both the request and the HTTP cache's freshness rules.
+    """
+
+    def __init__(self, path: pathlib.Path, max_age: datetime.timedelta = datetime.timedelta(days=30)) -> None:
+        self.max_age = max_age
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS authors (key TEXT PRIMARY KEY, author TEXT NOT NULL, time_fetched REAL NOT NULL)"
+            )
+
+    def get_many(self, keys: typing.Collection[str]) -> dict[str, Author]:
+        if not keys:
+            return {}
+
+        placeholders = ", ".join("?" for _ in keys)
+        oldest = time.time() - self.max_age.total_seconds()
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT key, author FROM authors WHERE time_fetched > ? AND key IN ({placeholders})",
+                (oldest, *keys),
+            ).fetchall()
+
+        return {key: json.loads(author) for key, author in rows}
+
+    def set_many(self, authors: typing.Mapping[str, Author]) -> None:
+        if not authors:
+            return
+
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO authors (key, author, time_fetched) VALUES (?, ?, ?)",
+                [(key, json.dumps(author), now) for key, author in authors.items()],
+            )
+
+        logger.debug("Cached Open Library authors", count=len(authors))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
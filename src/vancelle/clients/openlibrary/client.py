@@ -1,13 +1,17 @@
+import asyncio
+import concurrent.futures
 import dataclasses
 import datetime
 import typing
 
 import flask
 import hishel
+import httpx
 import structlog
-import svcs
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
+from vancelle.clients.openlibrary.authors import AuthorCache
 from vancelle.clients.common import parse_date
 from vancelle.clients.openlibrary.types import (
     Author,
@@ -19,40 +23,72 @@ from vancelle.clients.openlibrary.types import (
     Work,
     WorkEditions,
 )
+from vancelle.lib.pagination import Pagination
 from vancelle.models.entry import OpenlibraryEdition, OpenlibraryWork
 
 logger = structlog.get_logger(logger_name=__name__)
 
 
+@dataclasses.dataclass()
 class OpenLibraryAPI(HttpClient):
+    client: hishel.CacheClient
+    author_cache: AuthorCache
+
+    # Authors missing from the author cache are fetched in parallel, using at most this many connections.
+    max_author_requests: typing.ClassVar[int] = 8
+
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=1),
+        stale_while_revalidate=datetime.timedelta(days=7),
+        stale_if_error=datetime.timedelta(days=30),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        builder = svcs_container.get(HttpClientBuilder)
-        return cls(client=hishel.CacheClient(storage=builder.sqlite_storage_for(cls)))
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.cache_client(cls, storage=builder.sqlite_storage_for(cls)),
+            author_cache=AuthorCache(builder.cache_directory / "OpenLibraryAuthors.sqlite"),
+        )
+
+    def close(self) -> None:
+        super().close()
+        self.author_cache.close()
 
-    def search(self, q: str) -> list[OpenlibraryWork]:
+    # Only these fields are requested from the Search API, which otherwise returns every field for every doc.
+    search_fields: typing.ClassVar[tuple[str, ...]] = ("key", "title", "author_name")
+
+    def search(self, q: str, *, page: int = 1, per_page: int = 20) -> Pagination[OpenlibraryWork]:
         """
         Open Library Search API.
 
         https://openlibrary.org/dev/docs/api/search
         """
-        response = self.get("https://openlibrary.org/search.json", params={"q": q})
+        response = self.get("https://openlibrary.org/search.json", params=self._search_params(q, page, per_page))
+        return self._search(response, page=page, per_page=per_page)
+
+    @classmethod
+    def _search_params(cls, q: str, page: int, per_page: int) -> dict[str, str]:
+        return {"q": q, "fields": ",".join(cls.search_fields), "page": str(page), "limit": str(per_page)}
+
+    @classmethod
+    def _search(cls, response: httpx.Response, *, page: int, per_page: int) -> Pagination[OpenlibraryWork]:
         data: Search = response.json()
 
-        logger.info("Searched Open Library", numFound=data["numFound"])
+        logger.info("Searched Open Library", numFound=data["numFound"], page=page)
 
-        return [
+        items = [
             OpenlibraryWork(
-                id=self.parse_key("works", doc["key"]),
+                id=cls.parse_key("works", doc["key"]),
                 title=doc["title"],
                 author=", ".join(doc.get("author_name", [])),
                 data={
                     "url": str(response.url),
-                    "doc": data,
+                    "doc": doc,
                 },
             )
             for doc in data["docs"]
         ]
+        return Pagination(items=items, count=data["numFound"], page=page, per_page=per_page)
 
     def work(self, id: str):
         """
@@ -66,9 +102,14 @@ class OpenLibraryAPI(HttpClient):
         response = self.get(f"https://openlibrary.org/works/{id}.json")
         data: Work = response.json()
 
-        id = self.parse_key("works", data["key"])
+        references = [author["author"] for author in data["authors"]]
+        authors = self.authors(self._author_keys(references))
+        return self._work(data, author=self._author_names(references, authors), url=str(response.url))
+
+    @classmethod
+    def _work(cls, data: Work, *, author: str, url: str) -> OpenlibraryWork:
+        id = cls.parse_key("works", data["key"])
         title = data["title"]
-        author = self._author_references([author["author"] for author in data["authors"]])
 
         if d := data.get("description"):
             if isinstance(d, dict):
@@ -80,7 +121,7 @@ class OpenLibraryAPI(HttpClient):
         else:
             raise NotImplementedError
 
-        cover = self.cover_url("ID", data["covers"][0]) if data.get("covers") else None
+        cover = cls.cover_url("ID", data["covers"][0]) if data.get("covers") else None
 
         return OpenlibraryWork(
             id=id,
@@ -88,14 +129,20 @@ class OpenLibraryAPI(HttpClient):
             author=author,
             description=description,
             cover=cover,
-            data={"url": str(response.url), "work": data},
+            data={"url": url, "work": data},
         )
 
-    def _author_references(self, references: list[Reference]) -> str:
-        keys = (self.parse_key("authors", ref["key"]) for ref in references)
-        authors = (self.author(key) for key in keys)
-        names = (author["name"] for author in authors)
-        return ", ".join(names)
+    @classmethod
+    def _author_keys(cls, references: typing.Iterable[Reference]) -> list[str]:
+        return [cls.parse_key("authors", ref["key"]) for ref in references]
+
+    @classmethod
+    def _author_names(cls, references: typing.Iterable[Reference], authors: typing.Mapping[str, Author]) -> str:
+        return ", ".join(authors[key]["name"] for key in cls._author_keys(references))
+
+    @classmethod
+    def _edition_author_keys(cls, editions: typing.Iterable[Edition]) -> list[str]:
+        return cls._author_keys(ref for edition in editions for ref in edition.get("authors", []))
 
     def work_editions(self, id: str) -> list[OpenlibraryEdition]:
         """
@@ -109,7 +156,11 @@ class OpenLibraryAPI(HttpClient):
         editions: WorkEditions = response.json()
 
         logger.info("Fetched editions from Open Library", entries=len(editions["entries"]))
-        return [self._edition(edition, url=str(response.url)) for edition in editions["entries"]]
+        authors = self.authors(self._edition_author_keys(editions["entries"]))
+        return [
+            self._edition(edition, author=self._author_names(edition.get("authors", []), authors), url=str(response.url))
+            for edition in editions["entries"]
+        ]
 
     def edition(self, id: str) -> OpenlibraryEdition:
         """
@@ -123,26 +174,27 @@ class OpenLibraryAPI(HttpClient):
         edition: Edition = response.json()
 
         logger.info("Fetched edition from Open Library", url=response.request.url)
-        return self._edition(edition, url=str(response.url))
+        authors = self.authors(self._edition_author_keys([edition]))
+        return self._edition(edition, author=self._author_names(edition.get("authors", []), authors), url=str(response.url))
 
-    def _edition(self, edition: Edition, *, url: str | None = None) -> OpenlibraryEdition:
+    @classmethod
+    def _edition(cls, edition: Edition, *, author: str, url: str | None = None) -> OpenlibraryEdition:
         if len(edition["works"]) != 1:
             raise Exception(f"Unexpected number of works connected to this edition: {edition['works']}")
 
-        id = self.parse_key("books", edition["key"])
-        _work_id = self.parse_key("works", edition["works"][0]["key"])
+        id = cls.parse_key("books", edition["key"])
+        _work_id = cls.parse_key("works", edition["works"][0]["key"])
         _goodreads_id = edition.get("identifiers", {}).get("goodreads", None)
         _librarything_id = edition.get("identifiers", {}).get("librarything", None)
         title = edition["title"]
-        author = self._author_references(edition.get("authors", []))
-        _publish_date = self.parse_date(edition.get("publish_date", None))
+        _publish_date = cls.parse_date(edition.get("publish_date", None))
         _first_sentence = edition.get("first_sentence", None)
         _number_of_pages = edition.get("number_of_pages", None)
         isbn_13s = edition.get("isbn_13", [])
         covers = edition.get("covers", [])
 
         isbn_13 = isbn_13s[0] if isbn_13s else None
-        cover = self.cover_url("ID", covers[0]) if covers else None
+        cover = cls.cover_url("ID", covers[0]) if covers else None
 
         return OpenlibraryEdition(
             id=id,
@@ -156,10 +208,27 @@ class OpenLibraryAPI(HttpClient):
             },
         )
 
+    def authors(self, ids: typing.Iterable[str]) -> dict[str, Author]:
+        """
+        Resolve many authors at once, e.g. for every edition of a work.
+
+        Each author is looked up once, first in the author cache and then from Open Library in parallel.
+        """
+        ids = set(ids)
+        authors = self.author_cache.get_many(ids)
+
+        if missing := list(ids - authors.keys()):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_author_requests) as executor:
+                fetched = dict(zip(missing, executor.map(self.author, missing)))
+            self.author_cache.set_many(fetched)
+            authors.update(fetched)
+
+        logger.info("Resolved Open Library authors", count=len(ids), fetched=len(missing))
+        return authors
+
     def author(self, id: str) -> Author:
         """
-        TODO: This needs some form of nice cache, handle the case where we fetch a work
-        TODO: and edition in the same request.
+        Fetch a single author, bypassing the author cache. Prefer authors().
 
         https://openlibrary.org/authors/OL1425963A.json
         """
@@ -200,15 +269,86 @@ class OpenLibraryAPI(HttpClient):
 
 
 @dataclasses.dataclass()
-class CachedOpenLibraryClient(OpenLibraryAPI):
-    def author(self, id: str) -> Author:
-        log = logger.bind(id=id)
-        flask.g.setdefault("openlibrary_authors", {})
+class AsyncOpenLibraryAPI(AsyncHttpClient):
+    """The async twin of OpenLibraryAPI."""
 
-        if id not in flask.g.openlibrary_authors:
-            flask.g.openlibrary_authors[id] = super().author(id)
-            log.info("Populated author cache")
-        else:
-            log.info("Used author from cache")
+    client: hishel.AsyncCacheClient
+    author_cache: AuthorCache
+
+    cache_policy = OpenLibraryAPI.cache_policy
+    max_author_requests = OpenLibraryAPI.max_author_requests
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.async_cache_client(cls, storage=await builder.async_sqlite_storage_for(cls)),
+            author_cache=AuthorCache(builder.cache_directory / "OpenLibraryAuthors.sqlite"),
+        )
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        self.author_cache.close()
+
+    async def search(self, q: str, *, page: int = 1, per_page: int = 20) -> Pagination[OpenlibraryWork]:
+        params = OpenLibraryAPI._search_params(q, page, per_page)
+        response = await self.get("https://openlibrary.org/search.json", params=params)
+        return OpenLibraryAPI._search(response, page=page, per_page=per_page)
+
+    async def work(self, id: str) -> OpenlibraryWork:
+        response = await self.get(f"https://openlibrary.org/works/{id}.json")
+        data: Work = response.json()
+
+        references = [author["author"] for author in data["authors"]]
+        authors = await self.authors(OpenLibraryAPI._author_keys(references))
+        return OpenLibraryAPI._work(data, author=OpenLibraryAPI._author_names(references, authors), url=str(response.url))
+
+    async def work_editions(self, id: str) -> list[OpenlibraryEdition]:
+        response = await self.get(f"https://openlibrary.org/works/{id}/editions.json")
+        editions: WorkEditions = response.json()
+
+        logger.info("Fetched editions from Open Library", entries=len(editions["entries"]))
+        authors = await self.authors(OpenLibraryAPI._edition_author_keys(editions["entries"]))
+        return [
+            OpenLibraryAPI._edition(
+                edition,
+                author=OpenLibraryAPI._author_names(edition.get("authors", []), authors),
+                url=str(response.url),
+            )
+            for edition in editions["entries"]
+        ]
+
+    async def edition(self, id: str) -> OpenlibraryEdition:
+        response = await self.get(f"https://openlibrary.org/books/{id}.json")
+        edition: Edition = response.json()
+
+        logger.info("Fetched edition from Open Library", url=response.request.url)
+        authors = await self.authors(OpenLibraryAPI._edition_author_keys([edition]))
+        author = OpenLibraryAPI._author_names(edition.get("authors", []), authors)
+        return OpenLibraryAPI._edition(edition, author=author, url=str(response.url))
+
+    async def authors(self, ids: typing.Iterable[str]) -> dict[str, Author]:
+        """
+        Resolve many authors at once, like OpenLibraryAPI.authors(), with up to max_author_requests at a time.
+
+        The author cache is SQLite, so it's read and written in a thread to keep the event loop free.
+        """
+        ids = set(ids)
+        authors = await asyncio.to_thread(self.author_cache.get_many, ids)
+
+        if missing := list(ids - authors.keys()):
+            semaphore = asyncio.Semaphore(self.max_author_requests)
+
+            async def fetch(key: str) -> Author:
+                async with semaphore:
+                    return await self.author(key)
+
+            fetched = dict(zip(missing, await asyncio.gather(*(fetch(key) for key in missing))))
+            await asyncio.to_thread(self.author_cache.set_many, fetched)
+            authors.update(fetched)
+
+        logger.info("Resolved Open Library authors", count=len(ids), fetched=len(missing))
+        return authors
 
-        return flask.g.openlibrary_authors[id]
+    async def author(self, id: str) -> Author:
+        response = await self.get(f"https://openlibrary.org/authors/{id}.json")
+        return response.json()
@@ -0,0 +1,275 @@
+"""
+Rate limits, retries and circuit breaking for each upstream host.
+
+Policies are applied by a transport underneath the HTTP cache, so responses served from the cache never count against
+a host's rate limit. Every decision is logged with the host it applies to.
+"""
+
+import asyncio
+import dataclasses
+import email.utils
+import random
+import threading
+import time
+import typing
+
+import httpx
+import structlog
+
+logger = structlog.get_logger(logger_name=__name__)
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpen(httpx.TransportError):
+    """Raised instead of sending a request to a host that has recently failed too often."""
+
+
+@dataclasses.dataclass(frozen=True)
+class HostPolicy:
+    # Token bucket: a sustained rate in requests per second, allowing bursts of up to `burst` requests.
+    rate: float = 10.0
+    burst: int = 10
+
+    # Retries for 429 and 5xx responses and transport errors, with exponential backoff and full jitter.
+    retries: int = 2
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+    # Open the circuit after this many consecutive failures, and try the host again after `reset_after` seconds.
+    failure_threshold: int = 5
+    reset_after: float = 60.0
+
+    @classmethod
+    def from_config(cls, config: typing.Mapping[str, typing.Any]) -> typing.Self:
+        return cls(**config)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, reset_after: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Closed circuits allow every request. An open circuit allows one trial request once `reset_after` passes."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after:
+                return False
+            self._opened_at = time.monotonic()
+            return True
+
+    def record(self, success: bool) -> str | None:
+        """Returns 'opened' or 'closed' when the state of the circuit changes."""
+        with self._lock:
+            if success:
+                closed = self._opened_at is not None
+                self._failures = 0
+                self._opened_at = None
+                return "closed" if closed else None
+
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                opened = self._opened_at is None
+                self._opened_at = time.monotonic()
+                return "opened" if opened else None
+
+            return None
+
+
+class HostPolicies:
+    """The policy, token bucket and circuit breaker for each host, shared by every client in the process."""
+
+    def __init__(
+        self,
+        default: HostPolicy = HostPolicy(),
+        hosts: typing.Mapping[str, HostPolicy] | None = None,
+    ) -> None:
+        self.default = default
+        self.hosts = dict(hosts or {})
+        self._state: dict[str, tuple[HostPolicy, TokenBucket, CircuitBreaker]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: typing.Mapping[str, typing.Mapping[str, typing.Any]]) -> typing.Self:
+        """Build policies from a mapping of hosts to HostPolicy fields, where the '*' host sets the default."""
+        default = HostPolicy.from_config(config.get("*", {}))
+        hosts = {host: dataclasses.replace(default, **fields) for host, fields in config.items() if host != "*"}
+        return cls(default, hosts)
+
+    def state(self, host: str) -> tuple[HostPolicy, TokenBucket, CircuitBreaker]:
+        with self._lock:
+            if host not in self._state:
+                policy = self.hosts.get(host, self.default)
+                bucket = TokenBucket(policy.rate, policy.burst)
+                breaker = CircuitBreaker(policy.failure_threshold, policy.reset_after)
+                self._state[host] = (policy, bucket, breaker)
+            return self._state[host]
+
+
+@dataclasses.dataclass()
+class _Attempt:
+    """Decides what happens around each attempt at a request, shared by the sync and async transports."""
+
+    policies: HostPolicies
+    request: httpx.Request
+
+    def __post_init__(self) -> None:
+        self.host = self.request.url.host
+        self.policy, self.bucket, self.breaker = self.policies.state(self.host)
+        self.log = logger.bind(host=self.host, method=self.request.method, url=str(self.request.url))
+        self.attempt = 0
+
+    def before(self) -> float:
+        """Raises CircuitOpen, or returns how long to wait for the rate limit."""
+        if not self.breaker.allow():
+            self.log.warning("Circuit open, failing fast", reset_after=self.policy.reset_after)
+            raise CircuitOpen(f"Circuit open for {self.host}", request=self.request)
+
+        delay = self.bucket.reserve()
+        if delay > 0:
+            self.log.info("Rate limited request", delay=round(delay, 3), rate=self.policy.rate)
+        return delay
+
+    def after(self, result: httpx.Response | httpx.TransportError) -> float | None:
+        """Returns how long to wait before retrying, or None if the result should be returned (or raised)."""
+        response = result if isinstance(result, httpx.Response) else None
+        error = result if isinstance(result, httpx.TransportError) else None
+        failed = response is None or response.status_code in RETRY_STATUS_CODES
+        self._record(not failed or (response is not None and response.status_code == 429))
+
+        if not failed or self.attempt >= self.policy.retries:
+            if failed:
+                self.log.warning("Giving up on request", attempts=self.attempt + 1, status_code=_status(response))
+            return None
+
+        delay = self._retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.policy.max_backoff, self.policy.backoff * 2**self.attempt))
+        elif delay > self.policy.max_backoff:
+            self.log.warning("Not retrying, Retry-After is too long", retry_after=delay)
+            return None
+
+        self.attempt += 1
+        self.log.warning(
+            "Retrying request",
+            attempt=self.attempt,
+            delay=round(delay, 3),
+            status_code=_status(response),
+            error=repr(error) if error else None,
+        )
+        return delay
+
+    def _record(self, success: bool) -> None:
+        # A 429 means the host is up and asking us to slow down, which the retries handle, so it isn't a failure.
+        if change := self.breaker.record(success):
+            log = self.log.warning if change == "opened" else self.log.info
+            log(f"Circuit {change}", failure_threshold=self.policy.failure_threshold)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response | None) -> float | None:
+        """
+        >>> _Attempt._retry_after(httpx.Response(429, headers={"Retry-After": "3"}))
+        3.0
+        >>> _Attempt._retry_after(httpx.Response(429, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}))
+        0.0
+        >>> _Attempt._retry_after(httpx.Response(503)) is None
+        True
+        """
+        value = response.headers.get("Retry-After") if response is not None else None
+        if value is None:
+            return None
+
+        if value.isdigit():
+            return float(value)
+
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _status(response: httpx.Response | None) -> int | None:
+    return response.status_code if response is not None else None
+
+
+class PolicyTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport, policies: HostPolicies) -> None:
+        self.transport = transport
+        self.policies = policies
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = _Attempt(self.policies, request)
+        while True:
+            time.sleep(attempt.before())
+
+            result: httpx.Response | httpx.TransportError
+            try:
+                result = self.transport.handle_request(request)
+            except httpx.TransportError as error:
+                result = error
+
+            delay = attempt.after(result)
+            if delay is None:
+                if isinstance(result, httpx.TransportError):
+                    raise result
+                return result
+
+            if isinstance(result, httpx.Response):
+                result.close()
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncPolicyTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, policies: HostPolicies) -> None:
+        self.transport = transport
+        self.policies = policies
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = _Attempt(self.policies, request)
+        while True:
+            await asyncio.sleep(attempt.before())
+
+            result: httpx.Response | httpx.TransportError
+            try:
+                result = await self.transport.handle_async_request(request)
+            except httpx.TransportError as error:
+                result = error
+
+            delay = attempt.after(result)
+            if delay is None:
+                if isinstance(result, httpx.TransportError):
+                    raise result
+                return result
+
+            if isinstance(result, httpx.Response):
+                await result.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
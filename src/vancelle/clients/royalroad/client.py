@@ -1,26 +1,34 @@
+import datetime
 import pathlib
 import typing
 
 import bs4
-import hishel
+import flask
 import structlog
-import svcs
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
 from vancelle.models.entry import RoyalroadFiction
 
 logger = structlog.get_logger(logger_name=__name__)
 
 
 class RoyalRoadScraper(HttpClient):
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=1),
+        stale_while_revalidate=datetime.timedelta(days=7),
+        stale_if_error=datetime.timedelta(days=30),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        builder = svcs_container.get(HttpClientBuilder)
-        return cls(client=hishel.CacheClient(storage=builder.sqlite_storage_for(cls)))
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.cache_client(cls, storage=builder.sqlite_storage_for(cls)))
 
     def fiction(self, id: str) -> RoyalroadFiction:
-        response = self.get(f"https://www.royalroad.com/fiction/{id}")
-        soup = bs4.BeautifulSoup(response.text, features="html.parser")
+        return self._fiction(id, self.soup(f"https://www.royalroad.com/fiction/{id}"))
+
+    @staticmethod
+    def _fiction(id: str, soup: bs4.BeautifulSoup) -> RoyalroadFiction:
         return RoyalroadFiction(
             id=id,
             title=soup.select_one(".page-content-inner .fic-title h1").string,
@@ -30,8 +38,10 @@ class RoyalRoadScraper(HttpClient):
         )
 
     def search_fictions(self, title: str) -> typing.Sequence[RoyalroadFiction]:
-        response = self.get("https://www.royalroad.com/fictions/search", params={"title": title})
-        soup = bs4.BeautifulSoup(response.text, features="html.parser")
+        return self._search_fictions(title, self.soup("https://www.royalroad.com/fictions/search", params={"title": title}))
+
+    @staticmethod
+    def _search_fictions(title: str, soup: bs4.BeautifulSoup) -> typing.Sequence[RoyalroadFiction]:
         items = [
             RoyalroadFiction(
                 id=pathlib.PurePath(tag.select_one("h2 a").attrs["href"]).parts[2],
@@ -43,3 +53,20 @@ class RoyalRoadScraper(HttpClient):
         ]
         logger.info("Searched Royal Road", title=title, count=len(items))
         return items
+
+
+class AsyncRoyalRoadScraper(AsyncHttpClient):
+    """The async twin of RoyalRoadScraper."""
+
+    cache_policy = RoyalRoadScraper.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(client=builder.async_cache_client(cls, storage=await builder.async_sqlite_storage_for(cls)))
+
+    async def fiction(self, id: str) -> RoyalroadFiction:
+        return RoyalRoadScraper._fiction(id, await self.soup(f"https://www.royalroad.com/fiction/{id}"))
+
+    async def search_fictions(self, title: str) -> typing.Sequence[RoyalroadFiction]:
+        soup = await self.soup("https://www.royalroad.com/fictions/search", params={"title": title})
+        return RoyalRoadScraper._search_fictions(title, soup)
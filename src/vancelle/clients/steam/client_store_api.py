@@ -1,13 +1,17 @@
+import dataclasses
 import datetime
+import functools
 import typing
 
+import flask
 import hishel
 import httpx
 import structlog
-import svcs
 
-from ..client import HttpClient, HttpClientBuilder
+from ..cache import CachePolicy
+from ..client import AsyncHttpClient, HttpClient, HttpClientBuilder
 from ..common import parse_date
+from ..metadata import MetadataCache
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -63,18 +67,31 @@ class AppDetailsWrapper(typing.TypedDict):
 AppDetailsContainer = typing.NewType("AppDetailsContainer", dict[str, AppDetailsWrapper])
 
 
+@dataclasses.dataclass()
 class SteamStoreAPI(HttpClient):
+    client: hishel.CacheClient
+    metadata_cache: MetadataCache
+
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(hours=12),
+        stale_while_revalidate=datetime.timedelta(days=7),
+        stale_if_error=datetime.timedelta(days=30),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        builder = svcs_container.get(HttpClientBuilder)
-        return cls(client=hishel.CacheClient(storage=builder.sqlite_storage_for(cls)))
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.cache_client(cls, storage=builder.sqlite_storage_for(cls)),
+            metadata_cache=builder.metadata_cache,
+        )
 
     def appdetails(self, appid: str) -> AppDetails | None:
         url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
         response = self.get(url)
-        response.raise_for_status()
-        data: AppDetailsContainer = response.json()
+        return self._appdetails(appid, response.json())
 
+    @staticmethod
+    def _appdetails(appid: str, data: AppDetailsContainer) -> AppDetails | None:
         wrapper = data[appid]
         if not wrapper["success"]:
             logger.warning("Steam appdetails request failed", appid=appid, data=data)
@@ -82,38 +99,95 @@ class SteamStoreAPI(HttpClient):
 
         return wrapper["data"]
 
-    def vertical_capsule(self, app: AppDetails, check: bool = True) -> str | None:
+    def vertical_capsule(
+        self,
+        app: AppDetails,
+        check: bool = True,
+        on_missing: typing.Callable[[str], None] | None = None,
+    ) -> str | None:
         """
         Vertical Capsule. 374px x 448px. Should look like box art.
         Not in the appdetails API.
         https://partner.steamgames.com/doc/store/assets/standard#vertical_capsule
-        """
-        if "fullgame" in app:
-            appid = app["fullgame"]["appid"]
-        else:
-            appid = str(app["steam_appid"])
 
-        url = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_600x900_2x.jpg"
+        Not every app has one. When checking, whether the capsule exists is looked up in the metadata cache, which
+        remembers both answers. Unknown capsules are assumed to exist while a HEAD request checks in the background,
+        so that fetching an app never waits on the CDN. If the CDN answers 404, on_missing is called from the
+        background thread with the URL that was handed out, so it can be cleared from wherever it was stored.
+        """
+        url = self._vertical_capsule_url(app)
+        exists = functools.partial(self._exists, url, on_missing)
 
-        if check:
-            try:
-                self.head(url)
-            except httpx.HTTPStatusError:
-                return None
+        if check and not self.metadata_cache.get(self._capsule_key(app), True, exists):
+            return None
 
         return url
 
+    def _exists(self, url: str, on_missing: typing.Callable[[str], None] | None = None) -> bool:
+        # Only a 404 means the capsule is missing. Other failures raise, so the answer isn't cached and is checked again.
+        try:
+            self.head(url)
+        except httpx.HTTPStatusError as error:
+            if error.response.status_code != httpx.codes.NOT_FOUND:
+                raise
+            if on_missing is not None:
+                on_missing(url)
+            return False
+
+        return True
+
+    @staticmethod
+    def _capsule_key(app: AppDetails) -> str:
+        return f"steam.vertical_capsule.{SteamStoreAPI._capsule_appid(app)}"
+
+    @staticmethod
+    def _capsule_appid(app: AppDetails) -> str:
+        if "fullgame" in app:
+            return app["fullgame"]["appid"]
+
+        return str(app["steam_appid"])
+
+    @staticmethod
+    def _vertical_capsule_url(app: AppDetails) -> str:
+        appid = SteamStoreAPI._capsule_appid(app)
+        return f"https://cdn.cloudflare.steamstatic.com/steam/apps/{appid}/library_600x900_2x.jpg"
+
     @staticmethod
     def parse_release_date(release_date: AppDetailsReleaseDate) -> datetime.date | None:
         """
-        >>> SteamStoreAPI(...).parse_release_date({"coming_soon": True, "date": "Coming soon"}) is None
+        >>> SteamStoreAPI.parse_release_date({"coming_soon": True, "date": "Coming soon"}) is None
         True
-        >>> SteamStoreAPI(...).parse_release_date({"coming_soon": True, "date": "13 Feb, 2024"})
+        >>> SteamStoreAPI.parse_release_date({"coming_soon": True, "date": "13 Feb, 2024"})
         datetime.date(2024, 2, 13)
-        >>> SteamStoreAPI(...).parse_release_date({"coming_soon": False, "date": "20 Jan, 2021"})
+        >>> SteamStoreAPI.parse_release_date({"coming_soon": False, "date": "20 Jan, 2021"})
         datetime.date(2021, 1, 20)
         """
         if release_date["date"] == "Coming soon":
             return None
 
         return parse_date(release_date["date"], ["%d %b, %Y"])
+
+
+@dataclasses.dataclass()
+class AsyncSteamStoreAPI(AsyncHttpClient):
+    """
+    The async twin of SteamStoreAPI.
+
+    Vertical capsules are checked by the pooled SteamStoreAPI, whose HEAD requests run in background threads.
+    """
+
+    client: hishel.AsyncCacheClient
+
+    cache_policy = SteamStoreAPI.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.async_cache_client(cls, storage=await builder.async_sqlite_storage_for(cls)),
+        )
+
+    async def appdetails(self, appid: str) -> AppDetails | None:
+        response = await self.get(f"https://store.steampowered.com/api/appdetails?appids={appid}")
+        return SteamStoreAPI._appdetails(appid, response.json())
+
+    parse_release_date = staticmethod(SteamStoreAPI.parse_release_date)
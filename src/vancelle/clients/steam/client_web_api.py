@@ -1,11 +1,11 @@
+import datetime
 import typing
 
 import flask
-import hishel
 import structlog
-import svcs
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
 
 logger = structlog.get_logger(logger_name=__name__)
 
@@ -24,13 +24,18 @@ class ISteamApps_GetAppList(typing.TypedDict):
 
 
 class SteamWebAPI(HttpClient):
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=1),
+        stale_if_error=datetime.timedelta(days=7),
+    )
+
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        app, builder = svcs_container.get(flask.Flask, HttpClientBuilder)
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
         return cls(
-            client=hishel.CacheClient(
+            client=builder.cache_client(
+                cls,
                 storage=builder.sqlite_storage_for(cls),
-                headers={"key": app.config["STEAM_WEB_API_KEY"]},
+                headers={"key": config["STEAM_WEB_API_KEY"]},
             ),
         )
 
@@ -53,3 +58,30 @@ class SteamWebAPI(HttpClient):
 
         logger.info("Fetched Steam appid list", count=len(apps))
         return apps
+
+
+class AsyncSteamWebAPI(AsyncHttpClient):
+    """The async twin of SteamWebAPI."""
+
+    cache_policy = SteamWebAPI.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.async_cache_client(
+                cls,
+                storage=await builder.async_sqlite_storage_for(cls),
+                headers={"key": config["STEAM_WEB_API_KEY"]},
+            ),
+        )
+
+    async def ISteamApps_GetAppList(self) -> list[ISteamApps_GetAppList_Apps_App]:
+        logger.info("Fetching Steam appid list")
+
+        response = await self.get("https://api.steampowered.com/ISteamApps/GetAppList/v2/")
+
+        data: ISteamApps_GetAppList = response.json()
+        apps = data["applist"]["apps"]
+
+        logger.info("Fetched Steam appid list", count=len(apps))
+        return apps
@@ -0,0 +1,290 @@
+"""
+Maintenance for the HTTP cache: usage statistics, and keeping each client's cache within a byte budget.
+
+hishel never removes anything from a storage that doesn't have its own TTL, so without pruning the cache directory
+grows forever. Pruning is run by `flask cache prune`, which is safe to run while the app is serving requests.
+"""
+
+import contextlib
+import dataclasses
+import datetime
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+import httpx
+import structlog
+
+from vancelle.clients.cache import CachePolicy
+
+logger = structlog.get_logger(logger_name=__name__)
+
+MiB = 1024 * 1024
+
+# Byte budgets for each client's cache, by client name. The '*' client sets the default.
+DEFAULT_CACHE_BUDGETS: typing.Mapping[str, int] = {
+    "*": 256 * MiB,
+    "ImageCache": 2048 * MiB,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheEntry:
+    key: str
+    size: int
+    # When the response was stored, and when it was last used (if it has been since usage was recorded).
+    created: float
+    used: float | None = None
+
+    @property
+    def last_used(self) -> float:
+        return max(self.created, self.used or 0.0)
+
+
+@dataclasses.dataclass(frozen=True)
+class CacheStats:
+    name: str
+    entries: int
+    bytes: int
+    budget: int
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """
+        >>> CacheStats("Example", entries=0, bytes=0, budget=0, hits=3, misses=1).hit_ratio
+        0.75
+        >>> CacheStats("Example", entries=0, bytes=0, budget=0, hits=0, misses=0).hit_ratio is None
+        True
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+class CacheUsage:
+    """
+    Hits, misses and the last use of each cache entry, shared between processes through a SQLite file.
+
+    Usage is counted in memory and written out at most every `flush_every`, so recording it never waits on the disk
+    while serving a request.
+    """
+
+    def __init__(self, path: pathlib.Path, flush_every: datetime.timedelta = datetime.timedelta(seconds=30)) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self._counts: dict[str, tuple[int, int]] = {}
+        self._used: dict[tuple[str, str], float] = {}
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS counts (name TEXT PRIMARY KEY, hits INTEGER NOT NULL, misses INTEGER NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS used (name TEXT, key TEXT, time_used REAL NOT NULL, PRIMARY KEY (name, key))"
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        with contextlib.closing(sqlite3.connect(self.path, timeout=10)) as connection, connection:
+            yield connection
+
+    def record(self, name: str, policy: CachePolicy, response: httpx.Response) -> None:
+        # Refreshes are made on behalf of a request that has already been counted.
+        if response.request.extensions.get("refresh"):
+            return
+
+        hit = bool(response.extensions.get("from_cache")) and policy.state(response) != "expired"
+        with self._lock:
+            hits, misses = self._counts.get(name, (0, 0))
+            self._counts[name] = (hits + 1, misses) if hit else (hits, misses + 1)
+            if hit:
+                self._used[(name, response.extensions["cache_metadata"]["cache_key"])] = time.time()
+            due = time.monotonic() - self._flushed > self.flush_every.total_seconds()
+
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            used, self._used = self._used, {}
+            self._flushed = time.monotonic()
+
+        if not counts and not used:
+            return
+
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT INTO counts (name, hits, misses) VALUES (?, ?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                    [(name, hits, misses) for name, (hits, misses) in counts.items()],
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO used (name, key, time_used) VALUES (?, ?, ?)",
+                    [(name, key, time_used) for (name, key), time_used in used.items()],
+                )
+        except sqlite3.Error:
+            logger.exception("Failed to record cache usage")
+
+    def counts(self, name: str) -> tuple[int, int]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT hits, misses FROM counts WHERE name = ?", (name,)).fetchone()
+        return (0, 0) if row is None else row
+
+    def used(self, name: str) -> dict[str, float]:
+        with self._connect() as connection:
+            return dict(connection.execute("SELECT key, time_used FROM used WHERE name = ?", (name,)).fetchall())
+
+    def forget(self, name: str, keys: typing.Collection[str] | None = None) -> None:
+        """Forget the usage of some entries, or all usage of a client's cache if no keys are given."""
+        with self._connect() as connection:
+            if keys is None:
+                connection.execute("DELETE FROM counts WHERE name = ?", (name,))
+                connection.execute("DELETE FROM used WHERE name = ?", (name,))
+            else:
+                connection.executemany("DELETE FROM used WHERE name = ? AND key = ?", [(name, key) for key in keys])
+
+
+class SQLiteCacheStore:
+    """The entries in a `hishel.SQLiteStorage` database."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+
+    @contextlib.contextmanager
+    def _connect(self) -> typing.Iterator[sqlite3.Connection]:
+        with contextlib.closing(sqlite3.connect(self.path, timeout=10)) as connection, connection:
+            yield connection
+
+    def bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def entries(self) -> list[CacheEntry]:
+        if not self.path.exists():
+            return []
+
+        with self._connect() as connection:
+            rows = connection.execute("SELECT key, length(data), date_created FROM cache").fetchall()
+        return [CacheEntry(key=key, size=size, created=created) for key, size, created in rows]
+
+    def delete(self, keys: typing.Collection[str]) -> None:
+        with self._connect() as connection:
+            connection.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+
+    def compact(self) -> None:
+        """Return the space used by deleted entries to the filesystem, which needs a moment without any writers."""
+        if not self.path.exists():
+            return
+
+        try:
+            with contextlib.closing(sqlite3.connect(self.path, timeout=10, isolation_level=None)) as connection:
+                connection.execute("VACUUM")
+        except sqlite3.OperationalError as error:
+            logger.warning("Could not compact cache", path=str(self.path), error=str(error))
+
+
+class FileCacheStore:
+    """The entries in a `hishel.FileStorage` directory, which uses each file's mtime as its creation time."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+
+    def bytes(self) -> int:
+        return sum(entry.size for entry in self.entries())
+
+    def entries(self) -> list[CacheEntry]:
+        if not self.path.is_dir():
+            return []
+
+        entries = []
+        for file in self.path.iterdir():
+            # hishel keeps a .gitignore next to its entries.
+            if file.name.startswith("."):
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                stat = file.stat()
+                entries.append(CacheEntry(key=file.name, size=stat.st_size, created=stat.st_mtime))
+        return entries
+
+    def delete(self, keys: typing.Collection[str]) -> None:
+        for key in keys:
+            (self.path / key).unlink(missing_ok=True)
+
+    def compact(self) -> None:
+        pass
+
+
+CacheStore = SQLiteCacheStore | FileCacheStore
+
+
+@dataclasses.dataclass()
+class ClientCache:
+    """The cache of a single client, e.g. OpenLibraryAPI.sqlite or the GoodreadsPublicScraper directory."""
+
+    name: str
+    store: CacheStore
+    policy: CachePolicy
+    budget: int
+    usage: CacheUsage
+
+    @classmethod
+    def for_client(cls, cache_directory: pathlib.Path, client: type, budget: int, usage: CacheUsage) -> typing.Self:
+        name = client.__name__.removeprefix("Async")
+        path = cache_directory / f"{name}.sqlite"
+        store = SQLiteCacheStore(path) if path.exists() else FileCacheStore(cache_directory / name)
+        return cls(name=name, store=store, policy=client.cache_policy, budget=budget, usage=usage)
+
+    def stats(self) -> CacheStats:
+        hits, misses = self.usage.counts(self.name)
+        entries = self.store.entries()
+        return CacheStats(self.name, len(entries), self.store.bytes(), self.budget, hits, misses)
+
+    def entries(self) -> list[CacheEntry]:
+        used = self.usage.used(self.name)
+        return [dataclasses.replace(entry, used=used.get(entry.key)) for entry in self.store.entries()]
+
+    def prune(self, *, dry_run: bool = False) -> list[CacheEntry]:
+        """
+        Remove entries that are too old to ever be used again, then the least recently used entries until the cache
+        fits within its budget. Returns the removed entries.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry.last_used)
+        evicted = [entry for entry in entries if self._expired(entry)]
+        remaining = [entry for entry in entries if not self._expired(entry)]
+
+        size = sum(entry.size for entry in remaining)
+        while remaining and size > self.budget:
+            entry = remaining.pop(0)
+            evicted.append(entry)
+            size -= entry.size
+
+        if evicted and not dry_run:
+            keys = [entry.key for entry in evicted]
+            self.store.delete(keys)
+            self.store.compact()
+            self.usage.forget(self.name, keys)
+
+        logger.info("Pruned cache", name=self.name, evicted=len(evicted), bytes=sum(e.size for e in evicted), dry_run=dry_run)
+        return evicted
+
+    def clear(self) -> int:
+        entries = self.store.entries()
+        self.store.delete([entry.key for entry in entries])
+        self.store.compact()
+        self.usage.forget(self.name)
+        logger.warning("Cleared cache", name=self.name, evicted=len(entries))
+        return len(entries)
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        """Entries past their TTL and every grace period would always be fetched again instead of being used."""
+        if self.policy.ttl is None:
+            return False
+
+        grace = max(self.policy.stale_while_revalidate, self.policy.stale_if_error)
+        return time.time() - entry.created > (self.policy.ttl + grace).total_seconds()
@@ -1,13 +1,13 @@
 import dataclasses
 import datetime
-import functools
 import typing
 
 import flask
 import hishel
-import svcs
 
-from vancelle.clients.client import HttpClient, HttpClientBuilder
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import AsyncHttpClient, HttpClient, HttpClientBuilder
+from vancelle.clients.metadata import MetadataCache
 from vancelle.ext.httpx import BearerAuth
 
 
@@ -25,6 +25,22 @@ class Configuration(typing.TypedDict):
     images: ConfigurationImages
 
 
+# Used until the configuration has been fetched for the first time, so that building image URLs never waits on TMDB.
+DEFAULT_CONFIGURATION: Configuration = {
+    "images": {
+        "base_url": "http://image.tmdb.org/t/p/",
+        "secure_base_url": "https://image.tmdb.org/t/p/",
+        "backdrop_sizes": ["w300", "w780", "w1280", "original"],
+        "logo_sizes": ["w45", "w92", "w154", "w185", "w300", "w500", "original"],
+        "poster_sizes": ["w92", "w154", "w185", "w342", "w500", "w780", "original"],
+        "profile_sizes": ["w45", "w185", "h632", "original"],
+        "still_sizes": ["w92", "w185", "w300", "original"],
+    }
+}
+
+CONFIGURATION_URL = "https://api.themoviedb.org/3/configuration"
+
+
 class Genre(typing.TypedDict):
     """https://developer.themoviedb.org/reference/movie-details"""
 
@@ -167,25 +183,32 @@ class SearchTvResults(typing.TypedDict):
 @dataclasses.dataclass()
 class TmdbAPI(HttpClient):
     client: hishel.CacheClient
+    metadata_cache: MetadataCache
+
+    cache_policy = CachePolicy(
+        ttl=datetime.timedelta(days=1),
+        stale_while_revalidate=datetime.timedelta(days=7),
+        stale_if_error=datetime.timedelta(days=30),
+    )
 
     @classmethod
-    def factory(cls, svcs_container: svcs.Container) -> typing.Self:
-        app, builder = svcs_container.get(flask.Flask, HttpClientBuilder)
+    def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
         return cls(
-            client=hishel.CacheClient(
+            client=builder.cache_client(
+                cls,
                 storage=builder.sqlite_storage_for(cls),
-                auth=BearerAuth(app.config["TMDB_READ_ACCESS_TOKEN"]),
+                auth=BearerAuth(config["TMDB_READ_ACCESS_TOKEN"]),
             ),
+            metadata_cache=builder.metadata_cache,
         )
 
-    @functools.cached_property
+    @property
     def configuration(self) -> Configuration:
-        response = self.get(
-            "https://api.themoviedb.org/3/configuration",
-            headers={"Accept": "application/json"},
-        )
-        response.raise_for_status()
-        return response.json()
+        """https://developer.themoviedb.org/reference/configuration-details"""
+        return self.metadata_cache.get("tmdb.configuration", DEFAULT_CONFIGURATION, self._fetch_configuration)
+
+    def _fetch_configuration(self) -> Configuration:
+        return self.get(CONFIGURATION_URL, headers={"Accept": "application/json"}).json()
 
     def search_movies(self, query: str, page: int) -> SearchMovieResults:
         """https://developer.themoviedb.org/reference/search-movie"""
@@ -237,14 +260,62 @@ class TmdbAPI(HttpClient):
         """
         https://developer.themoviedb.org/docs/image-basics
         """
+        return self.image_url(self.configuration, file_path, file_size)
+
+    @staticmethod
+    def image_url(configuration: Configuration, file_path: str | None, file_size: str) -> str | None:
         if file_path is None:
             return None
 
-        base_url = self.configuration["images"]["base_url"]
+        base_url = configuration["images"]["base_url"]
         return base_url + file_size + file_path
 
-    def release_date(self, release_date: str) -> datetime.date | None:
+    @staticmethod
+    def release_date(release_date: str) -> datetime.date | None:
         if not release_date:
             return None
 
         return datetime.datetime.strptime(release_date, "%Y-%m-%d").date()
+
+
+@dataclasses.dataclass()
+class AsyncTmdbAPI(AsyncHttpClient):
+    """
+    The async twin of TmdbAPI, for searches.
+
+    Image URLs need TMDB's configuration, which is fetched and cached by the pooled TmdbAPI, so build them with that.
+    """
+
+    client: hishel.AsyncCacheClient
+
+    cache_policy = TmdbAPI.cache_policy
+
+    @classmethod
+    async def build(cls, builder: HttpClientBuilder, config: flask.Config) -> typing.Self:
+        return cls(
+            client=builder.async_cache_client(
+                cls,
+                storage=await builder.async_sqlite_storage_for(cls),
+                auth=BearerAuth(config["TMDB_READ_ACCESS_TOKEN"]),
+            ),
+        )
+
+    async def search_movies(self, query: str, page: int) -> SearchMovieResults:
+        return await self._json("https://api.themoviedb.org/3/search/movie", params=self._search_params(query, page))
+
+    async def movie(self, movie_id: str) -> MovieDetails:
+        return await self._json(f"https://api.themoviedb.org/3/movie/{movie_id}")
+
+    async def search_tv(self, query: str, page: int) -> SearchTvResults:
+        return await self._json("https://api.themoviedb.org/3/search/tv", params=self._search_params(query, page))
+
+    async def tv(self, tv_id: str) -> TvDetails:
+        return await self._json(f"https://api.themoviedb.org/3/tv/{tv_id}")
+
+    async def _json(self, url: str, params: dict[str, str] | None = None) -> typing.Any:
+        response = await self.get(url, params=params, headers={"Accept": "application/json"})
+        return response.json()
+
+    @staticmethod
+    def _search_params(query: str, page: int) -> dict[str, str]:
+        return {"query": query, "include_adult": "false", "language": "en-GB", "page": str(page)}
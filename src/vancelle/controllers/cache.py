@@ -0,0 +1,76 @@
+import collections
+import threading
+import typing
+
+import sqlalchemy.orm
+import structlog
+
+logger = structlog.get_logger(logger_name=__name__)
+
+T = typing.TypeVar("T")
+
+Each = typing.Callable[[T, typing.Callable[[typing.Any], typing.Any]], T]
+
+
+class ResultCache:
+    """
+    An in-process LRU cache for query results.
+
+    Keys should include the user's data version, so that any write makes older results unreachable.
+    Results are stored as detached copies of the loaded instances, and each hit merges them into the
+    current session without querying the database.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: collections.OrderedDict[typing.Hashable, typing.Any] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_or_load(
+        self,
+        session: sqlalchemy.orm.Session,
+        key: typing.Hashable,
+        load: typing.Callable[[], T],
+        each: Each[T],
+    ) -> T:
+        """
+        Return a cached result, or load and cache it.
+
+        'each' rebuilds a result by calling a function on every instance in it,
+        e.g. 'Pagination.map'.
+        """
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                self._items.move_to_end(key)
+
+        if cached is not None:
+            logger.debug("Result cache hit", key=key)
+            return each(cached, lambda instance: session.merge(instance, load=False))
+
+        result = load()
+        self._set(key, self._detach(result, each))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def _set(self, key: typing.Hashable, value: typing.Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    @staticmethod
+    def _detach(result: T, each: Each[T]) -> T:
+        """Copy instances out of the session, so that later changes to the originals can't leak into the cache."""
+        scratch = sqlalchemy.orm.Session()
+        try:
+            return each(result, lambda instance: scratch.merge(instance, load=False))
+        finally:
+            scratch.close()
@@ -1,4 +1,7 @@
 import dataclasses
+import types
+import typing
+import uuid
 
 import flask_login
 import sqlalchemy
@@ -16,13 +19,18 @@ from vancelle.controllers.sources import (
     TmdbTvSeriesSource,
 )
 from vancelle.controllers.sources.goodreads import GoodreadsPrivateBookSource
+from vancelle.controllers.user import UserController
+from vancelle.ext.sqlalchemy import upsert
 from vancelle.extensions import db
 from vancelle.models import User
 from vancelle.models.entry import Entry
+from vancelle.models.loaders import entry_detail, work_refresh
 from vancelle.models.work import Work
 
 logger = structlog.get_logger(logger_name=__name__)
 
+user_controller = UserController()
+
 
 DEFAULT_MANAGERS = (
     GoodreadsPrivateBookSource(),
@@ -39,11 +47,13 @@ DEFAULT_MANAGERS = (
 
 @dataclasses.dataclass(init=False)
 class EntryController:
+    user_controller = UserController()
+
     def get(self, entry_type: str, entry_id: str, *, user: User = flask_login.current_user) -> Entry | None:
         statement = (
             sqlalchemy.select(Entry)
             .join(Work)
-            .options(sqlalchemy.orm.joinedload(Entry.work))
+            .options(*entry_detail())
             .filter(Entry.type == entry_type, Entry.id == entry_id, Work.user_id == user.id)
         )
 
@@ -59,6 +69,7 @@ class EntryController:
         entry = self.get_or_404(entry_type=entry_type, entry_id=entry_id)
         entry.time_deleted = sqlalchemy.func.now()
         db.session.add(entry)
+        self.user_controller.bump_data_version(entry.work.user_id)
         db.session.commit()
         return entry
 
@@ -66,11 +77,152 @@ class EntryController:
         entry = self.get_or_404(entry_type=entry_type, entry_id=entry_id)
         entry.time_deleted = None
         db.session.add(entry)
+        self.user_controller.bump_data_version(entry.work.user_id)
         db.session.commit()
         return entry
 
     def permanently_delete(self, *, entry_type: str, entry_id: str) -> None:
         entry = self.get_or_404(entry_type=entry_type, entry_id=entry_id)
         db.session.delete(entry)
+        self.user_controller.bump_data_version(entry.work.user_id)
         db.session.commit()
         return None
+
+
+class EntryWriter:
+    """
+    Writes fetched entries over their existing rows with batched upserts, a chunk at a time.
+
+    Entries whose content hash matches the stored one haven't changed, and only have the time they were fetched and
+    their validators written, leaving time_updated alone. Changed entries are written with a single INSERT ... ON
+    CONFLICT DO UPDATE, followed by refreshing the stored details of their works and bumping their users' data versions.
+    Each chunk is committed on its own, and the users' counts are rebuilt once when the writer closes. Entries must
+    already have a work_id.
+
+    Subclasses can override write() to write more with each chunk, e.g. the works and records of imported entries.
+    """
+
+    # The columns a source fetches. Others (like time_created and time_deleted) are left as they are.
+    columns: typing.Collection[str] = (
+        "type",
+        "id",
+        "work_id",
+        "time_fetched",
+        "title",
+        "author",
+        "series",
+        "description",
+        "release_date",
+        "cover",
+        "background",
+        "tags",
+        "data",
+        "etag",
+        "last_modified",
+        "content_hash",
+    )
+
+    # The columns written for an entry that was fetched again without changing.
+    fetched_columns: typing.Collection[str] = ("type", "id", "work_id", "time_fetched", "etag", "last_modified")
+
+    def __init__(self, chunk_size: int = 100) -> None:
+        self.chunk_size = chunk_size
+        self.written = 0
+        self.unchanged = 0
+        self._pending: dict[tuple[str, str], Entry] = {}
+        self._touched: set[tuple[str, str]] = set()
+        self._user_ids: set[uuid.UUID] = set()
+
+    def __enter__(self) -> typing.Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: types.TracebackType | None) -> None:
+        if exc_type is None:
+            self.flush()
+        else:
+            db.session.rollback()
+
+        # Chunks that were committed before an error still changed the counts.
+        for user_id in self._user_ids:
+            user_controller.refresh_counts(user_id)
+        db.session.commit()
+
+    def add(self, entry: Entry) -> None:
+        assert entry.work_id is not None, f"{entry!r} has no work_id"
+
+        # A row can only be changed once by each upsert, so the latest version of an entry wins.
+        self._pending[(entry.type, entry.id)] = entry
+        if len(self._pending) + len(self._touched) >= self.chunk_size:
+            self.flush()
+
+    def touch(self, entry_type: str, entry_id: str) -> None:
+        """Record that an entry was checked and hadn't changed upstream (e.g. a 304), without fetching it."""
+        self._touched.add((entry_type, entry_id))
+        if len(self._pending) + len(self._touched) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> int:
+        if not self._pending and not self._touched:
+            return 0
+
+        entries, self._pending = list(self._pending.values()), {}
+        touched, self._touched = self._touched, set()
+
+        changed = self.write(entries) if entries else []
+        if touched:
+            statement = (
+                sqlalchemy.update(Entry)
+                .filter(sqlalchemy.tuple_(Entry.type, Entry.id).in_(touched))
+                .values(time_fetched=sqlalchemy.func.now(), time_updated=Entry.time_updated)  # Skips the onupdate default.
+            )
+            db.session.execute(statement)
+        works = refresh_works({entry.work_id for entry in changed})
+        self._user_ids.update(work.user_id for work in works)
+
+        db.session.commit()
+        unchanged = len(entries) - len(changed) + len(touched)
+        self.written += len(changed)
+        self.unchanged += unchanged
+        logger.info("Wrote entries", count=len(changed), unchanged=unchanged, works=len(works))
+        return len(changed)
+
+    def write(self, entries: list[Entry]) -> list[Entry]:
+        """Write a chunk of entries, returning those that changed."""
+        statement = sqlalchemy.select(Entry.type, Entry.id, Entry.content_hash).filter(
+            sqlalchemy.tuple_(Entry.type, Entry.id).in_([(entry.type, entry.id) for entry in entries])
+        )
+        stored = {(entry_type, entry_id): content_hash for entry_type, entry_id, content_hash in db.session.execute(statement)}
+
+        changed: list[Entry] = []
+        unchanged: list[Entry] = []
+        for entry in entries:
+            content_hash = stored.get((entry.type, entry.id))
+            (unchanged if content_hash and content_hash == entry.content_hash else changed).append(entry)
+
+        if changed:
+            update = {"time_updated": sqlalchemy.func.now()}
+            db.session.execute(upsert(Entry, changed, columns=self.columns, update=update))
+        if unchanged:
+            db.session.execute(upsert(Entry, unchanged, columns=self.fetched_columns))
+
+        return changed
+
+
+def refresh_works(work_ids: typing.Collection[uuid.UUID]) -> typing.Sequence[Work]:
+    """
+    Refresh the stored details of works whose entries or records were written without the ORM (which would otherwise
+    refresh them before each flush), and bump their users' data versions.
+    """
+    if not work_ids:
+        return []
+
+    statement = (
+        sqlalchemy.select(Work).filter(Work.id.in_(work_ids)).options(*work_refresh()).execution_options(populate_existing=True)
+    )
+    works = db.session.execute(statement).scalars().all()
+    for work in works:
+        work.refresh_details()
+    for user_id in {work.user_id for work in works}:
+        user_controller.bump_data_version(user_id)
+
+    return works
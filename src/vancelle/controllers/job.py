@@ -0,0 +1,215 @@
+import dataclasses
+import datetime
+import threading
+import time
+import typing
+import uuid
+
+import flask
+import flask_login
+import sqlalchemy
+import sqlalchemy.orm
+import structlog
+from werkzeug.exceptions import NotFound
+
+from vancelle.extensions import db
+from vancelle.models import Job, User
+
+logger = structlog.get_logger(logger_name=__name__)
+
+# Arguments can hold a whole backup or upload, and only the worker running a job needs them.
+without_arguments = sqlalchemy.orm.defer(Job.arguments, raiseload=True)
+
+
+class Progress:
+    """
+    Reports a running job's progress.
+
+    Progress is written in its own transaction, so it's visible while the job is running and survives the job's own
+    transactions being rolled back. Writes are throttled to one every `interval` seconds.
+    """
+
+    def __init__(self, job_id: uuid.UUID, interval: float = 1.0) -> None:
+        self.job_id = job_id
+        self.interval = interval
+        self._written = 0.0
+
+    def update(self, progress: int, total: int | None = None, message: str | None = None, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._written < self.interval and progress != total:
+            return
+
+        values: dict[str, typing.Any] = {"progress": progress, "time_updated": sqlalchemy.func.now()}
+        if total is not None:
+            values["total"] = total
+        if message is not None:
+            values["message"] = message
+
+        with db.engine.begin() as connection:
+            connection.execute(sqlalchemy.update(Job).filter_by(id=self.job_id).values(values))
+        self._written = now
+
+
+@dataclasses.dataclass(frozen=True)
+class Task:
+    kind: str
+    title: str
+    function: typing.Callable[[Job, Progress], str | None]
+
+
+TASKS: dict[str, Task] = {}
+
+
+def task(kind: str, title: str) -> typing.Callable[[typing.Callable[[Job, Progress], str | None]], Task]:
+    """
+    Register a function that runs jobs of some kind. It's given the job (for its arguments and user) and a Progress,
+    and can return a message to show when the job succeeds.
+    """
+
+    def decorator(function: typing.Callable[[Job, Progress], str | None]) -> Task:
+        TASKS[kind] = Task(kind=kind, title=title, function=function)
+        return TASKS[kind]
+
+    return decorator
+
+
+class JobController:
+    def enqueue(self, task: Task, *, user: User | None, **arguments: typing.Any) -> Job:
+        """Queue a job, unless the same job is already waiting to run (e.g. because a button was clicked twice)."""
+        arguments_hash = Job.hash_arguments(arguments)
+        statement = sqlalchemy.select(Job).filter(
+            Job.kind == task.kind,
+            Job.user_id == (user.id if user else None),
+            Job.arguments_hash == arguments_hash,
+            Job.status == "queued",
+        )
+        if job := db.session.execute(statement.options(without_arguments).limit(1)).scalar_one_or_none():
+            logger.info("Job is already queued", job=job)
+            return job
+
+        job = Job(
+            kind=task.kind,
+            title=task.title,
+            user_id=user.id if user else None,
+            arguments=arguments,
+            arguments_hash=arguments_hash,
+        )
+        db.session.add(job)
+        db.session.commit()
+        logger.info("Queued job", job=job)
+        return job
+
+    def get_or_404(self, job_id: uuid.UUID, *, user: User = flask_login.current_user) -> Job:
+        statement = sqlalchemy.select(Job).filter_by(id=job_id, user_id=user.id).options(without_arguments)
+        if job := db.session.execute(statement).scalar_one_or_none():
+            return job
+
+        raise NotFound(f"Job {job_id} not found")
+
+    def recent(self, *, user: User = flask_login.current_user, limit: int = 5) -> typing.Sequence[Job]:
+        statement = (
+            sqlalchemy.select(Job)
+            .filter_by(user_id=user.id)
+            .options(without_arguments)
+            .order_by(Job.time_created.desc())
+            .limit(limit)
+        )
+        return db.session.execute(statement).scalars().all()
+
+    def claim(self) -> Job | None:
+        """
+        Mark the oldest queued job as running and return it, skipping jobs that another worker is claiming.
+
+        Jobs left running by a worker that stopped (i.e. not updated for JOB_TIMEOUT) are claimed again, up to
+        JOB_MAX_ATTEMPTS times, after which they're marked as failed.
+        """
+        config = flask.current_app.config
+        abandoned = datetime.datetime.now() - config["JOB_TIMEOUT"]
+
+        given_up = sqlalchemy.update(Job).filter(
+            Job.status == "running",
+            sqlalchemy.func.coalesce(Job.time_updated, Job.time_started) < abandoned,
+            Job.attempts >= config["JOB_MAX_ATTEMPTS"],
+        )
+        db.session.execute(
+            given_up.values(status="failed", message="Job was abandoned too many times.", time_finished=sqlalchemy.func.now())
+        )
+        # Committed on its own, so it isn't rolled back when there's nothing to claim.
+        db.session.commit()
+
+        statement = (
+            sqlalchemy.select(Job)
+            .filter(
+                sqlalchemy.or_(
+                    Job.status == "queued",
+                    sqlalchemy.and_(
+                        Job.status == "running",
+                        sqlalchemy.func.coalesce(Job.time_updated, Job.time_started) < abandoned,
+                        Job.attempts < config["JOB_MAX_ATTEMPTS"],
+                    ),
+                )
+            )
+            .order_by(Job.time_created)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+
+        job = db.session.execute(statement).scalar_one_or_none()
+        if job is None:
+            db.session.rollback()
+            return None
+
+        job.status = "running"
+        job.attempts += 1
+        job.time_started = sqlalchemy.func.now()
+        job.time_updated = sqlalchemy.func.now()
+        db.session.commit()
+        return job
+
+    def run(self, job: Job) -> None:
+        log = logger.bind(job=job.id, kind=job.kind)
+        log.info("Running job", attempt=job.attempts)
+
+        try:
+            message = TASKS[job.kind].function(job, Progress(job.id))
+        except Exception as error:
+            log.exception("Job failed")
+            db.session.rollback()
+            self._finish(job.id, "failed", str(error) or type(error).__name__)
+        else:
+            log.info("Job succeeded", message=message)
+            self._finish(job.id, "succeeded", message)
+
+    def _finish(self, job_id: uuid.UUID, status: str, message: str | None) -> None:
+        values = {"status": status, "time_finished": sqlalchemy.func.now(), "time_updated": sqlalchemy.func.now()}
+        if message is not None:
+            values["message"] = message
+
+        db.session.execute(sqlalchemy.update(Job).filter_by(id=job_id).values(values))
+        db.session.commit()
+
+    def work(self, *, stop: threading.Event, burst: bool = False) -> int:
+        """Claim and run jobs until `stop` is set, or until the queue is empty if `burst` is set. Returns the job count."""
+        interval = flask.current_app.config["JOB_POLL_INTERVAL"]
+
+        count = 0
+        while not stop.is_set():
+            if job := self.claim():
+                self.run(job)
+                count += 1
+            elif burst:
+                break
+            else:
+                stop.wait(interval)
+
+        return count
+
+    def purge(self, older_than: datetime.timedelta) -> int:
+        """Delete finished jobs older than some time."""
+        statement = sqlalchemy.delete(Job).filter(
+            Job.status.in_(["succeeded", "failed"]),
+            Job.time_finished < datetime.datetime.now() - older_than,
+        )
+        count = db.session.execute(statement).rowcount
+        db.session.commit()
+        return count
@@ -6,20 +6,24 @@ import sqlalchemy
 import sqlalchemy.orm
 import werkzeug.exceptions
 
+from vancelle.controllers.user import UserController
 from vancelle.extensions import db
 from vancelle.models import User
+from vancelle.models.loaders import record_detail
 from vancelle.models.record import Record, RelativeDate
 from vancelle.models.work import Work
 
 
 class RecordController:
+    user_controller = UserController()
+
     def get(self, record_id: uuid.UUID, /, *, user: User = flask_login.current_user) -> Record:
         stmt = (
             sqlalchemy.select(Record)
             .filter(Record.id == record_id)
             .join(Work)
             .filter(Work.user_id == user.id)
-            .options(sqlalchemy.orm.joinedload(Record.work))
+            .options(*record_detail())
         )
         return db.session.execute(stmt).scalar_one_or_none()
 
@@ -29,12 +33,26 @@ class RecordController:
 
         raise werkzeug.exceptions.NotFound(f"Record {record_id!r} not found")
 
-    def create(self, work_id: uuid.UUID, *, started: RelativeDate | None, stopped: RelativeDate | None) -> Record:
+    def create(
+        self,
+        work_id: uuid.UUID,
+        *,
+        started: RelativeDate | None,
+        stopped: RelativeDate | None,
+        user: User = flask_login.current_user,
+    ) -> Record:
         record = Record(id=uuid.uuid4(), work_id=work_id)
         record.set_date_started(started)
         record.set_date_stopped(stopped)
 
         db.session.add(record)
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return record
+
+    def save(self, record: Record) -> Record:
+        db.session.add(record)
+        self.user_controller.bump_data_version(record.work.user_id)
         db.session.commit()
         return record
 
@@ -44,6 +62,7 @@ class RecordController:
         record.set_date_stopped(stopped)
 
         db.session.add(record)
+        self.user_controller.bump_data_version(record.work.user_id)
         db.session.commit()
         return record
 
@@ -52,6 +71,7 @@ class RecordController:
         record.time_deleted = datetime.datetime.now()
 
         db.session.add(record)
+        self.user_controller.bump_data_version(record.work.user_id)
         db.session.commit()
         return record
 
@@ -59,6 +79,7 @@ class RecordController:
         record = self.get_or_404(record_id)
 
         db.session.delete(record)
+        self.user_controller.bump_data_version(record.work.user_id)
         db.session.commit()
         return record
 
@@ -66,5 +87,6 @@ class RecordController:
         record = self.get(record_id)
         record.time_deleted = None
         db.session.add(record)
+        self.user_controller.bump_data_version(record.work.user_id)
         db.session.commit()
         return record
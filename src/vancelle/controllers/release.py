@@ -0,0 +1,163 @@
+"""
+Watches works on the UNRELEASED shelf for their release.
+
+Each entry from a source is checked more often as its work's release date gets closer, and works whose release date
+has passed are moved to the RELEASE_WATCH_SHELF shelf.
+"""
+
+import dataclasses
+import datetime
+import typing
+import uuid
+
+import flask
+import sqlalchemy
+import structlog
+
+from vancelle.clients.cache import Validators
+from vancelle.controllers.source import RefreshResult, SourceController, StaleEntry
+from vancelle.controllers.work import WorkController
+from vancelle.extensions import db
+from vancelle.models import Entry, User, Work, WorkDetails
+from vancelle.shelf import Shelf
+
+logger = structlog.get_logger(logger_name=__name__)
+
+# How often to check an entry, by how far away its work's release date is. Works with no known release date are checked
+# as if their release is far away.
+CHECK_INTERVALS: typing.Sequence[tuple[datetime.timedelta, datetime.timedelta]] = (
+    (datetime.timedelta(days=30), datetime.timedelta(days=1)),
+    (datetime.timedelta(days=365), datetime.timedelta(days=7)),
+)
+DEFAULT_CHECK_INTERVAL = datetime.timedelta(days=30)
+
+
+def check_interval(release_date: datetime.date | None, *, today: datetime.date) -> datetime.timedelta:
+    """
+    >>> today = datetime.date(2026, 10, 1)
+    >>> check_interval(datetime.date(2026, 10, 10), today=today).days
+    1
+    >>> check_interval(datetime.date(2027, 3, 1), today=today).days
+    7
+    >>> check_interval(datetime.date(2030, 1, 1), today=today).days
+    30
+    >>> check_interval(None, today=today).days
+    30
+    >>> check_interval(datetime.date(2026, 9, 1), today=today).days
+    0
+    """
+    if release_date is None:
+        return DEFAULT_CHECK_INTERVAL
+
+    if release_date <= today:
+        return datetime.timedelta(0)
+
+    for distance, interval in CHECK_INTERVALS:
+        if release_date - today <= distance:
+            return interval
+
+    return DEFAULT_CHECK_INTERVAL
+
+
+def next_check(
+    release_date: datetime.date | None,
+    time_fetched: datetime.datetime | None,
+    *,
+    today: datetime.date,
+) -> datetime.datetime | None:
+    """
+    When an entry is next due to be checked, or None if it has never been fetched (and is due now).
+
+    >>> next_check(datetime.date(2026, 10, 10), datetime.datetime(2026, 9, 30, 12), today=datetime.date(2026, 10, 1))
+    datetime.datetime(2026, 10, 1, 12, 0)
+    """
+    if time_fetched is None:
+        return None
+
+    return time_fetched + check_interval(release_date, today=today)
+
+
+@dataclasses.dataclass(frozen=True)
+class UnreleasedEntry:
+    """An entry of an unreleased work, and when it's next due to be checked."""
+
+    entry: StaleEntry
+    release_date: datetime.date | None
+    due: datetime.datetime | None
+
+    def is_due(self, now: datetime.datetime) -> bool:
+        return self.due is None or self.due <= now
+
+
+class ReleaseController:
+    source_controller = SourceController()
+    work_controller = WorkController()
+
+    def unreleased_entries(self, *, user: User | None = None) -> list[UnreleasedEntry]:
+        """Every entry from a source on an unreleased work, soonest due first."""
+        release_date = self._release_date()
+        statement = (
+            sqlalchemy.select(
+                Entry.type,
+                Entry.id,
+                Entry.work_id,
+                Entry.etag,
+                Entry.last_modified,
+                Entry.time_fetched,
+                release_date,
+            )
+            .join(Work, Entry.work_id == Work.id)
+            .outerjoin(WorkDetails, WorkDetails.work_id == Work.id)
+            .filter(Work.shelf == Shelf.UNRELEASED, Work.time_deleted.is_(None))
+            .filter(Entry.type.in_(self.source_controller.mapping.keys()), Entry.time_deleted.is_(None))
+        )
+        if user is not None:
+            statement = statement.filter(Work.user_id == user.id)
+
+        today = datetime.date.today()
+        entries = [
+            UnreleasedEntry(
+                entry=StaleEntry(entry_type, entry_id, work_id, Validators(etag=etag, last_modified=last_modified)),
+                release_date=release_date,
+                due=next_check(release_date, time_fetched, today=today),
+            )
+            for entry_type, entry_id, work_id, etag, last_modified, time_fetched, release_date in db.session.execute(statement)
+        ]
+        return sorted(entries, key=lambda e: (e.due is not None, e.due or datetime.datetime.min))
+
+    def due_entries(self, *, user: User | None = None) -> list[StaleEntry]:
+        now = datetime.datetime.now()
+        return [unreleased.entry for unreleased in self.unreleased_entries(user=user) if unreleased.is_due(now)]
+
+    def check(self, entries: typing.Collection[StaleEntry], *, chunk_size: int = 100) -> typing.Iterator[RefreshResult]:
+        """Refresh due entries (e.g. from due_entries()) in chunks, yielding the result for each entry."""
+        yield from self.source_controller.refresh_many(entries, chunk_size=chunk_size)
+
+    def shelve_released(self, *, user: User | None = None) -> int:
+        """Move unreleased works whose release date has passed to the RELEASE_WATCH_SHELF shelf."""
+        shelf = Shelf(flask.current_app.config["RELEASE_WATCH_SHELF"])  # type: ignore[call-arg]
+        statement = (
+            sqlalchemy.select(Work.user_id, Work.id)
+            .outerjoin(WorkDetails, WorkDetails.work_id == Work.id)
+            .filter(Work.shelf == Shelf.UNRELEASED, Work.time_deleted.is_(None))
+            .filter(self._release_date() <= datetime.date.today())
+        )
+        if user is not None:
+            statement = statement.filter(Work.user_id == user.id)
+
+        released: dict[uuid.UUID, list[uuid.UUID]] = {}
+        for user_id, work_id in db.session.execute(statement):
+            released.setdefault(user_id, []).append(work_id)
+
+        moved = 0
+        for user_id, work_ids in released.items():
+            where = sqlalchemy.and_(Work.id.in_(work_ids), Work.shelf == Shelf.UNRELEASED)
+            moved += self.work_controller.bulk_shelve(where, shelf, user=db.session.get_one(User, user_id))
+
+        logger.info("Shelved released works", count=moved, shelf=shelf.value)
+        return moved
+
+    @staticmethod
+    def _release_date() -> sqlalchemy.ColumnElement[datetime.date]:
+        # Works without stored details (i.e. not yet refreshed) fall back to their own release date.
+        return sqlalchemy.func.coalesce(WorkDetails.release_date, Work.release_date)
@@ -6,9 +6,13 @@ import pydantic
 import sqlalchemy
 import structlog
 
+from vancelle.controllers.entry import refresh_works
+from vancelle.controllers.user import UserController
 from vancelle.controllers.sources.steam import SteamApplicationSource
+from vancelle.ext.sqlalchemy import upsert
 from vancelle.extensions import db
 from vancelle.models import Record, Entry, User
+from ..models.loaders import work_export
 from ..models.work import Work
 from ..shelf import Shelf
 
@@ -75,12 +79,10 @@ class BackupModel(pydantic.BaseModel):
 
 
 class UserSettingsController:
+    user_controller = UserController()
+
     def export_json(self, user: User) -> str:
-        works = (
-            db.session.execute(sqlalchemy.select(Work).filter_by(user_id=user.id).options(sqlalchemy.orm.selectinload("*")))
-            .scalars()
-            .all()
-        )
+        works = db.session.execute(sqlalchemy.select(Work).filter_by(user_id=user.id).options(*work_export())).scalars().all()
 
         backup = BackupModel(
             version=2,
@@ -90,26 +92,45 @@ class UserSettingsController:
         logger.warning("Exported", user=user.id, works=len(backup.works))
         return backup.model_dump_json(indent=2)
 
-    def import_json(self, json_data: str, user: User, dry_run: bool = False):
+    def import_json(self, json_data: str, user: User, dry_run: bool = False, chunk_size: int = 100) -> int:
+        """
+        Restore works, records and entries from a backup, overwriting any that already exist.
+
+        Only the columns in the backup are written, and each chunk of works is written with one upsert for each table.
+        """
         backup = BackupModel.model_validate_json(json_data=json_data)
 
         works = [
-            Work(
+            Work.get_subclass(work.type)(
                 **work.model_dump(exclude_unset=True, exclude={"records", "entries"}),
+                user_id=user.id,
                 records=[Record(**r.model_dump(exclude_unset=True)) for r in work.records],
-                entries=[Entry(**r.model_dump(exclude_unset=True)) for r in work.entries],
+                entries=[Entry.get_subclass(e.type)(**e.model_dump(exclude_unset=True)) for e in work.entries],
             )
             for work in backup.works
         ]
 
-        for work in works:
-            work.user = user
-
         if not dry_run:
-            db.session.add_all(works)
+            for start in range(0, len(works), chunk_size):
+                self._write_chunk(works[start : start + chunk_size])
+            self.user_controller.refresh_counts(user.id)
             db.session.commit()
 
         logger.warning("Imported", user=user.id, works=len(works))
+        return len(works)
+
+    @staticmethod
+    def _write_chunk(works: list[Work]) -> None:
+        records = [record for work in works for record in work.records]
+        entries = [entry for work in works for entry in work.entries]
+
+        db.session.execute(upsert(Work, works, columns={"user_id", *WorkModel.model_fields} - {"records", "entries"}))
+        if records:
+            db.session.execute(upsert(Record, records, columns=RecordModel.model_fields.keys()))
+        if entries:
+            db.session.execute(upsert(Entry, entries, columns=EntryModel.model_fields.keys()))
+
+        refresh_works([work.id for work in works])
 
 
 class ApplicationSettingsController:
@@ -1,3 +1,7 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
 import datetime
 import typing
 import uuid
@@ -5,12 +9,19 @@ import uuid
 import flask
 import flask_login
 import frozendict
+import sqlalchemy
 import structlog
+import svcs
 
-from .entry import EntryController
+from werkzeug.exceptions import NotFound
+
+from .entry import EntryController, EntryWriter
 from .sources import Source
+from .user import UserController
 from vancelle.models import Entry, User, Work
 from .work import WorkController
+from ..clients.cache import NotModified, Validators, conditional
+from ..clients.client import HttpClientPool
 from ..extensions import db
 from ..html.vancelle.components.flash import EntryAlreadyExistsFlash
 from ..lib.heavymetal import render
@@ -20,9 +31,37 @@ from ..shelf import Shelf
 logger = structlog.get_logger(logger_name=__name__)
 
 
+@dataclasses.dataclass(frozen=True)
+class SourceResult:
+    """The answer from one source in a federated search: either a page of entries, or an error message."""
+
+    source: Source[typing.Any]
+    items: Pagination[Entry] = dataclasses.field(default_factory=Pagination.empty)
+    error: str | None = None
+
+
+class StaleEntry(typing.NamedTuple):
+    """An entry to refresh, and the validators to refresh it with."""
+
+    entry_type: str
+    entry_id: str
+    work_id: uuid.UUID
+    validators: Validators = Validators()
+
+
+@dataclasses.dataclass(frozen=True)
+class RefreshResult:
+    """The outcome of refreshing one entry from its source."""
+
+    entry_type: str
+    entry_id: str
+    error: str | None = None
+
+
 class SourceController:
     work_controller = WorkController()
     entry_controller = EntryController()
+    user_controller = UserController()
     mapping: typing.Mapping[str, Source] = frozendict.frozendict({
         source.entry_type.polymorphic_identity(): source for source in Source.subclasses()
     })
@@ -34,9 +73,19 @@ class SourceController:
     def source(self, *, entry_type: str) -> Source:
         return self.mapping[entry_type]
 
-    def fetch(self, *, entry_type: str, entry_id: str) -> Entry:
-        entry = self.source(entry_type=entry_type).fetch(entry_id)
+    def fetch(self, *, entry_type: str, entry_id: str, validators: Validators = Validators()) -> Entry:
+        """
+        Fetch an entry from its source, with the validators of its upstream document and a hash of its content.
+
+        With `validators` from an earlier fetch, raises NotModified if the upstream document hasn't changed since.
+        """
+        with conditional(validators) as request:
+            entry = self.source(entry_type=entry_type).fetch(entry_id)
+
         entry.time_fetched = datetime.datetime.now()
+        if request.fetched:
+            entry.etag, entry.last_modified = request.fetched.etag, request.fetched.last_modified
+        entry.content_hash = entry.hash_content()
         return entry
 
     def search(self, *, entry_type: str, query: str) -> Pagination[Entry]:
@@ -47,6 +96,46 @@ class SourceController:
 
         return source.search(query)
 
+    def federated_search(self, *, query: str, timeout: float | None = None) -> typing.Iterator[SourceResult]:
+        """
+        Search every source concurrently, yielding each result as soon as that source answers.
+
+        Each source has `timeout` seconds to answer (the SOURCE_SEARCH_TIMEOUT setting by default). Sources that fail
+        or time out are yielded with an error, so one slow or broken source never holds up the others.
+        """
+        if not query:
+            return
+
+        if timeout is None:
+            timeout = flask.current_app.config["SOURCE_SEARCH_TIMEOUT"]
+
+        pool = svcs.flask.get(HttpClientPool)
+
+        with asyncio.Runner() as runner:
+            loop = runner.get_loop()
+            pending = {loop.create_task(self._search_source(s, query, pool, timeout)) for s in self.sources}
+            while pending:
+                done, pending = runner.run(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+                for task in done:
+                    yield task.result()
+
+    @staticmethod
+    async def _search_source(source: Source[typing.Any], query: str, pool: HttpClientPool, timeout: float) -> SourceResult:
+        log = logger.bind(source=source.polymorphic_identity(), query=query)
+
+        try:
+            async with asyncio.timeout(timeout):
+                items = await source.search_async(query, pool)
+        except TimeoutError:
+            log.warning("Source did not answer before the deadline", timeout=timeout)
+            return SourceResult(source, error=f"No answer within {timeout:g} seconds.")
+        except Exception:
+            log.exception("Source search failed")
+            return SourceResult(source, error="Search failed.")
+
+        log.info("Source answered", count=items.count)
+        return SourceResult(source, items=items)
+
     def import_entry(
         self,
         *,
@@ -78,9 +167,104 @@ class SourceController:
         work.entries.append(entry)
 
         db.session.add(work)
+        self.user_controller.bump_data_version(user.id)
         db.session.commit()
         return work
 
+    def stale_entries(
+        self,
+        *,
+        older_than: datetime.timedelta,
+        entry_types: typing.Collection[str] = (),
+        user: User | None = None,
+        limit: int | None = None,
+    ) -> list[StaleEntry]:
+        """
+        Entries that haven't been fetched within `older_than`, least recently fetched first.
+
+        Only entries from a source are included, and deleted entries and works are skipped.
+        """
+        cutoff = datetime.datetime.now() - older_than
+        statement = (
+            self._select_stale()
+            .filter(Entry.type.in_(entry_types or self.mapping.keys()))
+            .filter(Entry.time_deleted.is_(None), Work.time_deleted.is_(None))
+            .filter(sqlalchemy.or_(Entry.time_fetched.is_(None), Entry.time_fetched < cutoff))
+            .order_by(Entry.time_fetched.asc().nulls_first(), Entry.type, Entry.id)
+            .limit(limit)
+        )
+        if user is not None:
+            statement = statement.filter(Work.user_id == user.id)
+
+        return [self._stale_entry(row) for row in db.session.execute(statement)]
+
+    @staticmethod
+    def _select_stale() -> sqlalchemy.Select:
+        return sqlalchemy.select(Entry.type, Entry.id, Entry.work_id, Entry.etag, Entry.last_modified).join(Work)
+
+    @staticmethod
+    def _stale_entry(row: sqlalchemy.Row) -> StaleEntry:
+        entry_type, entry_id, work_id, etag, last_modified = row
+        return StaleEntry(entry_type, entry_id, work_id, Validators(etag=etag, last_modified=last_modified))
+
+    def refresh_many(
+        self,
+        entries: typing.Collection[StaleEntry],
+        *,
+        chunk_size: int = 100,
+    ) -> typing.Iterator[RefreshResult]:
+        """
+        Refresh entries (e.g. from stale_entries()), yielding the result for each entry as it is fetched.
+
+        Each source fetches up to SOURCE_REFRESH_CONCURRENCY entries at a time (within the rate limits of its host), and
+        results are written in chunks of `chunk_size`. Refreshed entries are no longer stale, so an interrupted refresh
+        resumes where it stopped when it's run again, losing at most one chunk. Entries are fetched with conditional
+        requests, and unchanged entries only have the time they were fetched written.
+        """
+        concurrency = flask.current_app.config["SOURCE_REFRESH_CONCURRENCY"]
+
+        executors = {
+            entry_type: concurrent.futures.ThreadPoolExecutor(concurrency, thread_name_prefix=f"refresh-{entry_type}")
+            for entry_type in {entry.entry_type for entry in entries}
+        }
+        try:
+            # Each fetch runs in a copy of this context, which has the app context that sources get clients from.
+            futures = {
+                executors[stale.entry_type].submit(
+                    contextvars.copy_context().run,
+                    self.fetch,
+                    entry_type=stale.entry_type,
+                    entry_id=stale.entry_id,
+                    validators=stale.validators,
+                ): stale
+                for stale in entries
+            }
+            with EntryWriter(chunk_size=chunk_size) as writer:
+                for future in concurrent.futures.as_completed(futures):
+                    entry_type, entry_id, work_id, _ = futures[future]
+                    try:
+                        entry = future.result()
+                    except NotModified:
+                        writer.touch(entry_type, entry_id)
+                        yield RefreshResult(entry_type, entry_id)
+                        continue
+                    except Exception as error:
+                        logger.warning("Failed to refresh entry", entry_type=entry_type, entry_id=entry_id, error=repr(error))
+                        yield RefreshResult(entry_type, entry_id, error=str(error) or type(error).__name__)
+                        continue
+
+                    if entry.id != entry_id:
+                        logger.warning("Source returned a different entry", entry_type=entry_type, entry_id=entry_id)
+                        yield RefreshResult(entry_type, entry_id, error=f"Source returned entry {entry.id!r}")
+                        continue
+
+                    entry.work_id = work_id
+                    writer.add(entry)
+                    yield RefreshResult(entry_type, entry_id)
+        finally:
+            for executor in executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+
     def _shelve(self, entry: Entry) -> Shelf:
         if not entry.release_date:
             return Shelf.UNRELEASED
@@ -90,16 +274,28 @@ class SourceController:
 
         return Shelf.UNSORTED
 
-    def refresh(self, *, entry_type: str, entry_id: str, user: User = flask_login.current_user) -> Entry:
-        old_entry = self.entry_controller.get_or_404(entry_type, entry_id, user=user)
+    def refresh(self, *, entry_type: str, entry_id: str, user: User = flask_login.current_user) -> Entry | None:
+        """Refresh an entry, returning it if it changed."""
+        statement = self._select_stale().filter(Entry.type == entry_type, Entry.id == entry_id, Work.user_id == user.id)
+        if (row := db.session.execute(statement).one_or_none()) is None:
+            raise NotFound(f"Entry {entry_type!r}:{entry_id!r} not found")
 
-        new_entry = self.fetch(entry_type=entry_type, entry_id=entry_id)
-        new_entry.work_id = old_entry.work_id
+        stale = self._stale_entry(row)
+        new_entry: Entry | None = None
+        with EntryWriter() as writer:
+            try:
+                fetched = self.fetch(entry_type=entry_type, entry_id=entry_id, validators=stale.validators)
+            except NotModified:
+                writer.touch(entry_type, entry_id)
+            else:
+                assert fetched.id == entry_id, f"{fetched.id=} != {entry_id=}"
+                fetched.work_id = stale.work_id
+                writer.add(fetched)
+                new_entry = fetched
 
-        assert new_entry.id == old_entry.id, f"{new_entry.id=} != {old_entry.id=}"
-
-        db.session.merge(new_entry)
-        db.session.commit()
+        if new_entry is None or not writer.written:
+            flask.flash("The entry hasn't changed since it was last fetched.", "Entry is up to date")
+            return None
 
         flask.flash(f"Refreshed {new_entry.resolve_title()}.", "Refreshed entry")
         return new_entry
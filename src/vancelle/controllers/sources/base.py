@@ -1,9 +1,11 @@
 import abc
+import asyncio
 import dataclasses
 import typing
 
 import flask
 
+from vancelle.clients.client import HttpClientPool
 from vancelle.lib.pagination import Pagination
 from vancelle.models import Work
 from vancelle.models.entry import Entry, EntryInfo
@@ -28,10 +30,19 @@ class Source(typing.Generic[E], abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def search(self, query: str) -> Pagination[Entry]:
+    def search(self, query: str) -> Pagination[E]:
         """Return a Pagination object containing Entries."""
         raise NotImplementedError
 
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[E]:
+        """
+        Used by federated search, which queries every source at once.
+
+        Sources with an async client should override this. The default runs search() in a thread, which copies the
+        Flask app and request context along with the other context variables.
+        """
+        return await asyncio.to_thread(self.search, query)
+
     @property
     def name(self) -> str:
         return self.entry_type.info.noun_full
@@ -43,8 +54,13 @@ class Source(typing.Generic[E], abc.ABC):
     def polymorphic_identity(self) -> str:
         return self.entry_type.polymorphic_identity()
 
-    def url_for_search(self, work: Work | None) -> str:
-        return flask.url_for("source.search", entry_type=self.polymorphic_identity(), work_id=work.id if work else None)
+    def url_for_search(self, work: Work | None, query: str | None = None) -> str:
+        return flask.url_for(
+            "source.search",
+            entry_type=self.polymorphic_identity(),
+            work_id=work.id if work else None,
+            search=query or None,
+        )
 
     @classmethod
     def subclasses(cls) -> typing.Sequence["Source"]:
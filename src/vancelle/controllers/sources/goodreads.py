@@ -1,7 +1,8 @@
 import svcs
 
 from .base import Source
-from ...clients.goodreads.http import GoodreadsPublicScraper
+from ...clients.client import HttpClientPool
+from ...clients.goodreads.http import AsyncGoodreadsPublicScraper, GoodreadsPublicScraper
 from ...lib.pagination import Pagination
 
 from ...models.entry import GoodreadsPrivateBook, GoodreadsPublicBook
@@ -30,3 +31,7 @@ class GoodreadsPublicBookSource(Source):
     def search(self, query: str) -> Pagination[GoodreadsPublicBook]:
         goodreads = svcs.flask.get(GoodreadsPublicScraper)
         return Pagination.from_iterable(goodreads.search(query))
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[GoodreadsPublicBook]:
+        async with pool.open_async(AsyncGoodreadsPublicScraper) as goodreads:
+            return Pagination.from_iterable(await goodreads.search(query))
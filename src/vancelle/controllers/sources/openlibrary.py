@@ -3,8 +3,10 @@ import typing
 import svcs
 
 from .base import Source
-from ...clients.openlibrary.client import OpenLibraryAPI
+from ...clients.client import HttpClientPool
+from ...clients.openlibrary.client import AsyncOpenLibraryAPI, OpenLibraryAPI
 from ...lib.pagination import Pagination
+from ...lib.pagination.flask import FlaskPaginationArgs
 from ...models.entry import OpenlibraryEdition, OpenlibraryWork
 from ...models.work import Book
 
@@ -18,8 +20,14 @@ class OpenlibraryWorkSource(Source):
         return openlibrary.work(id=entry_id)
 
     def search(self, query: str) -> Pagination[OpenlibraryWork]:
+        args = FlaskPaginationArgs()
         openlibrary = svcs.flask.get(OpenLibraryAPI)
-        return Pagination.from_iterable(openlibrary.search(q=query))
+        return openlibrary.search(q=query, page=args.page, per_page=args.per_page)
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[OpenlibraryWork]:
+        args = FlaskPaginationArgs()
+        async with pool.open_async(AsyncOpenLibraryAPI) as openlibrary:
+            return await openlibrary.search(q=query, page=args.page, per_page=args.per_page)
 
     def context(self, entry: OpenlibraryWork) -> typing.Mapping[str, typing.Any]:
         openlibrary = svcs.flask.get(OpenLibraryAPI)
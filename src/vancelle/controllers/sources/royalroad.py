@@ -1,7 +1,8 @@
 import svcs
 
 from .base import Source
-from ...clients.royalroad.client import RoyalRoadScraper
+from ...clients.client import HttpClientPool
+from ...clients.royalroad.client import AsyncRoyalRoadScraper, RoyalRoadScraper
 from ...lib.pagination import Pagination
 from ...models.entry import RoyalroadFiction
 from ...models.work import Book
@@ -19,3 +20,8 @@ class RoyalroadFictionSource(Source):
         client = svcs.flask.get(RoyalRoadScraper)
         items = client.search_fictions(title=query)
         return Pagination.from_iterable(items)
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[RoyalroadFiction]:
+        async with pool.open_async(AsyncRoyalRoadScraper) as client:
+            items = await client.search_fictions(title=query)
+        return Pagination.from_iterable(items)
@@ -1,10 +1,14 @@
+import typing
+
+import flask
 import structlog
 import svcs
 from sqlalchemy import desc, func, select
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, joinedload, mapped_column
 
 from .base import Source
+from ..user import UserController
 from ...clients.steam.client_store_api import SteamStoreAPI
 from ...clients.steam.client_web_api import SteamWebAPI
 from ...lib.pagination import Pagination
@@ -17,6 +21,8 @@ from ...models.work import Game
 
 logger = structlog.get_logger(logger_name=__name__)
 
+user_controller = UserController()
+
 
 class SteamAppID(Base):
     __tablename__ = "steam_appids"
@@ -38,7 +44,7 @@ class SteamApplicationSource(Source):
             return SteamApplication(id=entry_id, data={})
 
         release_date = api.parse_release_date(appdetails["release_date"])
-        vertical_capsule = api.vertical_capsule(appdetails, check=True)
+        vertical_capsule = api.vertical_capsule(appdetails, check=True, on_missing=self._forget_cover_later())
         author = p.join(appdetails.get("developers", []))
 
         return SteamApplication(
@@ -52,6 +58,31 @@ class SteamApplicationSource(Source):
             data=appdetails,
         )
 
+    def _forget_cover_later(self) -> typing.Callable[[str], None]:
+        app = flask.current_app._get_current_object()  # type: ignore[attr-defined]
+
+        def forget(url: str) -> None:
+            # Called from the metadata cache's background thread, once the CDN has answered.
+            with app.app_context():
+                self.forget_cover(url)
+
+        return forget
+
+    @staticmethod
+    def forget_cover(url: str) -> None:
+        """Clear a vertical capsule that turned out not to exist from the entries that were stored with it."""
+        statement = select(SteamApplication).filter(SteamApplication.cover == url).options(joinedload(SteamApplication.work))
+        entries = db.session.execute(statement).scalars().all()
+        for entry in entries:
+            entry.cover = None
+
+        # Flushing the entries refreshes their works' stored details.
+        for user_id in {entry.work.user_id for entry in entries if entry.work is not None}:
+            user_controller.bump_data_version(user_id)
+        db.session.commit()
+
+        logger.info("Cleared missing Steam vertical capsule", url=url, count=len(entries))
+
     def search(self, query: str) -> Pagination:
         pagination_args = FlaskPaginationArgs()
 
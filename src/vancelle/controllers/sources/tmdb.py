@@ -1,6 +1,9 @@
+import typing
+
 import svcs
 
-from vancelle.clients.tmdb.client import TmdbAPI
+from vancelle.clients.client import HttpClientPool
+from vancelle.clients.tmdb.client import AsyncTmdbAPI, SearchMovieResults, SearchTvResults, TmdbAPI
 from vancelle.controllers.sources.base import Source
 from ...lib.pagination import Pagination
 from vancelle.inflect import p
@@ -32,14 +35,30 @@ class TmdbMovieSource(Source[TmdbMovie]):
 
         client = svcs.flask.get(TmdbAPI)
         search = client.search_movies(query, page=args.page)
+        return self._search_results(search, args, poster_url=client.poster_url)
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[TmdbMovie]:
+        args = FlaskPaginationArgs(per_page=20, max_per_page=20)
+
+        async with pool.open_async(AsyncTmdbAPI) as client:
+            search = await client.search_movies(query, page=args.page)
+
+        # Image URLs are built from the configuration cached by the pooled sync client.
+        return self._search_results(search, args, poster_url=pool.get(TmdbAPI).poster_url)
 
+    @staticmethod
+    def _search_results(
+        search: SearchMovieResults,
+        args: FlaskPaginationArgs,
+        poster_url: typing.Callable[[str | None], str | None],
+    ) -> Pagination[TmdbMovie]:
         items = [
             TmdbMovie(
                 id=str(data["id"]),
                 title=data["title"],
                 description=data["overview"],
-                cover=client.poster_url(data["poster_path"]),
-                release_date=client.release_date(data.get("release_date")),
+                cover=poster_url(data["poster_path"]),
+                release_date=TmdbAPI.release_date(data.get("release_date")),
             )
             for data in search["results"]
         ]
@@ -70,14 +89,30 @@ class TmdbTvSeriesSource(Source[TmdbTvSeries]):
 
         client = svcs.flask.get(TmdbAPI)
         search = client.search_tv(query, page=args.page)
+        return self._search_results(search, args, poster_url=client.poster_url)
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[TmdbTvSeries]:
+        args = FlaskPaginationArgs(per_page=20, max_per_page=20)
+
+        async with pool.open_async(AsyncTmdbAPI) as client:
+            search = await client.search_tv(query, page=args.page)
+
+        # Image URLs are built from the configuration cached by the pooled sync client.
+        return self._search_results(search, args, poster_url=pool.get(TmdbAPI).poster_url)
 
+    @staticmethod
+    def _search_results(
+        search: SearchTvResults,
+        args: FlaskPaginationArgs,
+        poster_url: typing.Callable[[str | None], str | None],
+    ) -> Pagination[TmdbTvSeries]:
         items = [
             TmdbTvSeries(
                 id=str(data["id"]),
                 title=data["name"],
                 description=data["overview"],
-                cover=client.poster_url(data["poster_path"]),
-                release_date=client.release_date(data.get("first_air_date")),
+                cover=poster_url(data["poster_path"]),
+                release_date=TmdbAPI.release_date(data.get("first_air_date")),
             )
             for data in search["results"]
         ]
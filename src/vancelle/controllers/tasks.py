@@ -0,0 +1,93 @@
+"""
+Tasks run in the background by `flask jobs worker`. Queue them with JobController.enqueue().
+"""
+
+import datetime
+import io
+
+import flask
+
+from vancelle.clients.goodreads.common import GoodreadsImporter, GoodreadsWriter
+from vancelle.clients.goodreads.csv import GoodreadsCsvImporter
+from vancelle.clients.goodreads.html import GoodreadsHtmlImporter
+from vancelle.controllers.job import Progress, task
+from vancelle.controllers.release import ReleaseController
+from vancelle.controllers.settings import ApplicationSettingsController, UserSettingsController
+from vancelle.controllers.source import SourceController
+from vancelle.extensions import db
+from vancelle.inflect import count_plural
+from vancelle.models import Job, User
+
+GOODREADS_IMPORTERS: dict[str, type[GoodreadsImporter]] = {
+    "csv": GoodreadsCsvImporter,
+    "html": GoodreadsHtmlImporter,
+}
+
+
+@task("reload-steam-cache", "Reload the Steam AppID list")
+def reload_steam_cache(job: Job, progress: Progress) -> str | None:
+    ApplicationSettingsController().reload_steam_cache()
+    return None
+
+
+@task("import-backup", "Import a backup")
+def import_backup(job: Job, progress: Progress) -> str | None:
+    user = db.session.get_one(User, job.user_id)
+    count = UserSettingsController().import_json(job.arguments["data"], user=user)
+    return f"Imported {count_plural('work', count)}."
+
+
+@task("import-goodreads", "Import from Goodreads")
+def import_goodreads(job: Job, progress: Progress) -> str | None:
+    importer = GOODREADS_IMPORTERS[job.arguments["format"]](
+        shelf_mapping=flask.current_app.config["GOODREADS_SHELF_MAPPING"],
+        user=db.session.get_one(User, job.user_id),
+    )
+    stream = io.BytesIO(job.arguments["content"].encode("utf-8"))
+    items = list(importer.load_stream(stream, filename=job.arguments["filename"]))
+
+    with GoodreadsWriter() as writer:
+        for index, item in enumerate(items, start=1):
+            writer.add(item)
+            progress.update(index, len(items))
+
+    return f"Imported {count_plural('book', len(items))}."
+
+
+@task("refresh-stale", "Refresh stale entries")
+def refresh_stale(job: Job, progress: Progress) -> str | None:
+    controller = SourceController()
+    stale = controller.stale_entries(
+        older_than=datetime.timedelta(days=job.arguments["days"]),
+        entry_types=job.arguments.get("entry_types", ()),
+        user=db.session.get_one(User, job.user_id) if job.user_id else None,
+    )
+
+    failed = 0
+    progress.update(0, len(stale), force=True)
+    for index, result in enumerate(controller.refresh_many(stale), start=1):
+        failed += result.error is not None
+        progress.update(index, len(stale))
+
+    message = f"Refreshed {count_plural('entry', len(stale) - failed)}"
+    return f"{message}, {failed} failed." if failed else f"{message}."
+
+
+@task("watch-releases", "Check unreleased works for releases")
+def watch_releases(job: Job, progress: Progress) -> str | None:
+    controller = ReleaseController()
+    user = db.session.get_one(User, job.user_id) if job.user_id else None
+    due = controller.due_entries(user=user)
+
+    failed = 0
+    progress.update(0, len(due), force=True)
+    for index, result in enumerate(controller.check(due), start=1):
+        failed += result.error is not None
+        progress.update(index, len(due))
+
+    moved = controller.shelve_released(user=user)
+
+    message = f"Checked {count_plural('entry', len(due) - failed)}"
+    if failed:
+        message += f" ({failed} failed)"
+    return f"{message}, and moved {count_plural('released work', moved)}."
@@ -0,0 +1,44 @@
+import uuid
+
+import sqlalchemy
+
+from vancelle.extensions import db
+from vancelle.models import Entry, User, UserCount, Work
+
+
+class UserController:
+    def bump_data_version(self, user_id: uuid.UUID) -> None:
+        """
+        Increment the user's data version in the current transaction.
+
+        Cached results are keyed by the data version, so this must be called by anything
+        that changes a user's works, entries, or records. The user's counts are kept up to
+        date by triggers on the 'work' and 'remote' tables.
+        """
+        statement = sqlalchemy.update(User).filter_by(id=user_id).values(data_version=User.data_version + 1)
+        db.session.execute(statement)
+
+    def refresh_counts(self, user_id: uuid.UUID) -> None:
+        """
+        Replace the user's UserCount rows, using one INSERT ... SELECT over their works and entries.
+
+        Only used after bulk writes (entry refreshes and imports), to correct the counts from scratch.
+        """
+        counts = sqlalchemy.union_all(
+            self._count_statement("work_type", Work.type).filter(Work.user_id == user_id),
+            self._count_statement("shelf", Work.shelf).filter(Work.user_id == user_id),
+            self._count_statement("entry_type", Entry.type).join(Work).filter(Work.user_id == user_id),
+        )
+        columns = [UserCount.category, UserCount.key, UserCount.count, UserCount.user_id]
+        select = sqlalchemy.select(counts.subquery(), sqlalchemy.literal(user_id, sqlalchemy.Uuid()))
+
+        db.session.execute(sqlalchemy.delete(UserCount).filter_by(user_id=user_id))
+        db.session.execute(sqlalchemy.insert(UserCount).from_select(columns, select))
+
+    @staticmethod
+    def _count_statement(category: str, column: sqlalchemy.orm.InstrumentedAttribute) -> sqlalchemy.Select:
+        return sqlalchemy.select(
+            sqlalchemy.literal(category),
+            sqlalchemy.cast(column, sqlalchemy.String),
+            sqlalchemy.func.count(),
+        ).group_by(column)
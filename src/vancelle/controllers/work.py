@@ -1,23 +1,31 @@
 import dataclasses
 import datetime
+import typing
 import uuid
 
 import flask_login
 import structlog
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, String, all_, bindparam, delete, func, or_, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from werkzeug.exceptions import NotFound
 
+from vancelle.controllers.user import UserController
 from vancelle.extensions import db
-from vancelle.models import User
-from vancelle.models.work import Work
+from vancelle.models import Entry, Record, User
+from vancelle.models.loaders import work_detail
+from vancelle.models.work import Work, WorkDetails
+from vancelle.shelf import Shelf
 
 logger = structlog.get_logger(logger_name=__name__)
 
 
 @dataclasses.dataclass()
 class WorkController:
+    user_controller = UserController()
+
     def get(self, work_id: uuid.UUID, /, *, user: User = flask_login.current_user) -> Work:
-        return db.session.execute(select(Work).filter_by(user_id=user.id, id=work_id)).scalar_one_or_none()
+        statement = select(Work).filter_by(user_id=user.id, id=work_id).options(*work_detail())
+        return db.session.execute(statement).scalar_one_or_none()
 
     def get_or_404(self, work_id: uuid.UUID, /, *, user: User = flask_login.current_user):
         if work := self.get(work_id, user=user):
@@ -25,9 +33,17 @@ class WorkController:
 
         raise NotFound(f"Work {work_id} not found")
 
+    def save(self, work: Work) -> Work:
+        db.session.add(work)
+        db.session.flush()
+        self.user_controller.bump_data_version(work.user_id)
+        db.session.commit()
+        return work
+
     def delete(self, work: Work) -> Work:
         work.time_deleted = datetime.datetime.now()
         db.session.add(work)
+        self.user_controller.bump_data_version(work.user_id)
         db.session.commit()
         assert work.deleted is True
         return work
@@ -35,11 +51,130 @@ class WorkController:
     def restore(self, work: Work) -> Work:
         work.time_deleted = None
         db.session.add(work)
+        self.user_controller.bump_data_version(work.user_id)
         db.session.commit()
         assert work.deleted is False
         return work
 
     def permanently_delete(self, work: Work) -> None:
-        db.session.delete(work)
+        self._purge(Work.id == work.id, user_id=work.user_id)
+        self.user_controller.bump_data_version(work.user_id)
         db.session.commit()
         return None
+
+    def purge_user(self, user: User) -> int:
+        """Permanently delete all of a user's works, returning the number of works deleted."""
+        work_ids = self._purge(true(), user_id=user.id)
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids)
+
+    def purge_deleted(self, older_than: datetime.timedelta, *, user: User = flask_login.current_user) -> int:
+        """
+        Permanently delete works, entries and records that were deleted more than 'older_than' ago,
+        returning the number of rows deleted.
+
+        Works that lose an entry have their details refreshed, as stored details count deleted entries.
+        """
+        cutoff = datetime.datetime.now() - older_than
+        user_work_ids = select(Work.id).filter(Work.user_id == user.id)
+
+        work_ids = self._purge(Work.time_deleted < cutoff, user_id=user.id)
+        entries = db.session.execute(
+            delete(Entry).filter(Entry.work_id.in_(user_work_ids), Entry.time_deleted < cutoff).returning(Entry.work_id),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        entry_work_ids = list(entries.scalars())
+        records = db.session.execute(
+            delete(Record).filter(Record.work_id.in_(user_work_ids), Record.time_deleted < cutoff).returning(Record.id),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        record_ids = list(records.scalars())
+
+        statement = select(Work).filter(Work.id.in_(set(entry_work_ids))).options(*work_detail())
+        for work in db.session.execute(statement).scalars():
+            work.refresh_details()
+
+        logger.info("Purged deleted", works=len(work_ids), entries=len(entry_work_ids), records=len(record_ids))
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids) + len(entry_work_ids) + len(record_ids)
+
+    def bulk_shelve(self, where: ColumnElement[bool], shelf: Shelf, *, user: User = flask_login.current_user) -> int:
+        """Move every work matching 'where' to a shelf, returning the number of works moved."""
+        work_ids = self._bulk_update(where, Work.shelf != shelf, {"shelf": shelf}, user=user)
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids)
+
+    def bulk_delete(self, where: ColumnElement[bool], *, user: User = flask_login.current_user) -> int:
+        work_ids = self._bulk_update(where, Work.time_deleted.is_(None), {"time_deleted": func.now()}, user=user)
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids)
+
+    def bulk_restore(self, where: ColumnElement[bool], *, user: User = flask_login.current_user) -> int:
+        work_ids = self._bulk_update(where, Work.time_deleted.is_not(None), {"time_deleted": None}, user=user)
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids)
+
+    def bulk_tag(
+        self,
+        where: ColumnElement[bool],
+        *,
+        add: typing.Collection[str] = (),
+        remove: typing.Collection[str] = (),
+        user: User = flask_login.current_user,
+    ) -> int:
+        """
+        Add and remove tags on every work matching 'where', returning the number of works updated.
+
+        Stored details take their tags from the work before any of its entries, so they're copied from the work unless
+        it's left without tags, in which case those works have their details refreshed from their entries.
+        """
+        empty = bindparam("empty", [], ARRAY(String))
+        unnest = func.unnest(func.array_cat(func.coalesce(Work.tags, empty), bindparam("add", list(add), ARRAY(String))))
+        tag = unnest.column_valued("tag")
+        tags = (
+            select(func.array_agg(tag.distinct()))
+            .filter(tag != all_(bindparam("remove", list(remove), ARRAY(String))))
+            .scalar_subquery()
+        )
+        work_ids = self._bulk_update(where, true(), {"tags": tags}, user=user)
+
+        db.session.execute(
+            update(WorkDetails)
+            .filter(WorkDetails.work_id == Work.id, Work.id.in_(work_ids), func.cardinality(Work.tags) > 0)
+            .values(tags=Work.tags),
+            execution_options={"synchronize_session": False},
+        )
+        untagged = select(Work).filter(Work.id.in_(work_ids), or_(Work.tags.is_(None), func.cardinality(Work.tags) == 0))
+        for work in db.session.execute(untagged.options(*work_detail())).scalars():
+            work.refresh_details()
+
+        self.user_controller.bump_data_version(user.id)
+        db.session.commit()
+        return len(work_ids)
+
+    @staticmethod
+    def _bulk_update(
+        where: ColumnElement[bool],
+        changes: ColumnElement[bool],
+        values: typing.Mapping[str, typing.Any],
+        *,
+        user: User,
+    ) -> list[uuid.UUID]:
+        """Update the user's works matching 'where' in one statement, skipping any that 'changes' says are already done."""
+        statement = update(Work).filter(Work.user_id == user.id, where, changes).values(values).returning(Work.id)
+        work_ids = list(db.session.execute(statement, execution_options={"synchronize_session": "fetch"}).scalars())
+        logger.info("Updated works", count=len(work_ids), values=list(values))
+        return work_ids
+
+    @staticmethod
+    def _purge(where: ColumnElement[bool], *, user_id: uuid.UUID) -> list[uuid.UUID]:
+        """Delete the user's works matching 'where' in one statement, the database deletes everything attached to them."""
+        statement = delete(Work).filter(Work.user_id == user_id, where).returning(Work.id)
+        work_ids = list(db.session.execute(statement, execution_options={"synchronize_session": "fetch"}).scalars())
+        logger.info("Deleted works", count=len(work_ids))
+        return work_ids
@@ -1,3 +1,4 @@
+import re
 import typing
 
 import sqlalchemy.dialects.postgresql
@@ -11,37 +12,77 @@ import structlog
 logger = structlog.get_logger(logger_name=__name__)
 
 
-def instance_to_dict(instance: sqlalchemy.orm.DeclarativeBase) -> dict:
-    return {attr.key: getattr(instance, attr.key) for attr in sqlalchemy.inspect(instance.__class__).column_attrs}
+def instance_to_dict(
+    instance: sqlalchemy.orm.DeclarativeBase,
+    columns: typing.Collection[str] | None = None,
+) -> dict:
+    attrs = sqlalchemy.inspect(instance.__class__).column_attrs
+    return {attr.key: getattr(instance, attr.key) for attr in attrs if columns is None or attr.key in columns}
 
 
 def upsert(
     table: typing.Type[sqlalchemy.orm.DeclarativeBase],
     instances: sqlalchemy.orm.DeclarativeBase | typing.Sequence[sqlalchemy.orm.DeclarativeBase] = (),
+    *,
+    columns: typing.Collection[str] | None = None,
+    update: typing.Mapping[str, typing.Any] | typing.Callable[..., typing.Mapping[str, typing.Any]] | None = None,
 ) -> sqlalchemy.dialects.postgresql.Insert:
     """
     Perform an INSERT ... ON CONFLICT ... DO UPDATE query, using the table's primary
     keys as the index elements
 
+    If `columns` is given, only those columns are written: the others are left to their
+    defaults when a row is inserted, and left untouched when a row is updated. `update`
+    sets extra values when a row is updated, e.g. `{"time_updated": func.now()}`, and can
+    be a function of the statement's `excluded` columns, for values that combine the
+    existing row with the new one.
+
     https://docs.sqlalchemy.org/en/20/dialects/postgresql.html#insert-on-conflict-upsert
     """
     mapper = sqlalchemy.inspect(table)
     statement = sqlalchemy.dialects.postgresql.insert(table)
 
-    set_ = {attr: statement.excluded[attr.key] for attr in mapper.column_attrs if attr not in mapper.primary_key}
+    set_ = {
+        attr.key: statement.excluded[attr.key]
+        for attr in mapper.column_attrs
+        if attr.columns[0] not in mapper.primary_key and (columns is None or attr.key in columns)
+    }
+    set_.update((update(statement.excluded) if callable(update) else update) or {})
     statement = statement.on_conflict_do_update(index_elements=mapper.primary_key, set_=set_)
 
     if instances:
         values: list[dict[typing.Any, typing.Any]] | dict[typing.Any, typing.Any]
         if isinstance(instances, typing.Sequence):
-            values = [instance_to_dict(instance) for instance in instances]
+            values = [instance_to_dict(instance, columns) for instance in instances]
         else:
-            values = instance_to_dict(instances)
+            values = instance_to_dict(instances, columns)
         statement = statement.values(values)
 
     return statement
 
 
+def prefix_tsquery_text(value: str) -> str:
+    """
+    Build the text of a tsquery that matches every word in 'value' as a prefix,
+    so that partially typed words still match.
+
+    >>> prefix_tsquery_text("Dune Mess")
+    "'dune':* & 'mess':*"
+    >>> prefix_tsquery_text("  children's crusade!  ")
+    "'children':* & 's':* & 'crusade':*"
+    >>> prefix_tsquery_text("!?")
+    ''
+    """
+    return " & ".join(f"'{word}':*" for word in re.findall(r"\w+", value.lower()))
+
+
+def prefix_tsquery(value: str, config: str = "simple") -> sqlalchemy.ColumnElement:
+    """
+    https://www.postgresql.org/docs/current/textsearch-controls.html#TEXTSEARCH-PARSING-QUERIES
+    """
+    return sqlalchemy.func.to_tsquery(config, prefix_tsquery_text(value))
+
+
 class ISBN13(sqlalchemy.types.UserDefinedType):
     cache_ok = True
 
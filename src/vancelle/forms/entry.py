@@ -2,14 +2,14 @@ import flask_login
 import sqlalchemy
 import wtforms.validators
 from sqlalchemy import ColumnElement, Select, True_, desc, select
-from sqlalchemy.orm import joinedload
 
 from vancelle.extensions import db
 
 from .bootstrap import BootstrapMeta
 from .pagination import PaginationArgs
-from vancelle.lib.pagination import Pagination
+from vancelle.lib.pagination import Keyset, Pagination
 from vancelle.models import Entry, Work
+from vancelle.models.loaders import entry_row
 
 
 class EntryIndexArgs(PaginationArgs):
@@ -38,12 +38,13 @@ class EntryIndexArgs(PaginationArgs):
     )
 
     def paginate(self) -> Pagination:
-        return self.query(db.session, self._statement())
+        keyset = Keyset(Entry.time_updated, Entry.time_created, Entry.type, Entry.id)
+        return self.query(db.session, self._statement(), keyset=keyset)
 
     def _statement(self) -> Select[tuple[Entry]]:
         return (
             select(Entry)
-            .options(joinedload(Entry.work))
+            .options(*entry_row())
             .join(Work)
             .filter(Work.user_id == flask_login.current_user.id)
             .filter(self._filter_type(self.entry_type.data))
@@ -1,25 +1,36 @@
 from __future__ import annotations
 
 import sqlalchemy
+import werkzeug.exceptions
 import wtforms
 
-from vancelle.lib.pagination import Pagination
+from vancelle.lib.pagination import InvalidCursor, Keyset, Pagination
 from vancelle.lib.pagination.flask import T
 
 
 class PaginationArgs(wtforms.Form):
     page = wtforms.IntegerField(default=1, validators=[wtforms.validators.NumberRange(min=1)])
     per_page = wtforms.IntegerField(default=10, validators=[wtforms.validators.NumberRange(min=1, max=100)])
+    cursor = wtforms.HiddenField(validators=[wtforms.validators.Optional()])
 
     def query(
         self,
         session: sqlalchemy.orm.Session,
         query_statement: sqlalchemy.Select[tuple[T]],
         count_statement: sqlalchemy.Select[tuple[int]] | None = None,
+        *,
+        keyset: Keyset | None = None,
     ) -> Pagination[T]:
+        """Paginate using LIMIT/OFFSET, or using cursors if a keyset is provided."""
         page = self.page.data
         per_page = self.per_page.data
 
+        if keyset is not None:
+            try:
+                return keyset.query(session, query_statement, count_statement, cursor=self.cursor.data, per_page=per_page)
+            except InvalidCursor as exception:
+                raise werkzeug.exceptions.BadRequest(str(exception))
+
         offset = (page - 1) * per_page
         items_query = query_statement.limit(per_page).offset(offset)
         items = list(session.execute(items_query).unique().scalars())
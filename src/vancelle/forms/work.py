@@ -1,24 +1,27 @@
-import datetime
 import itertools
 import typing
+import uuid
 
 import flask_login
 import flask_wtf
 import structlog
+import svcs
 import wtforms.csrf.core
 import wtforms.validators
-from sqlalchemy import ColumnElement, Select, True_, desc, distinct, or_, select
+from sqlalchemy import ColumnElement, Select, True_, and_, desc, select
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.functions import func
 
+from vancelle.controllers.cache import ResultCache
 from vancelle.exceptions import ApplicationError
+from vancelle.ext.sqlalchemy import prefix_tsquery, prefix_tsquery_text
 from vancelle.ext.wtforms import NoneFilter
 from vancelle.extensions import db
 from vancelle.forms.bootstrap import BootstrapMeta
 from vancelle.forms.pagination import PaginationArgs
-from vancelle.lib.pagination import Pagination
-from vancelle.models import Record
+from vancelle.lib.pagination import Keyset, Pagination
 from vancelle.models.entry import Entry, ImportedWork
+from vancelle.models.loaders import work_list
 from vancelle.models.work import Book, Work
 from vancelle.shelf import Case, Shelf
 
@@ -67,6 +70,42 @@ class WorkForm(flask_wtf.FlaskForm):
     notes = wtforms.TextAreaField("Notes", validators=[wtforms.validators.Optional()], filters=[NoneFilter()])
 
 
+class WorkBulkForm(flask_wtf.FlaskForm):
+    class Meta(BootstrapMeta):
+        pass
+
+    csrf_token: wtforms.csrf.core.CSRFTokenField
+
+    action = wtforms.SelectField(
+        "Action",
+        choices=[("shelve", "Move to shelf"), ("delete", "Delete"), ("restore", "Restore"), ("tag", "Edit tags")],
+        validators=[wtforms.validators.InputRequired()],
+    )
+    scope = wtforms.SelectField(
+        "Works",
+        choices=[("selected", "Selected works"), ("filter", "All works matching the filters")],
+        default="selected",
+        validators=[wtforms.validators.InputRequired()],
+    )
+    work_id = wtforms.SelectMultipleField("Selected works", coerce=uuid.UUID, validate_choice=False)
+    shelf = wtforms.SelectField("Shelf", choices=SHELF_FORM_CHOICES, coerce=Shelf, default=Shelf.UNSORTED)
+    add_tags = wtforms.StringField("Add tags", validators=[wtforms.validators.Optional()], filters=[NoneFilter()])
+    remove_tags = wtforms.StringField("Remove tags", validators=[wtforms.validators.Optional()], filters=[NoneFilter()])
+
+    def where(self, work_index_args: "WorkIndexArgs") -> ColumnElement[bool]:
+        """Select the checked works, or every work matching the index filters."""
+        if self.scope.data == "filter":
+            return work_index_args.where()
+
+        if not self.work_id.data:
+            raise ApplicationError("No works were selected.")
+        return Work.id.in_(self.work_id.data)
+
+    @staticmethod
+    def split_tags(value: str | None) -> set[str]:
+        return {tag.strip() for tag in (value or "").split(",") if tag.strip()}
+
+
 class WorkIndexArgs(PaginationArgs):
     class Meta(BootstrapMeta):
         csrf = False
@@ -137,29 +176,54 @@ class WorkIndexArgs(PaginationArgs):
             search=repr(self.search.data),
         )
 
+    def _cache_key(self, name: str) -> typing.Hashable:
+        """Results depend on the user's data, and every field in the form."""
+        user = flask_login.current_user
+        fields = tuple((key, field.data) for key, field in self._fields.items())
+        return (name, user.id, user.data_version, fields)
+
     def paginate(self) -> Pagination:
-        alias = aliased(Work, self._statement().subquery(name="w"))
-        query = select(alias)
+        cache = svcs.flask.get(ResultCache)
+        return cache.get_or_load(db.session, self._cache_key("paginate"), self._paginate, lambda p, fn: p.map(fn))
 
-        count = query.with_only_columns(func.count(distinct(alias.id)))
-        return self.query(db.session, query, count)
+    def _paginate(self) -> Pagination:
+        order_search = self._order_search(Work, self.search.data)
+        query = (
+            self._statement().options(*work_list()).order_by(*order_search, desc(Work.time_updated), desc(Work.time_created))
+        )
+        count = self._count_statement()
+
+        # Search results are ordered by rank, so they can't use a keyset.
+        keyset = None if order_search else Keyset(Work.time_updated, Work.time_created, Work.id)
+        return self.query(db.session, query, count, keyset=keyset)
+
+    def where(self) -> ColumnElement[bool]:
+        return and_(*self._filters())
 
     def _statement(self) -> Select[tuple[Work]]:
-        return (
-            select(Work)
-            .distinct()
-            .filter(Work.user_id == flask_login.current_user.id)
-            .filter(self._filter_work_type(self.work_type.data))
-            .filter(self._filter_shelf(self.shelf.data))
-            .filter(self._filter_case(self.case.data))
-            .filter(self._filter_deleted(self.deleted.data))
-            .filter(self._filter_has_entries(self.has_entries.data))
-            .filter(self._filter_entry_type(self.has_entry_type.data))
-            .filter(self._filter_search(self.search.data))
-            .join(Record, isouter=True)
-            .join(Entry, isouter=True)
-            .order_by(desc(Work.time_updated), desc(Work.time_created))
-        )
+        return select(Work).filter(*self._filters())
+
+    def _count_statement(self) -> Select[tuple[int]]:
+        return select(func.count()).select_from(Work).filter(*self._filters())
+
+    def _filters(self) -> list[ColumnElement[bool]]:
+        """
+        Only include filters that are active.
+
+        Filters on entries use EXISTS rather than joins, so each work is selected once and the
+        statement doesn't need DISTINCT.
+        """
+        filters = [
+            Work.user_id == flask_login.current_user.id,
+            self._filter_work_type(self.work_type.data),
+            self._filter_shelf(self.shelf.data),
+            self._filter_case(self.case.data),
+            self._filter_deleted(self.deleted.data),
+            self._filter_has_entries(self.has_entries.data),
+            self._filter_entry_type(self.has_entry_type.data),
+            self._filter_search(self.search.data),
+        ]
+        return [f for f in filters if not isinstance(f, True_)]
 
     @staticmethod
     def _filter_work_type(value: str) -> ColumnElement[bool]:
@@ -175,7 +239,7 @@ class WorkIndexArgs(PaginationArgs):
 
     @staticmethod
     def _filter_entry_type(value: str) -> ColumnElement[bool]:
-        return True_() if value == "any" else Entry.type == value
+        return True_() if value == "any" else Work.entries.any(Entry.type == value)
 
     @staticmethod
     def _filter_deleted(value: str) -> ColumnElement[bool]:
@@ -208,41 +272,78 @@ class WorkIndexArgs(PaginationArgs):
 
     @staticmethod
     def _filter_search(value: str | None) -> ColumnElement[bool]:
-        match value:
-            case None | "":
-                return True_()
-            case query:
-                return or_(
-                    Work.title.ilike(f"%{query}%"),
-                    Work.author.ilike(f"%{query}%"),
-                    Work.series.ilike(f"%{query}%"),
-                    Work.description.ilike(f"%{query}%"),
-                    Entry.title.ilike(f"%{query}%"),
-                    Entry.author.ilike(f"%{query}%"),
-                    Entry.series.ilike(f"%{query}%"),
-                    Entry.description.ilike(f"%{query}%"),
-                )
-
-    def shelves(self) -> typing.Mapping[Shelf, list[Work]]:
-        works = db.session.execute(self._statement()).unique().scalars()
-        return self._group_shelves(works=works, shelf=self.shelf.data, case=self.case.data)
-
-    @classmethod
-    def _group_shelves(
-        cls,
-        works: typing.Iterable[Work],
-        shelf: Shelf,
-        case: Case,
-    ) -> typing.Mapping[Shelf, list[Work]]:
+        """Match against Work.search_document, which includes details from the work's active entries."""
+        if not value or not prefix_tsquery_text(value):
+            return True_()
+
+        return Work.search_document.bool_op("@@")(prefix_tsquery(value))
+
+    @staticmethod
+    def _order_search(work: type[Work], value: str | None) -> typing.Sequence[ColumnElement]:
+        if not value or not prefix_tsquery_text(value):
+            return ()
+
+        return (desc(func.ts_rank(work.search_document, prefix_tsquery(value))),)
+
+
+class WorkBoardArgs(WorkIndexArgs):
+    layout = wtforms.SelectField(
+        label="Layout",
+        choices={"vertical": "Vertical", "horizontal": "Horizontal"},
+        default="vertical",
+        validators=[wtforms.validators.DataRequired()],
+    )
+    per_shelf = wtforms.IntegerField(
+        label="Works per shelf",
+        default=50,
+        validators=[wtforms.validators.Optional(), wtforms.validators.NumberRange(min=1)],
+    )
+
+    def shelves(self) -> typing.Mapping[Shelf, Pagination[Work]]:
+        cache = svcs.flask.get(ResultCache)
+        return cache.get_or_load(db.session, self._cache_key("shelves"), self._shelves, self._map_shelves)
+
+    def _shelves(self) -> typing.Mapping[Shelf, Pagination[Work]]:
         """
         All shelves in the selection (in 'work_case.shelves' or equal to 'work_shelf') will appear in the result even if empty.
         Other shelves will only be present in the result if the query somehow returned them.
+
+        Works are ranked within each shelf by Work.sort_date, so only the first 'per_shelf' works on each shelf are loaded.
         """
-        groups: dict[Shelf, list[Work]] = {s: [] for s in cls._iter_shelves(shelf, case)}
-        for work in works:
-            groups[work.shelf].append(work)
+        shelves = self._iter_shelves(self.shelf.data, self.case.data)
+
+        ranked = (
+            self._statement()
+            .add_columns(
+                func.row_number()
+                .over(partition_by=Work.shelf, order_by=(desc(Work.sort_date), desc(Work.time_created), desc(Work.id)))
+                .label("shelf_rank"),
+                func.count().over(partition_by=Work.shelf).label("shelf_count"),
+            )
+            .subquery(name="w")
+        )
+        alias = aliased(Work, ranked)
+        query = select(alias, ranked.c.shelf_count).options(*work_list(alias)).order_by(ranked.c.shelf, ranked.c.shelf_rank)
+        if self.per_shelf.data:
+            query = query.filter(ranked.c.shelf_rank <= self.per_shelf.data)
+
+        groups: dict[Shelf, list[Work]] = {shelf: [] for shelf in shelves}
+        counts: dict[Shelf, int] = {shelf: 0 for shelf in shelves}
+        for work, count in db.session.execute(query).unique():
+            groups.setdefault(work.shelf, []).append(work)
+            counts[work.shelf] = count
+
+        return {
+            shelf: Pagination(items=works, count=counts[shelf], per_page=self.per_shelf.data or len(works))
+            for shelf, works in groups.items()
+        }
 
-        return {k: sorted(v, key=cls._work_sort_key, reverse=True) for k, v in groups.items()}
+    @staticmethod
+    def _map_shelves(
+        shelves: typing.Mapping[Shelf, Pagination[Work]],
+        function: typing.Callable[[Work], Work],
+    ) -> typing.Mapping[Shelf, Pagination[Work]]:
+        return {shelf: works.map(function) for shelf, works in shelves.items()}
 
     @staticmethod
     def _iter_shelves(shelf: Shelf, case: Case) -> typing.Tuple[Shelf, ...]:
@@ -257,31 +358,3 @@ class WorkIndexArgs(PaginationArgs):
             return case.shelves
 
         return tuple(Shelf)
-
-    @classmethod
-    def _work_sort_key(cls, work: Work) -> datetime.date | None:
-        if key := cls._work_sort_coalesce(r.date_started or r.date_stopped or None for r in work.records):
-            return key
-
-        if key := cls._work_sort_coalesce(e.release_date for e in work.entries):
-            return key
-
-        if key := work.release_date:
-            return key
-
-        return work.time_created.date()
-
-    @staticmethod
-    def _work_sort_coalesce(iterable: typing.Iterable[datetime.date]) -> datetime.date | None:
-        for item in sorted((item for item in iterable if item is not None), reverse=True):
-            return item
-        return None
-
-
-class WorkBoardArgs(WorkIndexArgs):
-    layout = wtforms.SelectField(
-        label="Layout",
-        choices={"vertical": "Vertical", "horizontal": "Horizontal"},
-        default="vertical",
-        validators=[wtforms.validators.DataRequired()],
-    )
@@ -2,7 +2,7 @@
 
 import markupsafe
 import wtforms
-from wtforms.widgets import CheckboxInput, RadioInput, Select
+from wtforms.widgets import CheckboxInput, HiddenInput, RadioInput, Select
 
 from vancelle.lib.html import html_classes
 
@@ -31,6 +31,10 @@ def form_control(field: wtforms.Field, *, label: bool = True, validation: bool =
     if isinstance(field.widget, (CheckboxInput, RadioInput)):
         raise ValueError("Use form_control_check() instead")
 
+    # Hidden fields (like the CSRF token) have nothing to label or validate.
+    if isinstance(field.widget, HiddenInput):
+        return markupsafe.Markup(field.widget(field, **kwargs))
+
     # Avoid printing the string "None" as a placeholder.
     if "placeholder" in kwargs and kwargs["placeholder"] is None:
         del kwargs["placeholder"]
@@ -113,7 +113,7 @@ class EntryDetailsPanel(DetailsPanel):
                 {},
                 [
                     "Attached to ",
-                    quote([a({"href": self.entry.work.url_for()}, [self.entry.work.resolve_details().title])]),
+                    quote([a({"href": self.entry.work.url_for()}, [self.entry.work.stored_details().title])]),
                     ".",
                 ],
             )
@@ -0,0 +1,60 @@
+import typing
+
+import flask
+import humanize
+
+from vancelle.lib.heavymetal import Heavymetal
+from vancelle.lib.heavymetal.html import div, fragment, li, p, small, span, ul
+from vancelle.models import Job
+
+BADGES = {
+    "queued": "text-bg-secondary",
+    "running": "text-bg-primary",
+    "succeeded": "text-bg-success",
+    "failed": "text-bg-danger",
+}
+
+
+def JobStatus(job: Job) -> Heavymetal:
+    """A job's progress. Until the job finishes, htmx polls for a new version of this element and swaps it in."""
+    attrs: dict[str, typing.Any] = {"id": f"job-{job.id}", "class": "list-group-item"}
+    if not job.finished:
+        attrs |= {
+            "hx-get": flask.url_for("job.status", job_id=job.id),
+            "hx-trigger": "every 2s",
+            "hx-swap": "outerHTML",
+        }
+
+    return li(
+        attrs,
+        [
+            div(
+                {"class": "d-flex justify-content-between align-items-center gap-2"},
+                [
+                    span({}, [job.title]),
+                    span({"class": f"badge {BADGES.get(job.status, 'text-bg-secondary')}"}, [job.status]),
+                ],
+            ),
+            _progress_bar(job) if job.status == "running" else fragment([]),
+            p({"class": "mb-0"}, [small({}, [job.message])]) if job.message else fragment([]),
+            small({"class": "text-body-secondary"}, [humanize.naturaltime(job.time_created)]),
+        ],
+    )
+
+
+def _progress_bar(job: Job) -> Heavymetal:
+    percent = job.percent
+    label = f"{job.progress} of {job.total}" if job.total else "Running"
+    classes = "progress-bar" if percent is not None else "progress-bar progress-bar-striped progress-bar-animated"
+
+    return div(
+        {"class": "progress my-1", "role": "progressbar", "aria-label": label},
+        [div({"class": classes, "style": f"width: {percent if percent is not None else 100}%"}, [label])],
+    )
+
+
+def JobList(jobs: typing.Sequence[Job]) -> Heavymetal:
+    if not jobs:
+        return p({"class": "text-body-secondary"}, ["No background jobs have run recently."])
+
+    return ul({"class": "list-group"}, [JobStatus(job) for job in jobs])
@@ -2,10 +2,17 @@ from vancelle.ext.flask import url_with
 from vancelle.html.bootstrap.components.pagination import PageItem, Pagination as BootstrapPagination
 from vancelle.inflect import count_plural
 from vancelle.lib.heavymetal.html import nav, span
-from vancelle.lib.pagination import Pagination
+from vancelle.lib.pagination import CursorPagination, Pagination
 
 
 def nav_pagination(pagination: Pagination) -> BootstrapPagination:
+    if isinstance(pagination, CursorPagination):
+        return _nav(pagination, _cursor_page_items(pagination))
+
+    return _nav(pagination, _page_items(pagination))
+
+
+def _page_items(pagination: Pagination) -> list[PageItem]:
     previous_page = PageItem("Previous", url_with(page=pagination.prev_page) if pagination.prev_page else None)
     pages = [
         (
@@ -16,7 +23,17 @@ def nav_pagination(pagination: Pagination) -> BootstrapPagination:
         for page in pagination.iter_page()
     ]
     next_page = PageItem("Next", url_with(page=pagination.next_page) if pagination.next_page else None)
+    return [previous_page, *pages, next_page]
+
+
+def _cursor_page_items(pagination: CursorPagination) -> list[PageItem]:
+    first_page = PageItem("First", url_with(page=None, cursor=None) if pagination.prev_cursor else None)
+    previous_page = PageItem("Previous", url_with(page=None, cursor=pagination.prev_cursor) if pagination.prev_cursor else None)
+    next_page = PageItem("Next", url_with(page=None, cursor=pagination.next_cursor) if pagination.next_cursor else None)
+    return [first_page, previous_page, next_page]
+
 
+def _nav(pagination: Pagination, items: list[PageItem]) -> BootstrapPagination:
     return nav(
         {
             "class": "mb-3 d-flex justify-content-between align-items-center",
@@ -31,6 +48,6 @@ def nav_pagination(pagination: Pagination) -> BootstrapPagination:
                     f" ({pagination.per_page} per page).",
                 ],
             ),
-            BootstrapPagination({"class": "mb-0"}, [previous_page, *pages, next_page]),
+            BootstrapPagination({"class": "mb-0"}, items),
         ],
     )
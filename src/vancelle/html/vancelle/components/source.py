@@ -3,16 +3,20 @@ import typing
 
 import flask
 
+from vancelle.controllers.source import SourceResult
 from vancelle.controllers.sources.base import Source
 from vancelle.forms.source import SourceSearchArgs
 from vancelle.html.bootstrap.layout.grid import col, row
 from vancelle.html.vancelle.components.details import DetailsBox
 from vancelle.html.vancelle.components.index import SearchFormControls
+from vancelle.html.vancelle.components.layout import Section, SectionHeader
 from vancelle.html.vancelle.components.optional import quote_str
 from vancelle.html.vancelle.components.panel import DetailsPanel, PanelControl
-from vancelle.html.vancelle.components.table import generate_table_from_pagination
+from vancelle.html.vancelle.components.pagination import nav_pagination
+from vancelle.html.vancelle.components.table import generate_table
+from vancelle.inflect import count_plural
 from vancelle.lib.heavymetal import Heavymetal
-from vancelle.lib.heavymetal.html import a, button, code, div, form, fragment, p, td, th
+from vancelle.lib.heavymetal.html import a, button, code, div, form, fragment, nothing, p, td, th
 from vancelle.lib.pagination import Pagination
 from vancelle.models import Entry, Work
 from vancelle.models.details import Details
@@ -20,21 +24,25 @@ from vancelle.models.properties import Properties
 
 
 def SourceListGroup(work: typing.Optional[Work]) -> Heavymetal:
+    federated_search_url = flask.url_for("source.federated_search", work_id=work.id if work else None)
     return div(
         {"class": "list-group"},
         [
-            a(
-                {"class": "list-group-item list-group-item-action", "href": source.url_for_search(work)},
-                ["Search ", source.info.noun_full_plural],
-            )
-            for source in Source.subclasses()
+            a({"class": "list-group-item list-group-item-action", "href": federated_search_url}, ["Search all sources"]),
+            *(
+                a(
+                    {"class": "list-group-item list-group-item-action", "href": source.url_for_search(work)},
+                    ["Search ", source.info.noun_full_plural],
+                )
+                for source in Source.subclasses()
+            ),
         ],
     )
 
 
-def SourceSearchForm(args: SourceSearchArgs, placeholder: str) -> Heavymetal:
+def SourceSearchForm(args: SourceSearchArgs, placeholder: str, action: str | None = None) -> Heavymetal:
     return form(
-        {"class": "v-block", "method": "get"},
+        {"class": "v-block", "method": "get", "action": action},
         [row({}, [col({}, [SearchFormControls(field=args.search, placeholder=placeholder)])])],
     )
 
@@ -52,7 +60,11 @@ def _ImportEntryButton(entry: Entry, work: Work) -> Heavymetal:
 
 
 def _EntryTable(items: Pagination[Entry], work: typing.Optional[Work]) -> Heavymetal:
-    return generate_table_from_pagination(
+    return fragment([_EntryResults(items.items, work), nav_pagination(pagination=items)])
+
+
+def _EntryResults(entries: typing.Iterable[Entry], work: typing.Optional[Work]) -> Heavymetal:
+    return generate_table(
         table_classes="table table-hover align-middle",
         cols=[
             {"style": "width: 20%;"},
@@ -82,10 +94,23 @@ def _EntryTable(items: Pagination[Entry], work: typing.Optional[Work]) -> Heavym
             ),
             td({"class": "text-end"}, [_ImportEntryButton(entry, work)]),
         ],
-        pagination=items,
+        items=entries,
     )
 
 
+def SourceResultSection(result: SourceResult, *, query: str, work: typing.Optional[Work]) -> Heavymetal:
+    """One source's answer to a federated search, showing only the first page of results."""
+    source = result.source
+    more = a({"class": "btn btn-sm btn-secondary", "href": source.url_for_search(work, query)}, ["More results"])
+
+    if result.error:
+        return Section(SectionHeader(source.info.noun_full_plural, result.error, more))
+
+    subtitle = count_plural("result", result.items.count)
+    content = _EntryResults(result.items.items, work) if result.items.items else nothing()
+    return Section(SectionHeader(source.info.noun_full_plural, subtitle, more), content)
+
+
 @dataclasses.dataclass()
 class RemoteEntryDetailsPanel(DetailsPanel):
     entry: Entry
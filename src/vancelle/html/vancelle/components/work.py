@@ -4,5 +4,5 @@ from vancelle.models import Work
 
 
 def return_to_work(work: Work) -> Heavymetal:
-    title = work.resolve_title()
+    title = work.stored_title()
     return a({"href": work.url_for()}, ["Return to ", em({}, [title])])
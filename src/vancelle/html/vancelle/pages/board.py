@@ -2,6 +2,7 @@ import dataclasses
 import datetime
 import typing
 
+import flask
 import markupsafe
 
 from vancelle.forms.work import WorkIndexArgs
@@ -11,6 +12,7 @@ from vancelle.inflect import count_plural
 from vancelle.lib.heavymetal.html import a, div, figure, h3, p, section, span, img, fragment
 from vancelle.lib.heavymetal import Heavymetal
 from vancelle.lib.html import html_classes
+from vancelle.lib.pagination import Pagination
 from vancelle.lib.heavymetal import HeavymetalComponent
 from vancelle.html.vancelle.components.metadata import span_date
 from vancelle.html.vancelle.components.optional import maybe_span, maybe_str, span_absent
@@ -31,7 +33,7 @@ def duration_span(start: datetime.date | None, stop: datetime.date | None) -> He
 
 
 def work_board_item(shelf: Shelf, work: Work) -> Heavymetal:
-    details = work.resolve_details()
+    details = work.stored_details()
 
     title = a(
         {
@@ -91,7 +93,22 @@ def work_board_item(shelf: Shelf, work: Work) -> Heavymetal:
     )
 
 
-def shelf_board_item(shelf: Shelf, count: int) -> Heavymetal:
+# Arguments that only apply to the board, which the work index doesn't need.
+BOARD_ARGS = {"layout", "per_shelf", "page", "per_page", "cursor"}
+
+
+def shelf_index_url(shelf: Shelf) -> str:
+    """The work index for one shelf, with the board's other filters."""
+    args: dict[str, typing.Any] = {key: value for key, value in flask.request.args.items() if key not in BOARD_ARGS}
+    args["shelf"] = shelf.value
+    return flask.url_for("work.index", **args)
+
+
+def shelf_board_item(shelf: Shelf, works: Pagination[Work]) -> Heavymetal:
+    more: Heavymetal = ""
+    if works.count > len(works.items):
+        more = a({"class": "fs-7", "href": shelf_index_url(shelf)}, [f"Showing {len(works.items)}, view all"])
+
     return div(
         {
             "class": html_classes(
@@ -100,12 +117,13 @@ def shelf_board_item(shelf: Shelf, count: int) -> Heavymetal:
                 ["overflow-hidden", "fs-6", "has-text-centered"],
             ),
             "data-shelf": str(shelf.value),
-            "data-count": str(count),
+            "data-count": str(works.count),
         },
         [
             h3({"class": "display-7"}, [shelf.title]),
             p({"class": "fs-7"}, [shelf.description]),
-            span({"class": "badge bg-primary rounded-pill"}, [count_plural("item", count)]),
+            span({"class": "badge bg-primary rounded-pill"}, [count_plural("item", works.count)]),
+            more,
         ],
     )
 
@@ -114,13 +132,13 @@ def shelf_board_item(shelf: Shelf, count: int) -> Heavymetal:
 class BoardPage(HeavymetalComponent):
     work_index_args: WorkIndexArgs
     layout: typing.Literal["vertical", "horizontal"]
-    shelves: typing.Mapping[Shelf, list[Work]] = dataclasses.field(repr=False)
+    shelves: typing.Mapping[Shelf, Pagination[Work]] = dataclasses.field(repr=False)
     total: int
 
     def heavymetal(self) -> Heavymetal:
         items = []
         for shelf, works in self.shelves.items():
-            items.append(shelf_board_item(shelf, len(works)))
+            items.append(shelf_board_item(shelf, works))
             for work in works:
                 items.append(work_board_item(shelf, work))
 
@@ -62,7 +62,7 @@ def _EntryTable(items: Pagination[Entry]) -> Heavymetal:
         body=lambda entry: [
             td({}, [a({"class": "text-nowrap", "href": entry.url_for_index()}, [entry.info.noun_full])]),
             td({}, [DetailsBox(entry.into_details(), entry.url_for())]),
-            td({}, [DetailsBox(entry.work.resolve_details(), entry.work.url_for()) if entry.work else ...]),
+            td({}, [DetailsBox(entry.work.stored_details(), entry.work.url_for()) if entry.work else ...]),
         ],
         pagination=items,
     )
@@ -9,7 +9,7 @@ from vancelle.extensions import db
 from vancelle.lib.heavymetal import Heavymetal, HeavymetalComponent
 from vancelle.lib.heavymetal.html import a, div, h1, section
 from vancelle.inflect import p
-from vancelle.models import User
+from vancelle.models import UserCount
 from vancelle.models.entry import Entry
 from vancelle.models.work import Work
 from .base import Page
@@ -44,33 +44,33 @@ class HomePageGauge(HeavymetalComponent):
 
 
 class HomePageGauges(HeavymetalComponent):
-    def _count_works(self) -> int:
-        query = (
-            sqlalchemy.select(sqlalchemy.func.count())
-            .select_from(Work)
-            .join(User)
-            .filter(User.id == flask_login.current_user.id)
-        )
-        return db.session.execute(query).scalar_one()
-
-    def _count_by_type(self, cls: typing.Type[Work | Entry]) -> dict[typing.Type[Work | Entry], int]:
-        subclasses = cls.subclasses()
-
-        count = sqlalchemy.func.count().label("count")
-        stmt = sqlalchemy.select(cls.type, count).select_from(cls).order_by(count.desc()).group_by(cls.type)
-
-        results = {t: c for t, c in db.session.execute(stmt)}
-        return {s: r for s in subclasses if (r := results.get(s.__mapper__.polymorphic_identity, 0))}
+    def _counts(self) -> dict[str, dict[str, int]]:
+        """Read the current user's counts, which are kept up to date by triggers."""
+        query = sqlalchemy.select(UserCount).filter_by(user_id=flask_login.current_user.id)
+        counts: dict[str, dict[str, int]] = {"work_type": {}, "entry_type": {}, "shelf": {}}
+        for row in db.session.execute(query).scalars():
+            counts.setdefault(row.category, {})[row.key] = row.count
+        return counts
+
+    @staticmethod
+    def _count_by_type(
+        cls: typing.Type[Work | Entry],
+        counts: typing.Mapping[str, int],
+    ) -> dict[typing.Type[Work | Entry], int]:
+        return {s: r for s in cls.subclasses() if (r := counts.get(s.polymorphic_identity(), 0))}
 
     def __iter__(self) -> typing.Iterator[HomePageGauge]:
-        works = self._count_works()
+        counts = self._counts()
+
+        # Every work is on exactly one shelf.
+        works = sum(counts["shelf"].values())
         yield HomePageGauge(works, p.plural("Work", works), flask.url_for("board.index"), "primary")
 
-        for cls, count in self._count_by_type(Work).items():
+        for cls, count in self._count_by_type(Work, counts["work_type"]).items():
             url = flask.url_for("board.index", work_type=cls.polymorphic_identity())
             yield HomePageGauge(count, cls.info.noun_plural_title, url, "info")
 
-        for cls, count in self._count_by_type(Entry).items():
+        for cls, count in self._count_by_type(Entry, counts["entry_type"]).items():
             url = flask.url_for("board.index", entry_type=cls.polymorphic_identity())
             yield HomePageGauge(count, cls.info.noun_full_plural, url, cls.info.colour)
 
@@ -45,7 +45,7 @@ def _record_controls(record: Record) -> HeavymetalContent:
 
 
 def record_update_page(record: Record, record_form: RecordForm) -> Heavymetal:
-    title = record.work.resolve_title()
+    title = record.work.stored_title()
     return Page(
         [
             PageHeader(
@@ -1,21 +1,24 @@
 import typing
 
+import flask
+
 from vancelle.controllers.sources.base import Source
 from vancelle.forms.source import SourceSearchArgs
 from vancelle.html.vancelle.components.layout import PageHeader
 from vancelle.html.vancelle.components.entry import EntryPageHeader
 from vancelle.html.vancelle.pages.base import Page
 from vancelle.html.vancelle.components.source import RemoteEntryDetailsPanel, SourceListGroup, SourceSearchForm, _EntryTable
-from vancelle.lib.heavymetal import Heavymetal
+from vancelle.lib.heavymetal import Heavymetal, HeavymetalContent
 from vancelle.lib.heavymetal.html import a, fragment
 from vancelle.lib.pagination import Pagination
 from vancelle.models import Entry, Work
 
 
-def ExternalIndexPage() -> Heavymetal:
+def ExternalIndexPage(*, args: SourceSearchArgs) -> Heavymetal:
     return Page(
         [
             PageHeader("External sources", "Provide detail for works by importing data from external sources"),
+            SourceSearchForm(args=args, placeholder="Search every source", action=flask.url_for("source.federated_search")),
             SourceListGroup(work=None),
         ],
         title=("External sources",),
@@ -45,6 +48,29 @@ def ExternalSearchPage(
     )
 
 
+def FederatedSearchPage(
+    *,
+    query: str,
+    args: SourceSearchArgs,
+    work: typing.Optional[Work],
+    results: HeavymetalContent,
+) -> Heavymetal:
+    """Results are streamed into the page as each source answers, see `source.federated_search`."""
+    if work:
+        subtitle = fragment(["New entries will be linked to ", a({"href": work.url_for()}, [work.resolve_title()])])
+    else:
+        subtitle = fragment(["New entries will also create a new work"])
+
+    return Page(
+        [
+            PageHeader("All sources", subtitle),
+            SourceSearchForm(args=args, placeholder=query),
+            *results,
+        ],
+        title=("External sources", "All sources"),
+    )
+
+
 def SourceDetailPage(*, source: Source, entry: Entry, work: typing.Optional[Work]):
     return Page(
         [
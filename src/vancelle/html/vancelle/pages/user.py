@@ -1,15 +1,18 @@
 import dataclasses
+import typing
 
 import flask
 import flask_login
 
 from vancelle.forms.user import ImportForm, LoginForm
 from vancelle.html.bootstrap.forms.controls import form_control
+from vancelle.html.vancelle.components.job import JobList
 from vancelle.html.vancelle.components.layout import PageHeader, SectionHeader
 from vancelle.html.vancelle.pages.base import Page
 from vancelle.inflect import p as inf
 from vancelle.lib.heavymetal import Heavymetal, HeavymetalComponent
 from vancelle.lib.heavymetal.html import a, button, code, div, form, p, section
+from vancelle.models import Job
 
 
 @dataclasses.dataclass()
@@ -43,6 +46,7 @@ class SettingsPage(HeavymetalComponent):
     import_form: ImportForm
     work_count: int
     filename: str
+    jobs: typing.Sequence[Job]
 
     def heavymetal(self) -> Heavymetal:
         return Page(
@@ -62,11 +66,19 @@ class SettingsPage(HeavymetalComponent):
                             [
                                 self.import_box(),
                                 self.export_box(),
+                                self.refresh_box(),
                                 self.clear_box(),
                             ],
                         ),
                     ],
                 ),
+                section(
+                    {},
+                    [
+                        SectionHeader("Background jobs", "Imports and refreshes run in the background."),
+                        JobList(self.jobs),
+                    ],
+                ),
                 section(
                     {},
                     [
@@ -141,6 +153,27 @@ class SettingsPage(HeavymetalComponent):
             ],
         )
 
+    def refresh_box(self) -> Heavymetal:
+        command = code({}, [f"flask sources refresh --username {flask_login.current_user.username}"])
+
+        return div(
+            {"class": "card"},
+            [
+                div({"class": "card-header"}, "Refresh entries"),
+                div(
+                    {"class": "card-body"},
+                    [
+                        p({}, ["Fetch entries that haven't been fetched from their source for 30 days."]),
+                        p({}, ["This can also be run from the command line interface with ", command, "."]),
+                        form(
+                            {"method": "post", "action": flask.url_for("source.refresh_stale")},
+                            [button({"class": "btn btn-primary", "type": "submit"}, ["Refresh"])],
+                        ),
+                    ],
+                ),
+            ],
+        )
+
     def clear_box(self) -> Heavymetal:
         command = code({}, [f"flask user clear --username {flask_login.current_user.username}"])
 
@@ -175,10 +208,7 @@ class SettingsPage(HeavymetalComponent):
                         ),
                         p(
                             {},
-                            [
-                                "The list is quite large—expect to wait 30 seconds or so "
-                                "for the list to be downloaded and inserted into the database."
-                            ],
+                            ["The list is quite large, and is downloaded and inserted into the database " "in the background."],
                         ),
                         form(
                             {"method": "post", "action": flask.url_for(".reload_steam_cache")},
@@ -1,6 +1,8 @@
+import typing
+
 import flask
 
-from vancelle.forms.work import WorkForm, WorkShelfForm, WorkIndexArgs
+from vancelle.forms.work import WorkBulkForm, WorkForm, WorkShelfForm, WorkIndexArgs
 from vancelle.html.bootstrap.components.button_group import btn_group
 from vancelle.html.bootstrap.forms.controls import form_control
 from vancelle.html.bootstrap.layout.grid import col, row
@@ -15,7 +17,7 @@ from vancelle.html.vancelle.components.work import return_to_work
 from vancelle.html.vancelle.pages.base import Page
 from vancelle.inflect import count_plural
 from vancelle.lib.heavymetal import Heavymetal, HeavymetalContent
-from vancelle.lib.heavymetal.html import a, button, div, form, section, td, th
+from vancelle.lib.heavymetal.html import a, button, div, form, input_, section, td, th
 from vancelle.lib.pagination import Pagination
 from vancelle.models import Work
 from vancelle.models.details import Details, EMPTY_DETAILS
@@ -280,26 +282,63 @@ def WorkIndexArgsForm(work_index_args: WorkIndexArgs) -> Heavymetal:
     )
 
 
+def WorkBulkFormGroup(work_bulk_form: WorkBulkForm) -> Heavymetal:
+    """Works are selected with checkboxes in the work table, which belong to this form by its ID."""
+    args: dict[str, typing.Any] = flask.request.args.to_dict()
+    return form(
+        {"id": "work-bulk", "method": "post", "action": flask.url_for("work.bulk", **args)},
+        [
+            work_bulk_form.csrf_token(),
+            row(
+                {"class": "align-items-end"},
+                [
+                    col({}, [work_bulk_form.scope()]),
+                    col({}, [work_bulk_form.action()]),
+                    col({}, [work_bulk_form.shelf()]),
+                    col({}, [work_bulk_form.add_tags(placeholder="Comma separated")]),
+                    col({}, [work_bulk_form.remove_tags(placeholder="Comma separated")]),
+                    col({"class": "col-auto"}, [button({"class": "btn btn-primary", "type": "submit"}, ["Apply"])]),
+                ],
+            ),
+        ],
+    )
+
+
 def WorkTable(works: Pagination[Work]) -> Heavymetal:
     return generate_table_from_pagination(
         table_classes="table table-hover table-sm align-middle",
         cols=[
+            {"style": "width: 2%;"},
             {"style": "width: 10%;"},
-            {"style": "width: 70%;"},
+            {"style": "width: 68%;"},
             {"style": "width: 20%;"},
         ],
         head=[
+            th({}, []),
             th({}, ["Work Type"]),
             th({}, ["Work"]),
             th({}, ["Attachments"]),
         ],
         body=lambda work: [
+            td(
+                {},
+                [
+                    input_({
+                        "class": "form-check-input",
+                        "type": "checkbox",
+                        "name": "work_id",
+                        "value": str(work.id),
+                        "form": "work-bulk",
+                        "aria-label": "Select work",
+                    })
+                ],
+            ),
             td({}, [work.info.noun_title]),
-            td({}, [DetailsBox(work.resolve_details(), work.url_for())]),
+            td({}, [DetailsBox(work.stored_details(), work.url_for())]),
             td(
                 {"class": "text-body-secondary"},
                 [
-                    count_plural("entry", len(work.entries)),
+                    count_plural("entry", work.count_entries()),
                     ", ",
                     count_plural("record", len(work.records)),
                 ],
@@ -309,11 +348,12 @@ def WorkTable(works: Pagination[Work]) -> Heavymetal:
     )
 
 
-def work_index_page(works: Pagination[Work], work_index_args: WorkIndexArgs) -> Heavymetal:
+def work_index_page(works: Pagination[Work], work_index_args: WorkIndexArgs, work_bulk_form: WorkBulkForm) -> Heavymetal:
     return Page(
         [
             PageHeader("Works"),
             Section(WorkIndexArgsForm(work_index_args)),
+            Section(WorkBulkFormGroup(work_bulk_form)),
             Section(WorkTable(works)),
         ],
         title=["Works"],
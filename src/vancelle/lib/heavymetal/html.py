@@ -95,6 +95,7 @@ p = make_element("p")
 picture = make_element("picture")
 pre = make_element("pre")
 section = make_element("section")
+small = make_element("small")
 span = make_element("span")
 strong = make_element("strong")
 table = make_element("table")
@@ -1,3 +1,4 @@
+from .cursor import CursorPagination, InvalidCursor, Keyset
 from .pagination import Pagination
 
-__all__ = ("Pagination",)
+__all__ = ("CursorPagination", "InvalidCursor", "Keyset", "Pagination")
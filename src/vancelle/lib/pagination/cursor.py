@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import base64
+import dataclasses
+import datetime
+import json
+import typing
+import uuid
+
+import sqlalchemy
+import sqlalchemy.orm
+
+from .pagination import Pagination
+
+T = typing.TypeVar("T")
+U = typing.TypeVar("U")
+
+Direction = typing.Literal["after", "before"]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclasses.dataclass()
+class CursorPagination(Pagination[T]):
+    """
+    A page of results from a keyset query.
+
+    There are no page numbers, only opaque cursors pointing at the previous and next pages.
+    """
+
+    prev_cursor: str | None = dataclasses.field(default=None, kw_only=True)
+    next_cursor: str | None = dataclasses.field(default=None, kw_only=True)
+
+    def page_count(self) -> int:
+        return 1
+
+    def iter_page(self, **kwargs: int) -> typing.Iterable[int | None]:
+        return ()
+
+    @property
+    def prev_page(self) -> int | None:
+        return None
+
+    @property
+    def next_page(self) -> int | None:
+        return None
+
+    def map(self, function: typing.Callable[[T], U]) -> CursorPagination[U]:
+        return CursorPagination(
+            items=[function(item) for item in self.items],
+            count=self.count,
+            page=self.page,
+            per_page=self.per_page,
+            prev_cursor=self.prev_cursor,
+            next_cursor=self.next_cursor,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class Keyset:
+    """
+    Columns that give a query a stable, unique, descending order.
+
+    Nullable columns sort first, matching PostgreSQL's default for descending order.
+    """
+
+    columns: typing.Sequence[sqlalchemy.orm.QueryableAttribute]
+
+    def __init__(self, *columns: sqlalchemy.orm.QueryableAttribute) -> None:
+        object.__setattr__(self, "columns", columns)
+
+    def order_by(self, direction: Direction = "after") -> list[sqlalchemy.ColumnElement]:
+        if direction == "before":
+            return [sqlalchemy.asc(column).nulls_last() for column in self.columns]
+        return [sqlalchemy.desc(column).nulls_first() for column in self.columns]
+
+    def values(self, item: typing.Any) -> tuple[typing.Any, ...]:
+        return tuple(getattr(item, column.key) for column in self.columns)
+
+    def where(self, values: typing.Sequence[typing.Any], direction: Direction) -> sqlalchemy.ColumnElement[bool]:
+        """Select rows that sort after (or before) a row with the given values, one column at a time."""
+        clauses = []
+        for i, (column, value) in enumerate(zip(self.columns, values)):
+            equal = [self._equal(c, v) for c, v in zip(self.columns[:i], values[:i])]
+            clauses.append(sqlalchemy.and_(*equal, self._beyond(column, value, direction)))
+        return sqlalchemy.or_(*clauses)
+
+    @staticmethod
+    def _equal(column: sqlalchemy.orm.QueryableAttribute, value: typing.Any) -> sqlalchemy.ColumnElement[bool]:
+        return column.is_(None) if value is None else column == value
+
+    @staticmethod
+    def _beyond(
+        column: sqlalchemy.orm.QueryableAttribute, value: typing.Any, direction: Direction
+    ) -> sqlalchemy.ColumnElement[bool]:
+        if direction == "after":
+            return column.is_not(None) if value is None else column < value
+        return sqlalchemy.false() if value is None else sqlalchemy.or_(column > value, column.is_(None))
+
+    def encode(self, values: typing.Sequence[typing.Any], direction: Direction) -> str:
+        data = [
+            direction,
+            *(None if v is None else v.isoformat() if isinstance(v, datetime.datetime) else str(v) for v in values),
+        ]
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple[tuple[typing.Any, ...], Direction]:
+        try:
+            direction, *values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except (ValueError, TypeError) as exception:
+            raise InvalidCursor(f"Invalid cursor {cursor!r}") from exception
+
+        if direction not in ("after", "before") or len(values) != len(self.columns):
+            raise InvalidCursor(f"Invalid cursor {cursor!r}")
+
+        return tuple(self._parse(c, v) for c, v in zip(self.columns, values)), direction
+
+    @staticmethod
+    def _parse(column: sqlalchemy.orm.QueryableAttribute, value: str | None) -> typing.Any:
+        if value is None:
+            return None
+
+        python_type = column.type.python_type
+        if python_type is datetime.datetime:
+            return datetime.datetime.fromisoformat(value)
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+        return python_type(value)
+
+    def query(
+        self,
+        session: sqlalchemy.orm.Session,
+        query_statement: sqlalchemy.Select[tuple[T]],
+        count_statement: sqlalchemy.Select[tuple[int]] | None = None,
+        *,
+        cursor: str | None,
+        per_page: int,
+    ) -> CursorPagination[T]:
+        """Fetch one page after (or before) the cursor, plus one more item to tell if there's another page."""
+        values, direction = self.decode(cursor) if cursor else ((), "after")
+
+        items_query = query_statement.order_by(None).order_by(*self.order_by(direction)).limit(per_page + 1)
+        if values:
+            items_query = items_query.filter(self.where(values, direction))
+
+        items = list(session.execute(items_query).unique().scalars())
+        more = len(items) > per_page
+        items = items[:per_page]
+
+        if direction == "before":
+            items.reverse()
+            prev_cursor = self.encode(self.values(items[0]), "before") if more else None
+            next_cursor = self.encode(self.values(items[-1]), "after") if items else None
+        else:
+            prev_cursor = self.encode(self.values(items[0]), "before") if values and items else None
+            next_cursor = self.encode(self.values(items[-1]), "after") if more else None
+
+        if count_statement is None:
+            count_subquery = query_statement.order_by(None).options(sqlalchemy.orm.noload("*")).subquery()
+            count_statement = sqlalchemy.select(sqlalchemy.func.count()).select_from(count_subquery)
+        count = session.execute(count_statement).scalar_one()
+
+        return CursorPagination(
+            items=items,
+            count=count,
+            per_page=per_page,
+            prev_cursor=prev_cursor,
+            next_cursor=next_cursor,
+        )
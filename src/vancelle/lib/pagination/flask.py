@@ -7,7 +7,9 @@ import flask
 import sqlalchemy
 import sqlalchemy.orm
 import structlog
+import werkzeug.exceptions
 
+from .cursor import InvalidCursor, Keyset
 from .pagination import Pagination
 
 logger = structlog.get_logger(logger_name=__name__)
@@ -20,20 +22,37 @@ class FlaskPaginationArgs:
     page: int
     per_page: int
     max_per_page: int
+    cursor: str | None
 
-    def __init__(self, page: int | None = None, per_page: int | None = None, max_per_page: int = 100) -> None:
+    def __init__(
+        self,
+        page: int | None = None,
+        per_page: int | None = None,
+        max_per_page: int = 100,
+        cursor: str | None = None,
+    ) -> None:
         page = page if page is not None else flask.request.args.get("page", 1, int)
         per_page = per_page if per_page is not None else flask.request.args.get("per_page", 10, int)
+        cursor = cursor if cursor is not None else flask.request.args.get("cursor", None, str)
 
         self.page = page
         self.per_page = min(per_page, max_per_page)
+        self.cursor = cursor
 
     def query(
         self,
         session: sqlalchemy.orm.Session,
         query_statement: sqlalchemy.Select[tuple[T]],
         count_statement: sqlalchemy.Select[tuple[int]] | None = None,
+        *,
+        keyset: Keyset | None = None,
     ) -> Pagination[T]:
+        if keyset is not None:
+            try:
+                return keyset.query(session, query_statement, count_statement, cursor=self.cursor, per_page=self.per_page)
+            except InvalidCursor as exception:
+                raise werkzeug.exceptions.BadRequest(str(exception))
+
         offset = (self.page - 1) * self.per_page
         items_query = query_statement.limit(self.per_page).offset(offset)
         items = list(session.execute(items_query).unique().scalars())
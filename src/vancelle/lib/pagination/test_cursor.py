@@ -0,0 +1,54 @@
+import datetime
+import uuid
+
+import pytest
+import sqlalchemy
+import sqlalchemy.orm
+
+from . import InvalidCursor, Keyset
+from vancelle.tests.items import Item, sqlite_engine
+
+
+class TestKeyset:
+    keyset = Keyset(Item.time_updated, Item.id)
+
+    def test_round_trip(self) -> None:
+        values = (datetime.datetime(2024, 6, 1, 12, 30, tzinfo=datetime.timezone.utc), uuid.uuid4())
+        cursor = self.keyset.encode(values, "before")
+        assert self.keyset.decode(cursor) == (values, "before")
+
+    def test_round_trip_null(self) -> None:
+        values = (None, uuid.uuid4())
+        cursor = self.keyset.encode(values, "after")
+        assert self.keyset.decode(cursor) == (values, "after")
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "WyJ1cCJd", "WyJhZnRlciJd"])
+    def test_invalid(self, cursor: str) -> None:
+        with pytest.raises(InvalidCursor):
+            self.keyset.decode(cursor)
+
+    def test_after_null_includes_later_values(self) -> None:
+        where = self.keyset.where((None, uuid.UUID(int=0)), "after")
+        compiled = str(where.compile(compile_kwargs={"literal_binds": True}))
+        assert "item.time_updated IS NOT NULL" in compiled
+
+    def test_sqlite(self) -> None:
+        start = datetime.datetime(2024, 1, 1)
+        engine = sqlite_engine(
+            Item(id=uuid.UUID(int=i), time_updated=start + datetime.timedelta(days=i % 5)) for i in range(12)
+        )
+
+        with sqlalchemy.orm.Session(engine) as session:
+            statement = sqlalchemy.select(Item)
+            pages, cursor = [], None
+            while True:
+                page = self.keyset.query(session, statement, cursor=cursor, per_page=5)
+                pages.append([item.id.int for item in page.items])
+                if (cursor := page.next_cursor) is None:
+                    break
+
+            assert [len(p) for p in pages] == [5, 5, 2]
+            assert sorted(sum(pages, [])) == list(range(12))
+
+            previous = self.keyset.query(session, statement, cursor=page.prev_cursor, per_page=5)
+            assert [item.id.int for item in previous.items] == pages[1]
@@ -0,0 +1,106 @@
+"""Added Work.search_document
+
+A tsvector combining a work and its active entries, kept up to date by triggers on
+the 'work' and 'remote' tables. The 'remote' triggers are statement-level, so batched
+writes update each affected work once.
+
+Revision ID: 1792317600
+Revises: 1719936902
+Create Date: 2026-10-18 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+revision = "1792317600"
+down_revision = "1719936902"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.add_column("work", sqlalchemy.Column("search_document", postgresql.TSVECTOR(), nullable=True))
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_search_document(w work) RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT
+                setweight(to_tsvector('simple', concat_ws(' ', w.title, string_agg(r.title, ' '))), 'A') ||
+                setweight(to_tsvector('simple', concat_ws(' ', w.author, w.series, string_agg(concat_ws(' ', r.author, r.series), ' '))), 'B') ||
+                setweight(to_tsvector('simple', concat_ws(' ', w.description, string_agg(r.description, ' '))), 'D')
+            FROM remote AS r
+            WHERE r.work_id = w.id AND r.time_deleted IS NULL
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_search_document_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_document := work_search_document(NEW);
+            RETURN NEW;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION remote_search_document_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Statement-level, so each statement updates every affected work once, however many entries it changed.
+            IF TG_OP = 'INSERT' THEN
+                UPDATE work SET search_document = work_search_document(work)
+                WHERE id IN (SELECT work_id FROM new_rows);
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE work SET search_document = work_search_document(work)
+                WHERE id IN (SELECT work_id FROM old_rows);
+            ELSE
+                UPDATE work SET search_document = work_search_document(work)
+                WHERE id IN (
+                    SELECT unnest(ARRAY[o.work_id, n.work_id])
+                    FROM old_rows AS o JOIN new_rows AS n USING (type, id)
+                    WHERE (o.work_id, o.title, o.author, o.series, o.description, o.time_deleted)
+                        IS DISTINCT FROM (n.work_id, n.title, n.author, n.series, n.description, n.time_deleted)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER work_search_document
+        BEFORE INSERT OR UPDATE OF title, author, series, description ON work
+        FOR EACH ROW EXECUTE FUNCTION work_search_document_trigger();
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER remote_search_document_insert
+        AFTER INSERT ON remote REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_search_document_trigger();
+
+        CREATE TRIGGER remote_search_document_update
+        AFTER UPDATE ON remote REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_search_document_trigger();
+
+        CREATE TRIGGER remote_search_document_delete
+        AFTER DELETE ON remote REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_search_document_trigger();
+        """
+    )
+    alembic.op.execute("UPDATE work SET search_document = work_search_document(work);")
+    alembic.op.create_index("ix_work_search_document", "work", ["search_document"], postgresql_using="gin")
+
+
+def downgrade():
+    alembic.op.drop_index("ix_work_search_document", table_name="work", postgresql_using="gin")
+    alembic.op.execute("DROP TRIGGER remote_search_document_delete ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_search_document_update ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_search_document_insert ON remote;")
+    alembic.op.execute("DROP TRIGGER work_search_document ON work;")
+    alembic.op.execute("DROP FUNCTION remote_search_document_trigger();")
+    alembic.op.execute("DROP FUNCTION work_search_document_trigger();")
+    alembic.op.execute("DROP FUNCTION work_search_document(work);")
+    alembic.op.drop_column("work", "search_document")
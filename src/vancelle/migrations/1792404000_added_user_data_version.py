@@ -0,0 +1,23 @@
+"""Added User.data_version
+
+Revision ID: 1792404000
+Revises: 1792317600
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+
+
+revision = "1792404000"
+down_revision = "1792317600"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.add_column("user", sqlalchemy.Column("data_version", sqlalchemy.Integer(), server_default="0", nullable=False))
+
+
+def downgrade():
+    alembic.op.drop_column("user", "data_version")
@@ -0,0 +1,147 @@
+"""Added Work.sort_date
+
+The date used to order works on the board: the latest date in the work's records, then
+the latest release date of its entries, then its own release date, then the date it was
+created. Kept up to date by triggers on the 'work', 'record' and 'remote' tables. The
+'record' and 'remote' triggers are statement-level, so batched writes update each
+affected work once.
+
+Revision ID: 1792490400
+Revises: 1792404000
+Create Date: 2026-10-20 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+
+revision = "1792490400"
+down_revision = "1792404000"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.add_column("work", sqlalchemy.Column("sort_date", sqlalchemy.Date(), nullable=True))
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_sort_date(w work) RETURNS date LANGUAGE sql STABLE AS $$
+            SELECT coalesce(records.date, entries.date, w.release_date, w.time_created::date)
+            FROM
+                LATERAL (SELECT max(coalesce(date_started, date_stopped)) AS date FROM record WHERE work_id = w.id) AS records,
+                LATERAL (SELECT max(release_date) AS date FROM remote WHERE work_id = w.id) AS entries
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_sort_date_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.sort_date := work_sort_date(NEW);
+            RETURN NEW;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION record_sort_date_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Statement-level, so each statement updates every affected work once, however many records it changed.
+            IF TG_OP = 'INSERT' THEN
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (SELECT work_id FROM new_rows);
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (SELECT work_id FROM old_rows);
+            ELSE
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (
+                    SELECT unnest(ARRAY[o.work_id, n.work_id])
+                    FROM old_rows AS o JOIN new_rows AS n USING (id)
+                    WHERE (o.work_id, o.date_started, o.date_stopped) IS DISTINCT FROM (n.work_id, n.date_started, n.date_stopped)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION remote_sort_date_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Statement-level, so each statement updates every affected work once, however many entries it changed.
+            IF TG_OP = 'INSERT' THEN
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (SELECT work_id FROM new_rows);
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (SELECT work_id FROM old_rows);
+            ELSE
+                UPDATE work SET sort_date = work_sort_date(work)
+                WHERE id IN (
+                    SELECT unnest(ARRAY[o.work_id, n.work_id])
+                    FROM old_rows AS o JOIN new_rows AS n USING (type, id)
+                    WHERE (o.work_id, o.release_date) IS DISTINCT FROM (n.work_id, n.release_date)
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER work_sort_date
+        BEFORE INSERT OR UPDATE OF release_date, time_created ON work
+        FOR EACH ROW EXECUTE FUNCTION work_sort_date_trigger();
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER record_sort_date_insert
+        AFTER INSERT ON record REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_sort_date_trigger();
+
+        CREATE TRIGGER record_sort_date_update
+        AFTER UPDATE ON record REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_sort_date_trigger();
+
+        CREATE TRIGGER record_sort_date_delete
+        AFTER DELETE ON record REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_sort_date_trigger();
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER remote_sort_date_insert
+        AFTER INSERT ON remote REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_sort_date_trigger();
+
+        CREATE TRIGGER remote_sort_date_update
+        AFTER UPDATE ON remote REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_sort_date_trigger();
+
+        CREATE TRIGGER remote_sort_date_delete
+        AFTER DELETE ON remote REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_sort_date_trigger();
+        """
+    )
+    alembic.op.execute("UPDATE work SET sort_date = work_sort_date(work);")
+    alembic.op.create_index("ix_work_board", "work", ["user_id", "shelf", "sort_date"])
+
+
+def downgrade():
+    alembic.op.drop_index("ix_work_board", table_name="work")
+    alembic.op.execute("DROP TRIGGER remote_sort_date_delete ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_sort_date_update ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_sort_date_insert ON remote;")
+    alembic.op.execute("DROP TRIGGER record_sort_date_delete ON record;")
+    alembic.op.execute("DROP TRIGGER record_sort_date_update ON record;")
+    alembic.op.execute("DROP TRIGGER record_sort_date_insert ON record;")
+    alembic.op.execute("DROP TRIGGER work_sort_date ON work;")
+    alembic.op.execute("DROP FUNCTION remote_sort_date_trigger();")
+    alembic.op.execute("DROP FUNCTION record_sort_date_trigger();")
+    alembic.op.execute("DROP FUNCTION work_sort_date_trigger();")
+    alembic.op.execute("DROP FUNCTION work_sort_date(work);")
+    alembic.op.drop_column("work", "sort_date")
@@ -0,0 +1,98 @@
+"""Added WorkDetails
+
+Existing works are backfilled in the same order as Work.refresh_details(): the work's own
+fields first, then its active entries by entry type priority (as of this revision).
+
+Revision ID: 1792576800
+Revises: 1792490400
+Create Date: 2026-10-21 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+from sqlalchemy.dialects import postgresql
+
+revision = "1792576800"
+down_revision = "1792490400"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.create_table(
+        "work_details",
+        sqlalchemy.Column("work_id", sqlalchemy.Uuid(), nullable=False),
+        sqlalchemy.Column("title", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("author", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("series", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("release_date", sqlalchemy.Date(), nullable=True),
+        sqlalchemy.Column("tags", postgresql.ARRAY(sqlalchemy.String()), nullable=True),
+        sqlalchemy.Column("cover_type", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("cover_id", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("background_type", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("background_id", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("entry_count", sqlalchemy.Integer(), nullable=False),
+        sqlalchemy.ForeignKeyConstraint(["work_id"], ["work.id"], ondelete="cascade"),
+        sqlalchemy.PrimaryKeyConstraint("work_id"),
+    )
+    alembic.op.execute(
+        """
+        WITH priority (type, priority) AS (
+            VALUES
+                ('steam.application', 99),
+                ('tmdb.movie', 40),
+                ('tmdb.tv', 31),
+                ('royalroad.fiction', 20),
+                ('goodreads.book.public', 13),
+                ('openlibrary.edition', 12),
+                ('openlibrary.work', 11),
+                ('goodreads.book', 10),
+                ('imported', -1)
+        ),
+        active AS (
+            SELECT remote.*, row_number() OVER (
+                PARTITION BY remote.work_id ORDER BY coalesce(priority.priority, 0) DESC, remote.id
+            ) AS rank
+            FROM remote LEFT JOIN priority USING (type)
+            WHERE remote.time_deleted IS NULL
+        )
+        INSERT INTO work_details (
+            work_id, title, author, series, release_date, tags,
+            cover_type, cover_id, background_type, background_id, entry_count
+        )
+        SELECT
+            work.id,
+            coalesce(nullif(work.title, ''), (
+                SELECT a.title FROM active AS a WHERE a.work_id = work.id AND a.title <> '' ORDER BY a.rank LIMIT 1
+            )),
+            coalesce(nullif(work.author, ''), (
+                SELECT a.author FROM active AS a WHERE a.work_id = work.id AND a.author <> '' ORDER BY a.rank LIMIT 1
+            )),
+            coalesce(nullif(work.series, ''), (
+                SELECT a.series FROM active AS a WHERE a.work_id = work.id AND a.series <> '' ORDER BY a.rank LIMIT 1
+            )),
+            coalesce(work.release_date, (
+                SELECT a.release_date FROM active AS a
+                WHERE a.work_id = work.id AND a.release_date IS NOT NULL ORDER BY a.rank LIMIT 1
+            )),
+            CASE WHEN cardinality(work.tags) > 0 THEN work.tags ELSE (
+                SELECT a.tags FROM active AS a WHERE a.work_id = work.id AND cardinality(a.tags) > 0 ORDER BY a.rank LIMIT 1
+            ) END,
+            CASE WHEN work.cover <> '' THEN 'work' ELSE cover.type END,
+            CASE WHEN work.cover <> '' THEN work.id::text ELSE cover.id END,
+            CASE WHEN work.background <> '' THEN 'work' ELSE background.type END,
+            CASE WHEN work.background <> '' THEN work.id::text ELSE background.id END,
+            (SELECT count(*) FROM remote WHERE remote.work_id = work.id)
+        FROM work
+        LEFT JOIN LATERAL (
+            SELECT a.type, a.id FROM active AS a WHERE a.work_id = work.id AND a.cover <> '' ORDER BY a.rank LIMIT 1
+        ) AS cover ON true
+        LEFT JOIN LATERAL (
+            SELECT a.type, a.id FROM active AS a WHERE a.work_id = work.id AND a.background <> '' ORDER BY a.rank LIMIT 1
+        ) AS background ON true;
+        """
+    )
+
+
+def downgrade():
+    alembic.op.drop_table("work_details")
@@ -0,0 +1,41 @@
+"""Added UserCount
+
+Revision ID: 1792663200
+Revises: 1792576800
+Create Date: 2026-10-22 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+
+revision = "1792663200"
+down_revision = "1792576800"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.create_table(
+        "user_count",
+        sqlalchemy.Column("user_id", sqlalchemy.Uuid(), nullable=False),
+        sqlalchemy.Column("category", sqlalchemy.String(), nullable=False),
+        sqlalchemy.Column("key", sqlalchemy.String(), nullable=False),
+        sqlalchemy.Column("count", sqlalchemy.Integer(), nullable=False),
+        sqlalchemy.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="cascade"),
+        sqlalchemy.PrimaryKeyConstraint("user_id", "category", "key"),
+    )
+    alembic.op.execute(
+        """
+        INSERT INTO user_count (user_id, category, key, count)
+        SELECT user_id, 'work_type', type, count(*) FROM work GROUP BY user_id, type
+        UNION ALL
+        SELECT user_id, 'shelf', shelf, count(*) FROM work GROUP BY user_id, shelf
+        UNION ALL
+        SELECT work.user_id, 'entry_type', remote.type, count(*) FROM remote JOIN work ON work.id = remote.work_id
+        GROUP BY work.user_id, remote.type;
+        """
+    )
+
+
+def downgrade():
+    alembic.op.drop_table("user_count")
@@ -0,0 +1,23 @@
+"""Added cascading deletes from users to works
+
+Revision ID: 1792749600
+Revises: 1792663200
+Create Date: 2026-10-23 10:00:00.000000
+"""
+
+import alembic.op
+
+revision = "1792749600"
+down_revision = "1792663200"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.drop_constraint("work_user_id_fkey", "work", type_="foreignkey")
+    alembic.op.create_foreign_key("work_user_id_fkey", "work", "user", ["user_id"], ["id"], ondelete="cascade")
+
+
+def downgrade():
+    alembic.op.drop_constraint("work_user_id_fkey", "work", type_="foreignkey")
+    alembic.op.create_foreign_key("work_user_id_fkey", "work", "user", ["user_id"], ["id"])
@@ -0,0 +1,43 @@
+"""Added Job
+
+Revision ID: 1792836000
+Revises: 1792749600
+Create Date: 2026-10-24 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+import sqlalchemy.dialects.postgresql
+
+revision = "1792836000"
+down_revision = "1792749600"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.create_table(
+        "job",
+        sqlalchemy.Column("id", sqlalchemy.Uuid(), nullable=False),
+        sqlalchemy.Column("user_id", sqlalchemy.Uuid(), nullable=True),
+        sqlalchemy.Column("kind", sqlalchemy.String(), nullable=False),
+        sqlalchemy.Column("title", sqlalchemy.String(), nullable=False),
+        sqlalchemy.Column("arguments", sqlalchemy.dialects.postgresql.JSONB(), nullable=False),
+        sqlalchemy.Column("status", sqlalchemy.String(), nullable=False),
+        sqlalchemy.Column("attempts", sqlalchemy.Integer(), nullable=False),
+        sqlalchemy.Column("progress", sqlalchemy.Integer(), nullable=False),
+        sqlalchemy.Column("total", sqlalchemy.Integer(), nullable=True),
+        sqlalchemy.Column("message", sqlalchemy.String(), nullable=True),
+        sqlalchemy.Column("time_created", sqlalchemy.DateTime(), nullable=False),
+        sqlalchemy.Column("time_updated", sqlalchemy.DateTime(), nullable=True),
+        sqlalchemy.Column("time_started", sqlalchemy.DateTime(), nullable=True),
+        sqlalchemy.Column("time_finished", sqlalchemy.DateTime(), nullable=True),
+        sqlalchemy.ForeignKeyConstraint(["user_id"], ["user.id"], ondelete="cascade"),
+        sqlalchemy.PrimaryKeyConstraint("id"),
+    )
+    alembic.op.create_index("ix_job_user_id", "job", ["user_id"])
+    alembic.op.create_index("ix_job_queued", "job", ["time_created"], postgresql_where=sqlalchemy.text("status = 'queued'"))
+
+
+def downgrade():
+    alembic.op.drop_table("job")
@@ -0,0 +1,26 @@
+"""Added entry validators and content hash
+
+Revision ID: 1792922400
+Revises: 1792836000
+Create Date: 2026-10-25 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+
+revision = "1792922400"
+down_revision = "1792836000"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.add_column("remote", sqlalchemy.Column("etag", sqlalchemy.String(), nullable=True))
+    alembic.op.add_column("remote", sqlalchemy.Column("last_modified", sqlalchemy.String(), nullable=True))
+    alembic.op.add_column("remote", sqlalchemy.Column("content_hash", sqlalchemy.String(), nullable=True))
+
+
+def downgrade():
+    alembic.op.drop_column("remote", "content_hash")
+    alembic.op.drop_column("remote", "last_modified")
+    alembic.op.drop_column("remote", "etag")
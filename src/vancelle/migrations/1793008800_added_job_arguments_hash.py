@@ -0,0 +1,22 @@
+"""Added job arguments hash
+
+Revision ID: 1793008800
+Revises: 1792922400
+Create Date: 2026-10-26 10:00:00.000000
+"""
+
+import alembic.op
+import sqlalchemy
+
+revision = "1793008800"
+down_revision = "1792922400"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.add_column("job", sqlalchemy.Column("arguments_hash", sqlalchemy.String(), nullable=True))
+
+
+def downgrade():
+    alembic.op.drop_column("job", "arguments_hash")
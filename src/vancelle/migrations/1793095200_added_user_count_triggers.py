@@ -0,0 +1,170 @@
+"""Added UserCount triggers
+
+Keeps 'user_count' up to date with triggers on the 'work' and 'remote' tables, which add the
+change made by each statement to the counts it affects instead of rebuilding every count.
+
+Entries are deleted by cascade after their work has gone, when their user can no longer be
+found, so the counts for a work's entries are taken away by a row-level trigger just before
+the work is deleted.
+
+Revision ID: 1793095200
+Revises: 1793008800
+Create Date: 2026-10-27 10:00:00.000000
+"""
+
+import alembic.op
+
+revision = "1793095200"
+down_revision = "1793008800"
+branch_labels = ()
+depends_on = None
+
+
+def upgrade():
+    alembic.op.execute(
+        """
+        CREATE FUNCTION add_user_counts(deltas user_count[]) RETURNS void LANGUAGE sql AS $$
+            -- Users that are being deleted are skipped, as their counts are deleted with them.
+            INSERT INTO user_count (user_id, category, key, count)
+            SELECT d.user_id, d.category, d.key, sum(d.count)
+            FROM unnest(deltas) AS d JOIN "user" ON "user".id = d.user_id
+            GROUP BY d.user_id, d.category, d.key
+            HAVING sum(d.count) <> 0
+            ON CONFLICT (user_id, category, key) DO UPDATE SET count = user_count.count + excluded.count;
+
+            DELETE FROM user_count
+            WHERE count = 0 AND (user_id, category, key) IN (SELECT d.user_id, d.category, d.key FROM unnest(deltas) AS d);
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_user_count_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM add_user_counts(ARRAY(
+                    SELECT ROW(user_id, 'work_type', type, 1)::user_count FROM new_rows
+                    UNION ALL
+                    SELECT ROW(user_id, 'shelf', shelf, 1)::user_count FROM new_rows
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM add_user_counts(ARRAY(
+                    SELECT ROW(user_id, 'work_type', type, -1)::user_count FROM old_rows
+                    UNION ALL
+                    SELECT ROW(user_id, 'shelf', shelf, -1)::user_count FROM old_rows
+                ));
+            ELSE
+                PERFORM add_user_counts(ARRAY(
+                    WITH changed AS (
+                        SELECT o.user_id AS old_user_id, o.type AS old_type, o.shelf AS old_shelf, n.user_id, n.type, n.shelf
+                        FROM old_rows AS o JOIN new_rows AS n USING (id)
+                        WHERE (o.user_id, o.type, o.shelf) IS DISTINCT FROM (n.user_id, n.type, n.shelf)
+                    )
+                    SELECT ROW(old_user_id, 'work_type', old_type, -1)::user_count FROM changed
+                    UNION ALL
+                    SELECT ROW(old_user_id, 'shelf', old_shelf, -1)::user_count FROM changed
+                    UNION ALL
+                    SELECT ROW(user_id, 'work_type', type, 1)::user_count FROM changed
+                    UNION ALL
+                    SELECT ROW(user_id, 'shelf', shelf, 1)::user_count FROM changed
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION work_entry_user_count_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM add_user_counts(ARRAY(
+                SELECT ROW(OLD.user_id, 'entry_type', type, -count(*))::user_count FROM remote WHERE work_id = OLD.id GROUP BY type
+            ));
+            RETURN OLD;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE FUNCTION remote_user_count_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Entries whose work has already been deleted were counted by work_entry_user_count_trigger().
+            IF TG_OP = 'INSERT' THEN
+                PERFORM add_user_counts(ARRAY(
+                    SELECT ROW(work.user_id, 'entry_type', n.type, 1)::user_count
+                    FROM new_rows AS n JOIN work ON work.id = n.work_id
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM add_user_counts(ARRAY(
+                    SELECT ROW(work.user_id, 'entry_type', o.type, -1)::user_count
+                    FROM old_rows AS o JOIN work ON work.id = o.work_id
+                ));
+            ELSE
+                PERFORM add_user_counts(ARRAY(
+                    WITH changed AS (
+                        SELECT o.type, o.work_id AS old_work_id, n.work_id
+                        FROM old_rows AS o JOIN new_rows AS n USING (type, id)
+                        WHERE o.work_id IS DISTINCT FROM n.work_id
+                    )
+                    SELECT ROW(work.user_id, 'entry_type', changed.type, -1)::user_count
+                    FROM changed JOIN work ON work.id = changed.old_work_id
+                    UNION ALL
+                    SELECT ROW(work.user_id, 'entry_type', changed.type, 1)::user_count
+                    FROM changed JOIN work ON work.id = changed.work_id
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER work_user_count_insert
+        AFTER INSERT ON work REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION work_user_count_trigger();
+
+        CREATE TRIGGER work_user_count_update
+        AFTER UPDATE ON work REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION work_user_count_trigger();
+
+        CREATE TRIGGER work_user_count_delete
+        AFTER DELETE ON work REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION work_user_count_trigger();
+
+        CREATE TRIGGER work_entry_user_count_delete
+        BEFORE DELETE ON work
+        FOR EACH ROW EXECUTE FUNCTION work_entry_user_count_trigger();
+        """
+    )
+    alembic.op.execute(
+        """
+        CREATE TRIGGER remote_user_count_insert
+        AFTER INSERT ON remote REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_user_count_trigger();
+
+        CREATE TRIGGER remote_user_count_update
+        AFTER UPDATE ON remote REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_user_count_trigger();
+
+        CREATE TRIGGER remote_user_count_delete
+        AFTER DELETE ON remote REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION remote_user_count_trigger();
+        """
+    )
+
+
+def downgrade():
+    alembic.op.execute("DROP TRIGGER remote_user_count_delete ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_user_count_update ON remote;")
+    alembic.op.execute("DROP TRIGGER remote_user_count_insert ON remote;")
+    alembic.op.execute("DROP TRIGGER work_entry_user_count_delete ON work;")
+    alembic.op.execute("DROP TRIGGER work_user_count_delete ON work;")
+    alembic.op.execute("DROP TRIGGER work_user_count_update ON work;")
+    alembic.op.execute("DROP TRIGGER work_user_count_insert ON work;")
+    alembic.op.execute("DROP FUNCTION remote_user_count_trigger();")
+    alembic.op.execute("DROP FUNCTION work_entry_user_count_trigger();")
+    alembic.op.execute("DROP FUNCTION work_user_count_trigger();")
+    alembic.op.execute("DROP FUNCTION add_user_counts(user_count[]);")
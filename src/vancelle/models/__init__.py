@@ -1,13 +1,17 @@
 from vancelle.models.base import Base
+from vancelle.models.job import Job
 from vancelle.models.record import Record
 from vancelle.models.entry import Entry
-from vancelle.models.user import User
-from vancelle.models.work import Work
+from vancelle.models.user import User, UserCount
+from vancelle.models.work import Work, WorkDetails
 
 __all__ = (
     "Base",
+    "Job",
     "Record",
     "Entry",
     "User",
+    "UserCount",
     "Work",
+    "WorkDetails",
 )
@@ -1,5 +1,7 @@
 import dataclasses
 import datetime
+import hashlib
+import json
 import typing
 import uuid
 
@@ -93,6 +95,9 @@ class Entry(PolymorphicBase, IntoDetails, IntoProperties):
 
     info: typing.ClassVar[EntryInfo]
 
+    # Keys in `data` that a source changes without the content changing (e.g. popularity). See hash_content().
+    volatile_keys: typing.ClassVar[frozenset[str]] = frozenset()
+
     work_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("work.id", ondelete="cascade"))
     type: Mapped[str] = mapped_column(primary_key=True)
 
@@ -112,10 +117,17 @@ class Entry(PolymorphicBase, IntoDetails, IntoProperties):
     tags: Mapped[typing.Optional[set[str]]] = mapped_column(ARRAY(String), default=None)
     data: Mapped[typing.Optional[typing.Any]] = mapped_column(JSONB, default=None)
 
+    # Validators from the upstream response, sent with the next refresh so that an unchanged entry isn't fetched.
+    etag: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    last_modified: Mapped[typing.Optional[str]] = mapped_column(default=None)
+
+    # A hash of the fetched content, so that refreshing an unchanged entry doesn't write it. See hash_content().
+    content_hash: Mapped[typing.Optional[str]] = mapped_column(default=None)
+
     # The 'shelf' column is vestigial and can be removed. Check for data loss first.
     shelf: Mapped[typing.Optional[Shelf]] = mapped_column(ShelfEnum, default=None)
 
-    work: Mapped["Work"] = relationship(back_populates="entries", lazy="selectin")
+    work: Mapped["Work"] = relationship(back_populates="entries", lazy="raise")
 
     def url_for(self) -> str:
         return url_for("entry.detail", entry_type=self.type, entry_id=self.id)
@@ -174,6 +186,46 @@ class Entry(PolymorphicBase, IntoDetails, IntoProperties):
     def resolve_title(self) -> str:
         return self.title if self.title else self.resolve_subtitle()
 
+    def hash_content(self) -> str:
+        """
+        A hash of the content fetched from a source, which doesn't change when the same content is fetched again.
+
+        >>> a = TmdbMovie(id="1", title="Dune", tags={"b", "a"}, data={"x": 1, "y": 2})
+        >>> b = TmdbMovie(id="1", title="Dune", tags={"a", "b"}, data={"y": 2, "x": 1})
+        >>> a.hash_content() == b.hash_content()
+        True
+        >>> a.hash_content() == TmdbMovie(id="1", title="Dune Part One").hash_content()
+        False
+
+        Volatile keys are left out, wherever they are in the data.
+
+        >>> c = TmdbMovie(id="1", title="Dune", tags={"a", "b"}, data={"x": 1, "y": 2, "popularity": 9.5})
+        >>> d = TmdbMovie(id="1", title="Dune", tags={"a", "b"}, data={"x": 1, "y": 2, "popularity": 12.1})
+        >>> c.hash_content() == d.hash_content() == a.hash_content()
+        True
+        """
+        content = {
+            "title": self.title,
+            "author": self.author,
+            "series": self.series,
+            "description": self.description,
+            "release_date": self.release_date.isoformat() if self.release_date else None,
+            "cover": self.cover,
+            "background": self.background,
+            "tags": sorted(self.tags) if self.tags else None,
+            "data": self._without_volatile_keys(self.data),
+        }
+        encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+    @classmethod
+    def _without_volatile_keys(cls, value: typing.Any) -> typing.Any:
+        if isinstance(value, dict):
+            return {k: cls._without_volatile_keys(v) for k, v in value.items() if k not in cls.volatile_keys}
+        if isinstance(value, list):
+            return [cls._without_volatile_keys(v) for v in value]
+        return value
+
     def resolve_subtitle(self) -> str:
         return f"{self.info.noun_full} {self.id}"
 
@@ -308,6 +360,7 @@ class SteamApplication(Entry):
         noun="app",
         priority=99,
     )
+    volatile_keys = frozenset({"recommendations"})
 
     def external_url(self) -> str | None:
         return f"https://store.steampowered.com/app/{self.id}/"
@@ -344,6 +397,7 @@ class TmdbMovie(Entry):
         noun="movie",
         priority=40,
     )
+    volatile_keys = frozenset({"popularity", "vote_average", "vote_count"})
 
     def external_url(self) -> str | None:
         return f"https://www.themoviedb.org/movie/{self.id}"
@@ -357,6 +411,7 @@ class TmdbTvSeries(Entry):
         noun="series",
         priority=31,
     )
+    volatile_keys = frozenset({"popularity", "vote_average", "vote_count"})
 
     def external_url(self) -> str | None:
         return f"https://www.themoviedb.org/tv/{self.id}"
@@ -0,0 +1,73 @@
+import datetime
+import hashlib
+import json
+import typing
+import uuid
+
+from sqlalchemy import ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+JobStatus = typing.Literal["queued", "running", "succeeded", "failed"]
+
+
+class Job(Base):
+    """
+    A long-running task, queued in the database and run in the background by `flask jobs worker`.
+
+    Workers claim queued jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can share the queue.
+    """
+
+    __tablename__ = "job"
+    __table_args__ = (Index("ix_job_queued", "time_created", postgresql_where=text("status = 'queued'")),)
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[typing.Optional[uuid.UUID]] = mapped_column(ForeignKey("user.id", ondelete="cascade"), index=True)
+
+    kind: Mapped[str] = mapped_column()
+    title: Mapped[str] = mapped_column()
+    arguments: Mapped[typing.Any] = mapped_column(JSONB, default=dict)
+    arguments_hash: Mapped[typing.Optional[str]] = mapped_column(default=None)
+
+    status: Mapped[str] = mapped_column(default="queued")  # One of JobStatus.
+    attempts: Mapped[int] = mapped_column(default=0)
+    progress: Mapped[int] = mapped_column(default=0)
+    total: Mapped[typing.Optional[int]] = mapped_column(default=None)
+    message: Mapped[typing.Optional[str]] = mapped_column(default=None)
+
+    time_created: Mapped[datetime.datetime] = mapped_column(default=func.now(), insert_default=func.now())
+    time_updated: Mapped[typing.Optional[datetime.datetime]] = mapped_column(default=None, onupdate=func.now())
+    time_started: Mapped[typing.Optional[datetime.datetime]] = mapped_column(default=None)
+    time_finished: Mapped[typing.Optional[datetime.datetime]] = mapped_column(default=None)
+
+    def __repr__(self) -> str:
+        return f"<Job {self.id} {self.kind} {self.status}>"
+
+    @staticmethod
+    def hash_arguments(arguments: dict[str, typing.Any]) -> str:
+        """
+        A short hash of a job's arguments, so queued jobs can be compared without reading what may be a whole backup.
+
+        >>> Job.hash_arguments({"a": 1, "b": [2]}) == Job.hash_arguments({"b": [2], "a": 1})
+        True
+        >>> Job.hash_arguments({"a": 1}) == Job.hash_arguments({"a": 2})
+        False
+        """
+        encoded = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    @property
+    def percent(self) -> int | None:
+        """
+        >>> Job(progress=5, total=20).percent
+        25
+        >>> Job(progress=0, total=None).percent is None
+        True
+        """
+        return round(100 * self.progress / self.total) if self.total else None
@@ -0,0 +1,60 @@
+"""
+Loader profiles for works, entries and records.
+
+Relationships between works, entries and records are lazy="raise", so each query has to say which relationships
+the page that renders it will use. Each profile returns loader options for one kind of page, and takes the entity
+to load relationships from so that it can be used with aliases.
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
+
+from .entry import Entry
+from .record import Record
+from .work import Work
+
+# Loader options rather than the broader LoaderOption, so that profiles can be nested with joinedload(...).options().
+Profile = tuple[_AbstractLoad, ...]
+
+
+def work_list(work: type[Work] = Work) -> Profile:
+    """
+    Cards on the board and rows in the work index, which show stored details and each work's records.
+
+    Entries aren't loaded: a work without stored details loads its own entries, see Work.stored_details().
+    """
+    return (selectinload(work.details), selectinload(work.records))
+
+
+def work_detail(work: type[Work] = Work) -> Profile:
+    """A single work, with everything needed to render it, edit it, or refresh its details."""
+    return (
+        selectinload(work.details),
+        selectinload(work.records),
+        selectinload(work.entries).joinedload(Entry.work),
+    )
+
+
+def work_export(work: type[Work] = Work) -> Profile:
+    """Works being exported, which include their records and entries but not their stored details."""
+    return (selectinload(work.records), selectinload(work.entries))
+
+
+def work_refresh(work: type[Work] = Work) -> Profile:
+    """Works whose stored details are being refreshed after their entries were written without the ORM."""
+    return (selectinload(work.details), selectinload(work.entries))
+
+
+def entry_row(entry: type[Entry] = Entry) -> Profile:
+    """Rows in the entry index, which show the stored details of each entry's work."""
+    return (joinedload(entry.work).selectinload(Work.details),)
+
+
+def entry_detail(entry: type[Entry] = Entry) -> Profile:
+    """A single entry and its work, which is refreshed whenever the entry changes."""
+    return (joinedload(entry.work).options(*work_detail()),)
+
+
+def record_detail(record: type[Record] = Record) -> Profile:
+    """A single record, and the stored details of its work."""
+    return (joinedload(record.work).selectinload(Work.details),)
@@ -2,6 +2,7 @@ import typing
 import uuid
 
 from flask_login import UserMixin
+from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -17,7 +18,25 @@ class User(Base, UserMixin):
     username: Mapped[str] = mapped_column(unique=True)
     password: Mapped[str] = mapped_column()
 
+    # Incremented by every change to the user's works, entries, and records.
+    data_version: Mapped[int] = mapped_column(default=0, server_default="0")
+
     works: Mapped[typing.List["Work"]] = relationship(back_populates="user", viewonly=True, lazy="dynamic")
 
     def get_id(self) -> str:
         return str(self.id)
+
+
+class UserCount(Base):
+    """
+    How many works and entries a user has of each work type, entry type and shelf.
+
+    Kept up to date by triggers on the 'work' and 'remote' tables, and rebuilt by UserController after bulk writes.
+    """
+
+    __tablename__ = "user_count"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id", ondelete="cascade"), primary_key=True)
+    category: Mapped[str] = mapped_column(primary_key=True)  # 'work_type', 'entry_type' or 'shelf'.
+    key: Mapped[str] = mapped_column(primary_key=True)
+    count: Mapped[int] = mapped_column()
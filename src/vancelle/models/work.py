@@ -3,13 +3,15 @@ import datetime
 import typing
 import uuid
 
+import sqlalchemy.event
 from flask import url_for
-from sqlalchemy import ForeignKey, String, asc, func, nulls_last
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index, String, asc, func, nulls_last, select
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.functions import coalesce
 
-from .base import PolymorphicBase
+from .base import Base, PolymorphicBase
 from .details import Details, IntoDetails
 from .properties import CodeProperty, IntoProperties, Property, ShelfProperty, StringProperty, DatetimeProperty
 from .record import Record
@@ -59,12 +61,16 @@ class WorkInfo(IntoProperties):
 
 class Work(PolymorphicBase, IntoDetails, IntoProperties):
     __tablename__ = "work"
+    __table_args__ = (
+        Index("ix_work_search_document", "search_document", postgresql_using="gin"),
+        Index("ix_work_board", "user_id", "shelf", "sort_date"),
+    )
     __mapper_args__ = {"polymorphic_on": "type"}
 
     info: typing.ClassVar[WorkInfo]
 
-    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
-    user: Mapped[User] = relationship(back_populates="works")
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id", ondelete="cascade"))
+    user: Mapped[User] = relationship(back_populates="works", lazy="raise")
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
     type: Mapped[str] = mapped_column(String)
@@ -86,17 +92,33 @@ class Work(PolymorphicBase, IntoDetails, IntoProperties):
 
     notes: Mapped[typing.Optional[str]] = mapped_column(default=None)
 
+    # Maintained by the 'work_search_document' and 'remote_search_document' triggers.
+    search_document: Mapped[typing.Optional[str]] = mapped_column(TSVECTOR, default=None, deferred=True)
+
+    # Maintained by the 'work_sort_date' trigger, and the statement-level 'record_sort_date_*' and 'remote_sort_date_*' triggers.
+    sort_date: Mapped[typing.Optional[datetime.date]] = mapped_column(default=None, deferred=True)
+
+    # Relationships aren't loaded unless a query asks for them, see vancelle.models.loaders.
+    # Deleting a work doesn't load them either, the database deletes them with ON DELETE CASCADE.
     records: Mapped[typing.List["Record"]] = relationship(
         back_populates="work",
         order_by=nulls_last(asc(coalesce(Record.date_started, Record.date_stopped))),
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
     )
     entries: Mapped[typing.List["Entry"]] = relationship(
         back_populates="work",
         order_by="desc(Entry.id)",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="raise",
+    )
+    details: Mapped[typing.Optional["WorkDetails"]] = relationship(
+        back_populates="work",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
 
     @property
@@ -198,6 +220,144 @@ class Work(PolymorphicBase, IntoDetails, IntoProperties):
             external_url=next((d.external_url for d in details if d.external_url), None),
         )
 
+    def stored_details(self) -> Details:
+        """Resolved details read from WorkDetails, which doesn't need the work's entries to be loaded."""
+        if self.details is None:
+            self._load_entries()
+            return self.resolve_details()
+
+        return self.details.into_details()
+
+    def stored_title(self) -> str:
+        return self.stored_details().title or f"Work {self.id}"
+
+    def count_entries(self) -> int:
+        if self.details is None:
+            self._load_entries()
+            return len(self.entries)
+
+        return self.details.entry_count
+
+    def _load_entries(self) -> None:
+        """
+        Load entries for a work without stored details, if the query that loaded it didn't.
+
+        Entries are lazy="raise", so this loads them explicitly rather than through the relationship.
+        """
+        state = sqlalchemy.inspect(self)
+        if "entries" not in state.unloaded or (session := state.session) is None:
+            return
+
+        entries = session.execute(select(Entry).filter_by(work_id=self.id).order_by(Entry.id.desc())).scalars().all()
+        set_committed_value(self, "entries", list(entries))
+
+    def refresh_details(self, *, exclude: typing.Container["Entry"] = ()) -> "WorkDetails":
+        """Update WorkDetails, coalescing fields in the same order as resolve_details()."""
+        entries = [entry for entry in self.entries if entry not in exclude]
+        items: list[Work | Entry] = [self, *(entry for entry in self.iter_active_entries() if entry in entries)]
+
+        if self.details is None:
+            self.details = WorkDetails()
+
+        self.details.title = next((item.title for item in items if item.title), None)
+        self.details.author = next((item.author for item in items if item.author), None)
+        self.details.series = next((item.series for item in items if item.series), None)
+        self.details.release_date = next((item.release_date for item in items if item.release_date), None)
+        self.details.tags = next((item.tags for item in items if item.tags), None)
+        self.details.cover_type, self.details.cover_id = self._origin(next((i for i in items if i.cover), None))
+        self.details.background_type, self.details.background_id = self._origin(next((i for i in items if i.background), None))
+        self.details.entry_count = len(entries)
+        return self.details
+
+    def _origin(self, item: typing.Union["Work", "Entry", None]) -> tuple[str | None, str | None]:
+        if item is None:
+            return None, None
+        if isinstance(item, Work):
+            return "work", str(item.id)
+        return item.type, item.id
+
+
+class WorkDetails(Base):
+    """
+    The resolved details of a work, stored so that lists of works can be rendered without their entries.
+
+    Cover and background images are stored as the type and ID of the work or entry they came from.
+    """
+
+    __tablename__ = "work_details"
+
+    work_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("work.id", ondelete="cascade"), primary_key=True)
+    work: Mapped[Work] = relationship(back_populates="details", lazy="raise")
+
+    title: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    author: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    series: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    release_date: Mapped[typing.Optional[datetime.date]] = mapped_column(default=None)
+    tags: Mapped[typing.Optional[set[str]]] = mapped_column(ARRAY(String), default=None)
+    cover_type: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    cover_id: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    background_type: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    background_id: Mapped[typing.Optional[str]] = mapped_column(default=None)
+    entry_count: Mapped[int] = mapped_column(default=0)
+
+    def into_details(self) -> Details:
+        return Details(
+            title=self.title,
+            author=self.author,
+            series=self.series,
+            description=None,
+            release_date=self.release_date,
+            cover=self._url_for("cover", self.cover_type, self.cover_id),
+            background=self._url_for("background", self.background_type, self.background_id),
+            tags=self.tags or set(),
+            external_url=None,
+        )
+
+    @staticmethod
+    def _url_for(image: typing.Literal["cover", "background"], origin_type: str | None, origin_id: str | None) -> str | None:
+        if origin_type is None:
+            return None
+        if origin_type == "work":
+            return url_for(f"work.{image}", work_id=origin_id)
+        return url_for(f"entry.{image}", entry_type=origin_type, entry_id=origin_id)
+
+
+@sqlalchemy.event.listens_for(Session, "before_flush")
+def refresh_work_details(session: Session, flush_context: typing.Any, instances: typing.Any) -> None:
+    """Keep WorkDetails up to date whenever a work or one of its entries is flushed."""
+    works: set[Work] = set()
+    with session.no_autoflush:
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(instance, Work):
+                works.add(instance)
+            elif isinstance(instance, Entry) and (work := _entry_work(session, instance)) is not None:
+                works.add(work)
+
+        _load_for_refresh(session, [work for work in works if work not in session.deleted])
+
+        deleted_entries = {instance for instance in session.deleted if isinstance(instance, Entry)}
+        for work in works:
+            if work not in session.deleted:
+                work.refresh_details(exclude=deleted_entries)
+
+
+def _entry_work(session: Session, entry: Entry) -> Work | None:
+    if "work" not in sqlalchemy.inspect(entry).unloaded:
+        return entry.work
+    if entry.work_id is None:
+        return None
+    return session.get(Work, entry.work_id)
+
+
+def _load_for_refresh(session: Session, works: typing.Iterable[Work]) -> None:
+    """Load the entries and details of any persistent works that were loaded without them."""
+    work_ids = [
+        work.id for work in works if (state := sqlalchemy.inspect(work)).persistent and {"entries", "details"} & state.unloaded
+    ]
+    if work_ids:
+        statement = select(Work).filter(Work.id.in_(work_ids)).options(selectinload(Work.entries), selectinload(Work.details))
+        session.execute(statement).all()
+
 
 class Book(Work):
     __mapper_args__ = {"polymorphic_identity": "book"}
@@ -0,0 +1,97 @@
+import datetime
+import typing
+
+import hishel
+import httpx
+import pytest
+
+from vancelle.clients.cache import CachePolicy, NotModified, Validators, conditional
+from vancelle.clients.client import HttpClient
+
+DAY = datetime.timedelta(days=1)
+
+
+def client_for(policy: CachePolicy, responses: list[httpx.Response]) -> tuple[HttpClient, list[httpx.Request]]:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[min(len(requests), len(responses)) - 1]
+
+    class Client(HttpClient):
+        cache_policy = policy
+
+    client = hishel.CacheClient(
+        storage=hishel.InMemoryStorage(),
+        controller=policy.controller(),
+        transport=httpx.MockTransport(handler),
+    )
+    return Client(client=client), requests
+
+
+def test_ttl_overrides_cache_headers() -> None:
+    client, requests = client_for(CachePolicy(ttl=DAY), [httpx.Response(200, text="a", headers={"Cache-Control": "no-store"})])
+
+    assert client.get("https://example.invalid/", params={"a": "1", "b": "2"}).text == "a"
+    assert client.get("https://example.invalid/", params={"b": "2", "a": "1"}).text == "a"
+    assert len(requests) == 1
+
+
+def test_stale_while_revalidate(join_threads: typing.Callable[[str], None]) -> None:
+    policy = CachePolicy(ttl=datetime.timedelta(0), stale_while_revalidate=DAY)
+    client, requests = client_for(policy, [httpx.Response(200, text="old"), httpx.Response(200, text="new")])
+
+    assert client.get("https://example.invalid/").text == "old"
+    assert client.get("https://example.invalid/").text == "old"
+    join_threads("refresh-https://example.invalid")
+
+    assert len(requests) == 2
+    assert client.get("https://example.invalid/").text == "new"
+
+
+@pytest.mark.parametrize(("stale_if_error", "usable"), [(DAY, True), (datetime.timedelta(0), False)])
+def test_stale_if_error(stale_if_error: datetime.timedelta, usable: bool) -> None:
+    policy = CachePolicy(ttl=datetime.timedelta(0), stale_if_error=stale_if_error)
+    client, requests = client_for(policy, [httpx.Response(200, text="old"), httpx.Response(404)])
+
+    assert client.get("https://example.invalid/").text == "old"
+    if usable:
+        assert client.get("https://example.invalid/").text == "old"
+    else:
+        with pytest.raises(httpx.HTTPStatusError):
+            client.get("https://example.invalid/")
+
+    # The expired response was refreshed once, and the error response was not cached in its place.
+    assert len(requests) == 2
+
+
+def test_conditional_request() -> None:
+    headers = {"ETag": '"v1"', "Last-Modified": "Wed, 21 Oct 2026 07:28:00 GMT"}
+    responses = [httpx.Response(200, text="a", headers=headers), httpx.Response(200, text="b"), httpx.Response(304)]
+    client, requests = client_for(CachePolicy(ttl=DAY), responses)
+
+    with conditional(Validators()) as request:
+        assert client.get("https://example.invalid/").text == "a"
+        assert client.get("https://example.invalid/other").text == "b"
+    assert request.fetched == Validators(etag='"v1"', last_modified="Wed, 21 Oct 2026 07:28:00 GMT")
+
+    with pytest.raises(NotModified), conditional(request.fetched):
+        client.get("https://example.invalid/")
+
+    assert requests[-1].headers["If-None-Match"] == '"v1"'
+    assert requests[-1].headers["If-Modified-Since"] == "Wed, 21 Oct 2026 07:28:00 GMT"
+    assert client.get("https://example.invalid/").text == "a"
+    assert len(requests) == 3
+
+
+def test_conditional_request_without_validators_bypasses_cache() -> None:
+    responses = [httpx.Response(200, text="old"), httpx.Response(200, text="new", headers={"ETag": '"v2"'})]
+    client, requests = client_for(CachePolicy(ttl=DAY), responses)
+    assert client.get("https://example.invalid/").text == "old"
+
+    with conditional(Validators()) as request:
+        assert client.get("https://example.invalid/").text == "new"
+
+    assert request.fetched == Validators(etag='"v2"')
+    assert "If-None-Match" not in requests[-1].headers
+    assert len(requests) == 2
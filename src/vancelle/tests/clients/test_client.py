@@ -0,0 +1,57 @@
+import asyncio
+import concurrent.futures
+import pathlib
+
+import flask
+import pytest
+import svcs.flask
+
+from vancelle.clients.client import HttpClientBuilder, HttpClientPool
+from vancelle.clients.openlibrary.client import AsyncOpenLibraryAPI, OpenLibraryAPI
+
+
+@pytest.fixture()
+def pool(tmp_path: pathlib.Path) -> HttpClientPool:
+    return HttpClientPool(HttpClientBuilder(tmp_path), flask.Config(tmp_path))
+
+
+def test_pool_reuses_clients(pool: HttpClientPool) -> None:
+    assert pool.get(OpenLibraryAPI) is pool.get(OpenLibraryAPI)
+
+
+def test_pool_discards_clients_after_fork(pool: HttpClientPool, monkeypatch: pytest.MonkeyPatch) -> None:
+    parent = pool.get(OpenLibraryAPI)
+    monkeypatch.setattr("os.getpid", lambda: -1)
+    assert pool.get(OpenLibraryAPI) is not parent
+
+
+def test_pool_close(pool: HttpClientPool) -> None:
+    client = pool.get(OpenLibraryAPI)
+    pool.close()
+    assert client.client.is_closed
+    assert pool.get(OpenLibraryAPI) is not client
+
+
+def test_sqlite_storage_is_shared_between_threads(tmp_path: pathlib.Path) -> None:
+    storage = HttpClientBuilder(tmp_path).sqlite_storage_for(OpenLibraryAPI)
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        assert executor.submit(storage.retrieve, "missing").result() is None
+
+
+def test_factory_returns_pooled_client(app: flask.Flask) -> None:
+    with app.app_context():
+        first = svcs.flask.get(OpenLibraryAPI)
+    with app.app_context():
+        second = svcs.flask.get(OpenLibraryAPI)
+
+    assert first is second
+
+
+def test_open_async_shares_cache_with_sync_client(pool: HttpClientPool, tmp_path: pathlib.Path) -> None:
+    async def main() -> AsyncOpenLibraryAPI:
+        async with pool.open_async(AsyncOpenLibraryAPI) as client:
+            return client
+
+    client = asyncio.run(main())
+    assert client.client.is_closed
+    assert (tmp_path / "OpenLibraryAPI.sqlite").exists()
@@ -0,0 +1,79 @@
+import datetime
+import pathlib
+import threading
+import typing
+
+import pytest
+
+from vancelle.clients.metadata import MetadataCache
+
+
+def test_missing_value_returns_default_and_refreshes_in_background(
+    tmp_path: pathlib.Path, join_threads: typing.Callable[[str], None]
+) -> None:
+    cache = MetadataCache(tmp_path / "metadata.sqlite")
+    release = threading.Event()
+
+    def refresh() -> dict:
+        release.wait(timeout=5)
+        return {"value": "fetched"}
+
+    assert cache.get("key", {"value": "default"}, refresh) == {"value": "default"}
+    release.set()
+    join_threads("refresh-key")
+
+    assert cache.get("key", {"value": "default"}, refresh) == {"value": "fetched"}
+
+
+def test_values_are_shared_between_processes(tmp_path: pathlib.Path) -> None:
+    MetadataCache(tmp_path / "metadata.sqlite").set("key", ["shared"])
+    other = MetadataCache(tmp_path / "metadata.sqlite")
+    assert other.get("key", [], lambda: ["refreshed"]) == ["shared"]
+
+
+def test_stale_value_is_used_while_refreshing(tmp_path: pathlib.Path, join_threads: typing.Callable[[str], None]) -> None:
+    cache = MetadataCache(tmp_path / "metadata.sqlite", ttl=datetime.timedelta(0))
+    cache.set("key", "stale")
+    calls = []
+
+    assert cache.get("key", "default", lambda: calls.append("refreshed") or "fresh") == "stale"
+    join_threads("refresh-key")
+    assert calls == ["refreshed"]
+
+
+def test_failed_refresh_is_retried(tmp_path: pathlib.Path, join_threads: typing.Callable[[str], None]) -> None:
+    cache = MetadataCache(tmp_path / "metadata.sqlite")
+    calls = []
+
+    def refresh() -> str:
+        calls.append("refresh")
+        if len(calls) == 1:
+            raise RuntimeError("unavailable")
+        return "fresh"
+
+    assert cache.get("key", "default", refresh) == "default"
+    join_threads("refresh-key")
+
+    assert cache.get("key", "default", refresh) == "default"
+    join_threads("refresh-key")
+
+    assert calls == ["refresh", "refresh"]
+    assert cache.get("key", "default", refresh) == "fresh"
+
+
+def test_refresh_in_flight_skips_database(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch, join_threads: typing.Callable[[str], None]
+) -> None:
+    cache = MetadataCache(tmp_path / "metadata.sqlite")
+    release = threading.Event()
+    loads = []
+    load = cache._load
+    monkeypatch.setattr(cache, "_load", lambda key: loads.append(key) or load(key))
+
+    for _ in range(10):
+        assert cache.get("key", "default", lambda: release.wait(timeout=5) and "fresh") == "default"
+    release.set()
+    join_threads("refresh-key")
+
+    assert loads == ["key"]
+    assert cache.get("key", "default", lambda: "unused") == "fresh"
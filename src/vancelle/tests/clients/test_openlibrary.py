@@ -0,0 +1,123 @@
+import asyncio
+import collections
+import pathlib
+
+import hishel
+import httpx
+import pytest
+
+from vancelle.clients.openlibrary.authors import AuthorCache
+from vancelle.clients.openlibrary.client import AsyncOpenLibraryAPI, OpenLibraryAPI
+
+
+def edition(key: str, *authors: str) -> dict:
+    return {
+        "key": f"/books/{key}",
+        "title": key,
+        "works": [{"key": "/works/OL1W"}],
+        "authors": [{"key": f"/authors/{author}"} for author in authors],
+    }
+
+
+class FakeOpenLibrary:
+    def __init__(self) -> None:
+        self.requests: collections.Counter[str] = collections.Counter()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests[request.url.path] += 1
+
+        if request.url.path.startswith("/authors/"):
+            return httpx.Response(200, json={"name": request.url.path.split("/")[-1].removesuffix(".json")})
+        if request.url.path == "/works/OL1W/editions.json":
+            return httpx.Response(200, json={"entries": [edition("OL1M", "OL1A", "OL2A"), edition("OL2M", "OL2A")]})
+        if request.url.path == "/books/OL1M.json":
+            return httpx.Response(200, json=edition("OL1M", "OL1A", "OL2A"))
+        return httpx.Response(404)
+
+    def author_requests(self) -> int:
+        return sum(count for path, count in self.requests.items() if path.startswith("/authors/"))
+
+
+@pytest.fixture()
+def openlibrary() -> FakeOpenLibrary:
+    return FakeOpenLibrary()
+
+
+def test_work_editions_fetches_each_author_once(tmp_path: pathlib.Path, openlibrary: FakeOpenLibrary) -> None:
+    def api() -> OpenLibraryAPI:
+        return OpenLibraryAPI(
+            client=hishel.CacheClient(storage=hishel.InMemoryStorage(), transport=httpx.MockTransport(openlibrary)),
+            author_cache=AuthorCache(tmp_path / "authors.sqlite"),
+        )
+
+    editions = api().work_editions("OL1W")
+    assert [e.author for e in editions] == ["OL1A, OL2A", "OL2A"]
+    assert openlibrary.author_requests() == 2
+
+    # A new client with an empty HTTP cache still finds the authors in the author cache.
+    api().work_editions("OL1W")
+    assert openlibrary.author_requests() == 2
+
+
+def test_async_edition(tmp_path: pathlib.Path, openlibrary: FakeOpenLibrary) -> None:
+    async def main():
+        storage = hishel.AsyncInMemoryStorage()
+        async with hishel.AsyncCacheClient(storage=storage, transport=httpx.MockTransport(openlibrary)) as client:
+            api = AsyncOpenLibraryAPI(client=client, author_cache=AuthorCache(tmp_path / "authors.sqlite"))
+            return await api.edition("OL1M")
+
+    result = asyncio.run(main())
+    assert result.id == "OL1M"
+    assert result.author == "OL1A, OL2A"
+    assert openlibrary.author_requests() == 2
+
+
+def test_async_authors_are_fetched_with_bounded_concurrency(tmp_path: pathlib.Path) -> None:
+    in_flight, peak = 0, 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"name": request.url.path})
+
+    async def main() -> dict:
+        storage = hishel.AsyncInMemoryStorage()
+        async with hishel.AsyncCacheClient(storage=storage, transport=httpx.MockTransport(handler)) as client:
+            api = AsyncOpenLibraryAPI(client=client, author_cache=AuthorCache(tmp_path / "authors.sqlite"))
+            api.max_author_requests = 3
+            return await api.authors(f"OL{i}A" for i in range(12))
+
+    assert len(asyncio.run(main())) == 12
+    assert peak == 3
+
+
+def test_author_cache_expires(tmp_path: pathlib.Path) -> None:
+    cache = AuthorCache(tmp_path / "authors.sqlite")
+    cache.set_many({"OL1A": {"name": "Author"}})
+    assert cache.get_many(["OL1A", "OL2A"]) == {"OL1A": {"name": "Author"}}
+
+    cache.max_age = cache.max_age * 0
+    assert cache.get_many(["OL1A"]) == {}
+
+
+def test_search_requests_one_page_of_slim_docs(tmp_path: pathlib.Path) -> None:
+    docs = [{"key": f"/works/OL{i}W", "title": f"Title {i}", "author_name": ["Author"]} for i in range(2)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["fields"] == "key,title,author_name"
+        assert request.url.params["page"] == "3"
+        assert request.url.params["limit"] == "2"
+        return httpx.Response(200, json={"numFound": 42, "numFoundExact": True, "start": 4, "docs": docs})
+
+    api = OpenLibraryAPI(
+        client=hishel.CacheClient(storage=hishel.InMemoryStorage(), transport=httpx.MockTransport(handler)),
+        author_cache=AuthorCache(tmp_path / "authors.sqlite"),
+    )
+    results = api.search("query", page=3, per_page=2)
+
+    assert (results.count, results.page, results.per_page) == (42, 3, 2)
+    assert [work.id for work in results] == ["OL0W", "OL1W"]
+    assert results.items[1].data["doc"] == docs[1]
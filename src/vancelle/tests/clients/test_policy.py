@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+import pytest
+
+from vancelle.clients.policy import AsyncPolicyTransport, CircuitOpen, HostPolicies, HostPolicy, PolicyTransport, TokenBucket
+
+FAST = HostPolicy(rate=1000.0, burst=1000, backoff=0.0, failure_threshold=3, reset_after=60.0)
+
+
+def responses(*statuses: int, headers: dict[str, str] | None = None) -> httpx.MockTransport:
+    remaining = list(statuses)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(remaining.pop(0), headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+def test_retries_server_errors() -> None:
+    client = httpx.Client(transport=PolicyTransport(responses(503, 502, 200), HostPolicies(FAST)))
+    assert client.get("https://example.invalid/").status_code == 200
+
+
+def test_gives_up_after_retries() -> None:
+    client = httpx.Client(transport=PolicyTransport(responses(503, 503, 503, 200), HostPolicies(FAST)))
+    assert client.get("https://example.invalid/").status_code == 503
+
+
+def test_does_not_retry_when_retry_after_is_too_long() -> None:
+    transport = PolicyTransport(responses(429, 200, headers={"Retry-After": "3600"}), HostPolicies(FAST))
+    assert httpx.Client(transport=transport).get("https://example.invalid/").status_code == 429
+
+
+def test_circuit_opens_and_fails_fast() -> None:
+    policy = HostPolicy(rate=1000.0, burst=1000, retries=0, failure_threshold=2)
+    client = httpx.Client(transport=PolicyTransport(responses(500, 500, 200), HostPolicies(policy)))
+
+    assert client.get("https://example.invalid/").status_code == 500
+    assert client.get("https://example.invalid/").status_code == 500
+    with pytest.raises(CircuitOpen):
+        client.get("https://example.invalid/")
+
+
+def test_policies_are_per_host() -> None:
+    policies = HostPolicies.from_config({"*": {"rate": 5.0}, "example.invalid": {"burst": 1}})
+    assert policies.state("example.invalid")[0] == HostPolicy(rate=5.0, burst=1)
+    assert policies.state("other.invalid")[0] == HostPolicy(rate=5.0)
+
+
+def test_token_bucket() -> None:
+    bucket = TokenBucket(rate=10.0, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_async_retries() -> None:
+    async def main() -> int:
+        transport = AsyncPolicyTransport(responses(500, 200), HostPolicies(FAST))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return (await client.get("https://example.invalid/")).status_code
+
+    assert asyncio.run(main()) == 200
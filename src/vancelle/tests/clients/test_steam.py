@@ -0,0 +1,61 @@
+import pathlib
+import typing
+
+import hishel
+import httpx
+import pytest
+
+from vancelle.clients.metadata import MetadataCache
+from vancelle.clients.steam.client_store_api import AppDetails, SteamStoreAPI
+
+CAPSULE = "https://cdn.cloudflare.steamstatic.com/steam/apps/10/library_600x900_2x.jpg"
+
+
+def api_for(tmp_path: pathlib.Path, responses: list[httpx.Response]) -> tuple[SteamStoreAPI, list[httpx.URL]]:
+    heads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        heads.append(request.url)
+        return responses[min(len(heads), len(responses)) - 1]
+
+    api = SteamStoreAPI(
+        client=hishel.CacheClient(storage=hishel.InMemoryStorage(), transport=httpx.MockTransport(handler)),
+        metadata_cache=MetadataCache(tmp_path / "metadata.sqlite"),
+    )
+    return api, heads
+
+
+def test_vertical_capsule_is_verified_in_the_background(
+    tmp_path: pathlib.Path, join_threads: typing.Callable[[str], None]
+) -> None:
+    api, heads = api_for(tmp_path, [httpx.Response(404)])
+    app = AppDetails(steam_appid=10)
+    missing: list[str] = []
+
+    # The candidate URL is used until the HEAD request has answered.
+    assert api.vertical_capsule(app, on_missing=missing.append) == CAPSULE
+    join_threads("refresh-steam")
+
+    # The missing capsule is reported, remembered, and not checked again.
+    assert missing == [CAPSULE]
+    assert api.vertical_capsule(app) is None
+    assert api.vertical_capsule(app) is None
+    assert len(heads) == 1
+
+
+@pytest.mark.parametrize("status_code", [403, 503])
+def test_vertical_capsule_failures_are_checked_again(
+    tmp_path: pathlib.Path, join_threads: typing.Callable[[str], None], status_code: int
+) -> None:
+    api, heads = api_for(tmp_path, [httpx.Response(status_code), httpx.Response(200)])
+    app = AppDetails(steam_appid=10)
+    missing: list[str] = []
+
+    assert api.vertical_capsule(app, on_missing=missing.append) == CAPSULE
+    join_threads("refresh-steam")
+    assert api.vertical_capsule(app, on_missing=missing.append) == CAPSULE
+    join_threads("refresh-steam")
+
+    assert missing == []
+    assert api.vertical_capsule(app) == CAPSULE
+    assert len(heads) == 2
@@ -0,0 +1,87 @@
+import datetime
+import pathlib
+import sqlite3
+
+import flask
+import hishel
+import httpx
+
+from vancelle.app import create_app
+from vancelle.clients.cache import CachePolicy
+from vancelle.clients.client import HttpClient
+from vancelle.clients.storage import CacheUsage, ClientCache, FileCacheStore, SQLiteCacheStore
+
+
+class ExampleClient(HttpClient):
+    cache_policy = CachePolicy(ttl=datetime.timedelta(days=1))
+
+
+def populate(path: pathlib.Path, usage: CacheUsage, urls: list[str]) -> hishel.CacheClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"x" * 1000)
+
+    def record(response: httpx.Response) -> None:
+        usage.record("ExampleClient", ExampleClient.cache_policy, response)
+
+    client = hishel.CacheClient(
+        storage=hishel.SQLiteStorage(connection=sqlite3.connect(path, check_same_thread=False)),
+        controller=ExampleClient.cache_policy.controller(),
+        transport=httpx.MockTransport(handler),
+        event_hooks={"response": [record]},
+    )
+    for url in urls:
+        client.get(url, extensions=ExampleClient.cache_policy.extensions())
+    return client
+
+
+def test_prune_evicts_least_recently_used(tmp_path: pathlib.Path) -> None:
+    usage = CacheUsage(tmp_path / "usage.sqlite")
+    populate(tmp_path / "ExampleClient.sqlite", usage, ["https://example.invalid/a", "https://example.invalid/b"])
+    populate(tmp_path / "ExampleClient.sqlite", usage, ["https://example.invalid/a"])
+    usage.flush()
+
+    cache = ClientCache.for_client(tmp_path, ExampleClient, budget=3000, usage=usage)
+    assert isinstance(cache.store, SQLiteCacheStore)
+    assert usage.counts("ExampleClient") == (1, 2)
+
+    evicted = cache.prune()
+    assert len(evicted) == 1
+    assert [entry.used is not None for entry in cache.entries()] == [True]
+
+
+def test_prune_evicts_expired(tmp_path: pathlib.Path) -> None:
+    usage = CacheUsage(tmp_path / "usage.sqlite")
+    populate(tmp_path / "ExampleClient.sqlite", usage, ["https://example.invalid/a"])
+
+    with sqlite3.connect(tmp_path / "ExampleClient.sqlite") as connection:
+        connection.execute("UPDATE cache SET date_created = date_created - ?", (2 * 24 * 60 * 60,))
+
+    cache = ClientCache.for_client(tmp_path, ExampleClient, budget=10_000, usage=usage)
+    assert len(cache.prune(dry_run=True)) == 1
+    assert cache.stats().entries == 1
+    assert len(cache.prune()) == 1
+    assert cache.stats().entries == 0
+
+
+def test_file_store_skips_dotfiles(tmp_path: pathlib.Path) -> None:
+    hishel.CacheClient(storage=hishel.FileStorage(base_path=tmp_path))
+    (tmp_path / "entry").write_bytes(b"x" * 10)
+
+    assert [(entry.key, entry.size) for entry in FileCacheStore(tmp_path).entries()] == [("entry", 10)]
+
+
+def test_cache_stats_command(tmp_path: pathlib.Path) -> None:
+    app: flask.Flask = create_app({
+        "TESTING": True,
+        "CACHE_PATH": str(tmp_path),
+        "SQLALCHEMY_ENGINES": {"default": "sqlite:///:memory:"},
+        "STEAM_WEB_API_KEY": "",
+        "TMDB_READ_ACCESS_TOKEN": "invalid",
+    })
+
+    result = app.test_cli_runner().invoke(args=["cache", "stats"])
+    assert result.exit_code == 0, result.output
+    assert "OpenLibraryAPI" in result.output
+
+    result = app.test_cli_runner().invoke(args=["cache", "prune", "NotAClient"])
+    assert result.exit_code == 2
@@ -1,12 +1,17 @@
 import logging
 import os
 import pathlib
+import threading
+import typing
+import uuid
 
 import flask
 import pytest
 import structlog
 
 from vancelle.app import create_app
+from vancelle.extensions import db
+from vancelle.models import User
 
 
 @pytest.fixture()
@@ -21,6 +26,52 @@ def app() -> flask.Flask:
     )
 
 
+@pytest.fixture()
+def database() -> typing.Iterator[flask.Flask]:
+    """
+    An app on a migrated PostgreSQL database, inside an app context whose session is rolled back after each test.
+
+    The session joins an outer transaction with savepoints, so controllers that commit can be tested too.
+    """
+    if not (url := os.environ.get("VANCELLE_TEST_DATABASE")):
+        pytest.skip("VANCELLE_TEST_DATABASE is not set")
+
+    app = create_app(
+        {
+            "TESTING": True,
+            "SECRET_KEY": "example",
+            "SQLALCHEMY_ENGINES": {"default": url},
+            "STEAM_WEB_API_KEY": "",
+            "TMDB_READ_ACCESS_TOKEN": "invalid",
+        }
+    )
+    with app.app_context(), db.engine.connect() as connection, connection.begin() as transaction:
+        db.sessionmaker.configure(bind=connection, join_transaction_mode="create_savepoint")
+        yield app
+        db.session.close()
+        transaction.rollback()
+
+
+@pytest.fixture()
+def database_user(database: flask.Flask) -> User:
+    user = User(id=uuid.uuid4(), username=f"user-{uuid.uuid4()}", password="")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture()
+def join_threads() -> typing.Callable[[str], None]:
+    """Wait for the background threads whose names start with a prefix, like the metadata cache's refreshes."""
+
+    def join(prefix: str) -> None:
+        for thread in threading.enumerate():
+            if thread.name.startswith(prefix):
+                thread.join(timeout=5)
+
+    return join
+
+
 @pytest.fixture()
 def root() -> pathlib.Path:
     return pathlib.Path(__file__).parent
@@ -0,0 +1,51 @@
+import typing
+import uuid
+
+import pytest
+import sqlalchemy
+import sqlalchemy.orm
+
+from vancelle.controllers.cache import ResultCache
+from vancelle.tests.items import Item, sqlite_engine
+
+
+def each(items: list[Item], function: typing.Callable[[Item], Item]) -> list[Item]:
+    return [function(item) for item in items]
+
+
+@pytest.fixture()
+def engine() -> sqlalchemy.Engine:
+    return sqlite_engine([Item(id=uuid.UUID(int=1), name="one"), Item(id=uuid.UUID(int=2), name="two")])
+
+
+def load(session: sqlalchemy.orm.Session) -> typing.Callable[[], list[Item]]:
+    return lambda: list(session.execute(sqlalchemy.select(Item).order_by(Item.id)).scalars())
+
+
+def test_hit_merges_without_queries(engine: sqlalchemy.Engine) -> None:
+    cache = ResultCache(maxsize=8)
+
+    with sqlalchemy.orm.Session(engine) as session:
+        items = cache.get_or_load(session, "key", load(session), each)
+        items[0].name = "changed"
+
+    queries = []
+    sqlalchemy.event.listen(engine, "before_cursor_execute", lambda *args: queries.append(args[2]))
+
+    with sqlalchemy.orm.Session(engine) as session:
+        items = cache.get_or_load(session, "key", load(session), each)
+        assert [item.name for item in items] == ["one", "two"]
+        assert all(item in session for item in items)
+
+    assert queries == []
+
+
+def test_evicts_least_recently_used(engine: sqlalchemy.Engine) -> None:
+    cache = ResultCache(maxsize=2)
+
+    with sqlalchemy.orm.Session(engine) as session:
+        for key in ("a", "b", "a", "c"):
+            cache.get_or_load(session, key, load(session), each)
+
+    assert len(cache) == 2
+    assert set(cache._items) == {"a", "c"}
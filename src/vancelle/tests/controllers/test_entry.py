@@ -0,0 +1,79 @@
+import datetime
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.entry import EntryWriter
+from vancelle.extensions import db
+from vancelle.models import User
+from vancelle.models.entry import Entry, TmdbMovie
+from vancelle.models.work import Film
+
+ancient = datetime.datetime(2000, 1, 1)
+
+
+def fetched(entry_id: str, work_id: uuid.UUID, title: str, popularity: float) -> TmdbMovie:
+    entry = TmdbMovie(
+        id=entry_id,
+        work_id=work_id,
+        title=title,
+        time_fetched=datetime.datetime.now(),
+        data={"title": title, "popularity": popularity},
+    )
+    entry.content_hash = entry.hash_content()
+    return entry
+
+
+def stored(entry_id: str) -> Entry:
+    statement = sqlalchemy.select(Entry).filter_by(type="tmdb.movie", id=entry_id)
+    return db.session.execute(statement.execution_options(populate_existing=True)).scalar_one()
+
+
+def age(entry_id: str) -> None:
+    statement = sqlalchemy.update(Entry).filter_by(type="tmdb.movie", id=entry_id)
+    db.session.execute(statement.values(time_updated=ancient, time_fetched=ancient))
+    db.session.commit()
+
+
+def test_writer_only_writes_changed_content(database_user: User) -> None:
+    work = Film(id=uuid.uuid4(), user_id=database_user.id)
+    db.session.add(work)
+    db.session.commit()
+    entry_id = str(uuid.uuid4())
+
+    with EntryWriter() as writer:
+        writer.add(fetched(entry_id, work.id, "Dune", popularity=9.5))
+    assert (writer.written, writer.unchanged) == (1, 0)
+    age(entry_id)
+
+    # Only the volatile popularity changed, so only the time it was fetched is written.
+    with EntryWriter() as writer:
+        writer.add(fetched(entry_id, work.id, "Dune", popularity=12.1))
+    entry = stored(entry_id)
+    assert (writer.written, writer.unchanged) == (0, 1)
+    assert (entry.time_updated, entry.data["popularity"]) == (ancient, 9.5)
+    assert entry.time_fetched != ancient
+
+    with EntryWriter() as writer:
+        writer.add(fetched(entry_id, work.id, "Dune: Part One", popularity=12.1))
+    entry = stored(entry_id)
+    assert (writer.written, writer.unchanged) == (1, 0)
+    assert (entry.title, entry.data["popularity"]) == ("Dune: Part One", 12.1)
+    assert entry.time_updated != ancient
+
+
+def test_writer_touch_only_writes_time_fetched(database_user: User) -> None:
+    work = Film(id=uuid.uuid4(), user_id=database_user.id)
+    work.entries.append(TmdbMovie(id=str(uuid.uuid4()), title="Dune", data={}))
+    db.session.add(work)
+    db.session.commit()
+    entry_id = work.entries[0].id
+    age(entry_id)
+
+    with EntryWriter() as writer:
+        writer.touch("tmdb.movie", entry_id)
+    entry = stored(entry_id)
+
+    assert (writer.written, writer.unchanged) == (0, 1)
+    assert entry.time_updated == ancient
+    assert entry.time_fetched != ancient
@@ -0,0 +1,47 @@
+import asyncio
+import dataclasses
+
+import flask
+import pytest
+
+from vancelle.clients.client import HttpClientPool
+from vancelle.controllers.source import SourceController
+from vancelle.lib.pagination import Pagination
+
+
+@dataclasses.dataclass()
+class FakeSource:
+    name: str
+    delay: float
+    error: Exception | None = None
+
+    def polymorphic_identity(self) -> str:
+        return self.name
+
+    async def search_async(self, query: str, pool: HttpClientPool) -> Pagination[str]:
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return Pagination.from_sequence([f"{self.name}: {query}"])
+
+
+def test_federated_search_yields_results_as_sources_answer(app: flask.Flask, monkeypatch: pytest.MonkeyPatch) -> None:
+    sources = {
+        "slow": FakeSource("slow", delay=0.2),
+        "broken": FakeSource("broken", delay=0.0, error=RuntimeError("broken")),
+        "fast": FakeSource("fast", delay=0.1),
+        "stuck": FakeSource("stuck", delay=10.0),
+    }
+    monkeypatch.setattr(SourceController, "mapping", sources)
+
+    with app.test_request_context():
+        results = list(SourceController().federated_search(query="query", timeout=0.5))
+
+    assert [result.source.name for result in results] == ["broken", "fast", "slow", "stuck"]
+    assert [result.error for result in results] == ["Search failed.", None, None, "No answer within 0.5 seconds."]
+    assert results[1].items.items == ["fast: query"]
+
+
+def test_federated_search_without_query(app: flask.Flask) -> None:
+    with app.test_request_context():
+        assert list(SourceController().federated_search(query="")) == []
@@ -0,0 +1,71 @@
+import datetime
+import uuid
+
+import flask
+import pytest
+import sqlalchemy.exc
+
+from vancelle.controllers.job import JobController, Task
+from vancelle.extensions import db
+from vancelle.models import Job, User
+
+task = Task(kind="example", title="Example", function=lambda job, progress: None)
+ancient = datetime.datetime(2000, 1, 1)
+
+
+def reload(job: Job) -> Job:
+    return db.session.execute(
+        sqlalchemy.select(Job).filter_by(id=job.id).execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def test_enqueue_deduplicates_queued_jobs(database_user: User) -> None:
+    controller = JobController()
+    job = controller.enqueue(task, user=database_user, data={"works": [1, 2]})
+
+    assert controller.enqueue(task, user=database_user, data={"works": [1, 2]}).id == job.id
+    assert controller.enqueue(task, user=database_user, data={"works": [3]}).id != job.id
+
+
+def test_status_pages_do_not_load_arguments(database_user: User) -> None:
+    controller = JobController()
+    job = controller.enqueue(task, user=database_user, data="a large backup")
+    db.session.expunge_all()
+
+    with pytest.raises(sqlalchemy.exc.InvalidRequestError):
+        _ = controller.get_or_404(job.id, user=database_user).arguments
+    with pytest.raises(sqlalchemy.exc.InvalidRequestError):
+        _ = controller.recent(user=database_user)[0].arguments
+
+
+def test_claim_marks_oldest_job_running(database_user: User) -> None:
+    older = Job(id=uuid.uuid4(), kind="example", title="Older", user_id=database_user.id, time_created=ancient)
+    newer = Job(id=uuid.uuid4(), kind="example", title="Newer", user_id=database_user.id)
+    db.session.add_all([older, newer])
+    db.session.commit()
+
+    claimed = JobController().claim()
+
+    assert claimed is not None and claimed.id == older.id
+    assert (claimed.status, claimed.attempts) == ("running", 1)
+    assert reload(newer).status == "queued"
+
+
+def test_claim_gives_up_on_abandoned_jobs(database: flask.Flask, database_user: User) -> None:
+    attempts = database.config["JOB_MAX_ATTEMPTS"]
+    abandoned = Job(
+        id=uuid.uuid4(),
+        kind="example",
+        title="Abandoned",
+        user_id=database_user.id,
+        status="running",
+        attempts=attempts,
+        time_created=ancient,
+        time_started=ancient,
+    )
+    db.session.add(abandoned)
+    db.session.commit()
+
+    # Nothing else can be claimed, which must not undo giving up on the abandoned job.
+    assert JobController().claim() is None
+    assert reload(abandoned).status == "failed"
@@ -0,0 +1,61 @@
+import datetime
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.release import ReleaseController
+from vancelle.extensions import db
+from vancelle.models import User, Work, WorkDetails
+from vancelle.models.entry import TmdbMovie
+from vancelle.models.work import Film
+from vancelle.shelf import Shelf
+
+today = datetime.date.today()
+now = datetime.datetime.now()
+
+
+def film(user: User, shelf: Shelf, release_date: datetime.date | None = None) -> Film:
+    return Film(id=uuid.uuid4(), user_id=user.id, shelf=shelf, release_date=release_date)
+
+
+def test_unreleased_entries_are_due_by_release_date(database_user: User) -> None:
+    soon = film(database_user, Shelf.UNRELEASED, today + datetime.timedelta(days=10))
+    soon.entries.append(TmdbMovie(id=str(uuid.uuid4()), time_fetched=now - datetime.timedelta(days=2), data={}))
+    later = film(database_user, Shelf.UNRELEASED, today + datetime.timedelta(days=200))
+    later.entries.append(TmdbMovie(id=str(uuid.uuid4()), time_fetched=now - datetime.timedelta(days=2), data={}))
+    unfetched = film(database_user, Shelf.UNRELEASED)
+    unfetched.entries.append(TmdbMovie(id=str(uuid.uuid4()), data={}))
+    shelved = film(database_user, Shelf.PLAYING)
+    shelved.entries.append(TmdbMovie(id=str(uuid.uuid4()), data={}))
+    db.session.add_all([soon, later, unfetched, shelved])
+    db.session.commit()
+
+    controller = ReleaseController()
+    unreleased = controller.unreleased_entries(user=database_user)
+
+    assert [entry.entry.work_id for entry in unreleased] == [unfetched.id, soon.id, later.id]
+    assert [entry.work_id for entry in controller.due_entries(user=database_user)] == [unfetched.id, soon.id]
+
+
+def test_shelve_released_moves_released_works(database_user: User) -> None:
+    released = film(database_user, Shelf.UNRELEASED, today - datetime.timedelta(days=1))
+    undetailed = film(database_user, Shelf.UNRELEASED, today)
+    unreleased = film(database_user, Shelf.UNRELEASED, today + datetime.timedelta(days=1))
+    undated = film(database_user, Shelf.UNRELEASED)
+    db.session.add_all([released, undetailed, unreleased, undated])
+    db.session.commit()
+
+    # Works that haven't had their details stored yet use their own release date.
+    db.session.execute(sqlalchemy.delete(WorkDetails).filter_by(work_id=undetailed.id))
+    db.session.commit()
+
+    assert ReleaseController().shelve_released(user=database_user) == 2
+
+    statement = sqlalchemy.select(Work.id, Work.shelf).filter(Work.user_id == database_user.id)
+    shelves = dict(db.session.execute(statement).tuples().all())
+    assert shelves == {
+        released.id: Shelf.UNSORTED,
+        undetailed.id: Shelf.UNSORTED,
+        unreleased.id: Shelf.UNRELEASED,
+        undated.id: Shelf.UNRELEASED,
+    }
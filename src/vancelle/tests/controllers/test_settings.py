@@ -0,0 +1,41 @@
+import json
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.settings import UserSettingsController
+from vancelle.extensions import db
+from vancelle.models import Record, User, Work, WorkDetails
+from vancelle.models.entry import Entry, TmdbMovie
+from vancelle.models.work import Book, Film
+
+
+def test_import_json_upserts_works(database_user: User) -> None:
+    film = Film(id=uuid.uuid4(), user_id=database_user.id, title="Dune", tags=set())
+    film.records.append(Record(id=uuid.uuid4(), notes="Seen"))
+    film.entries.append(TmdbMovie(id=str(uuid.uuid4()), title="Dune (TMDB)", data={}))
+    db.session.add(film)
+    db.session.commit()
+
+    controller = UserSettingsController()
+    backup = json.loads(controller.export_json(database_user))
+
+    # Changes since the backup are overwritten, and works only in the backup are created.
+    db.session.execute(sqlalchemy.update(Work).filter_by(id=film.id).values(title="Changed"))
+    db.session.execute(sqlalchemy.update(Entry).filter_by(work_id=film.id).values(title="Changed"))
+    db.session.commit()
+    book = {**backup["works"][0], "id": str(uuid.uuid4()), "type": "book", "title": "Book", "records": [], "entries": []}
+    backup["works"].append(book)
+
+    assert controller.import_json(json.dumps(backup), user=database_user, chunk_size=1) == 2
+
+    works = db.session.execute(sqlalchemy.select(Work).filter_by(user_id=database_user.id)).scalars().all()
+    assert {(type(work), work.title) for work in works} == {(Film, "Dune"), (Book, "Book")}
+    statement = sqlalchemy.select(Entry.title).filter_by(work_id=film.id)
+    assert db.session.execute(statement).scalars().all() == ["Dune (TMDB)"]
+    statement = sqlalchemy.select(Record.notes).filter_by(work_id=film.id)
+    assert db.session.execute(statement).scalars().all() == ["Seen"]
+
+    # Works are written without the ORM, so their stored details are refreshed for them.
+    statement = sqlalchemy.select(WorkDetails.title).filter(WorkDetails.work_id.in_([film.id, uuid.UUID(book["id"])]))
+    assert sorted(db.session.execute(statement).scalars()) == ["Book", "Dune"]
@@ -0,0 +1,72 @@
+import datetime
+import uuid
+
+import pytest
+import sqlalchemy
+
+from vancelle.clients.cache import NotModified, Validators
+from vancelle.controllers.source import RefreshResult, SourceController
+from vancelle.extensions import db
+from vancelle.models import User
+from vancelle.models.entry import Entry, TmdbMovie
+from vancelle.models.work import Film
+
+ancient = datetime.datetime(2000, 1, 1)
+
+
+@pytest.fixture()
+def film(database_user: User) -> Film:
+    work = Film(id=uuid.uuid4(), user_id=database_user.id)
+    for title in ("changed", "unmodified", "failed", "moved"):
+        work.entries.append(TmdbMovie(id=f"{work.id}-{title}", title=title, time_fetched=ancient, data={}))
+    db.session.add(work)
+    db.session.commit()
+    return work
+
+
+def fetch(*, entry_type: str, entry_id: str, validators: Validators = Validators()) -> Entry:
+    if entry_id.endswith("-unmodified"):
+        raise NotModified(entry_id)
+    if entry_id.endswith("-failed"):
+        raise RuntimeError("Source is unavailable")
+    if entry_id.endswith("-moved"):
+        return TmdbMovie(id="elsewhere", data={})
+
+    entry = TmdbMovie(id=entry_id, title="Refreshed", time_fetched=datetime.datetime.now(), data={})
+    entry.content_hash = entry.hash_content()
+    return entry
+
+
+def test_refresh_many(film: Film, database_user: User, monkeypatch: pytest.MonkeyPatch) -> None:
+    controller = SourceController()
+    monkeypatch.setattr(controller, "fetch", fetch)
+    stale = controller.stale_entries(older_than=datetime.timedelta(days=1), user=database_user)
+    assert len(stale) == 4
+
+    results = sorted(controller.refresh_many(stale, chunk_size=2), key=lambda result: result.entry_id)
+
+    assert results == [
+        RefreshResult("tmdb.movie", f"{film.id}-changed"),
+        RefreshResult("tmdb.movie", f"{film.id}-failed", error="Source is unavailable"),
+        RefreshResult("tmdb.movie", f"{film.id}-moved", error="Source returned entry 'elsewhere'"),
+        RefreshResult("tmdb.movie", f"{film.id}-unmodified"),
+    ]
+
+    statement = sqlalchemy.select(Entry.id, Entry.title, Entry.time_fetched != ancient).filter(Entry.work_id == film.id)
+    entries = {
+        entry_id.removeprefix(f"{film.id}-"): (title, fetched) for entry_id, title, fetched in db.session.execute(statement)
+    }
+    assert entries == {
+        "changed": ("Refreshed", True),
+        "unmodified": ("unmodified", True),
+        "failed": ("failed", False),
+        "moved": ("moved", False),
+    }
+
+    # Failed entries are still stale, so they're retried the next time.
+    assert {
+        entry.entry_id for entry in controller.stale_entries(older_than=datetime.timedelta(days=1), user=database_user)
+    } == {
+        f"{film.id}-failed",
+        f"{film.id}-moved",
+    }
@@ -0,0 +1,29 @@
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.sources import SteamApplicationSource
+from vancelle.extensions import db
+from vancelle.models import User, WorkDetails
+from vancelle.models.entry import SteamApplication
+from vancelle.models.work import Game
+
+CAPSULE = "https://cdn.cloudflare.steamstatic.com/steam/apps/10/library_600x900_2x.jpg"
+
+
+def test_forget_cover_clears_stored_entries(database_user: User) -> None:
+    work = Game(id=uuid.uuid4(), user_id=database_user.id)
+    work.entries.append(SteamApplication(id=str(uuid.uuid4()), cover=CAPSULE, data={}))
+    db.session.add(work)
+    db.session.commit()
+    version = database_user.data_version
+
+    SteamApplicationSource.forget_cover(CAPSULE)
+
+    details = db.session.execute(
+        sqlalchemy.select(WorkDetails).filter_by(work_id=work.id).execution_options(populate_existing=True)
+    ).scalar_one()
+    assert work.entries[0].cover is None
+    assert details.cover_type is None
+    db.session.refresh(database_user)
+    assert database_user.data_version == version + 1
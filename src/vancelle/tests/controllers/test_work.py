@@ -0,0 +1,35 @@
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.work import WorkController
+from vancelle.extensions import db
+from vancelle.models import User, WorkDetails
+from vancelle.models.entry import TmdbMovie
+from vancelle.models.work import Book, Work
+
+
+def stored_tags(work: Work) -> set[str]:
+    details = db.session.execute(
+        sqlalchemy.select(WorkDetails).filter_by(work_id=work.id).execution_options(populate_existing=True)
+    ).scalar_one()
+    return set(details.tags or ())
+
+
+def test_bulk_tag_updates_stored_details(database_user: User) -> None:
+    tagged = Book(id=uuid.uuid4(), user_id=database_user.id, tags={"owned"})
+    untagged = Book(id=uuid.uuid4(), user_id=database_user.id)
+    untagged.entries.append(TmdbMovie(id=str(uuid.uuid4()), tags={"from-entry"}, data={}))
+    db.session.add_all([tagged, untagged])
+    db.session.commit()
+    assert (stored_tags(tagged), stored_tags(untagged)) == ({"owned"}, {"from-entry"})
+
+    controller = WorkController()
+    where = Work.id.in_([tagged.id, untagged.id])
+
+    assert controller.bulk_tag(where, add={"read"}, remove={"owned"}, user=database_user) == 2
+    assert (stored_tags(tagged), stored_tags(untagged)) == ({"read"}, {"read"})
+
+    # Works left without tags take them from their entries again.
+    assert controller.bulk_tag(where, remove={"read"}, user=database_user) == 2
+    assert (stored_tags(tagged), stored_tags(untagged)) == (set(), {"from-entry"})
@@ -0,0 +1,65 @@
+import typing
+import uuid
+
+import flask
+import flask_login
+import pytest
+import werkzeug.datastructures
+from sqlalchemy.dialects import postgresql
+
+from vancelle.exceptions import ApplicationError
+from vancelle.forms.work import WorkBulkForm, WorkIndexArgs
+from vancelle.models import User
+
+
+@pytest.fixture()
+def request_context(app: flask.Flask) -> typing.Iterator[None]:
+    app.config["SECRET_KEY"] = "example"
+    app.config["WTF_CSRF_ENABLED"] = False
+    with app.test_request_context():
+        flask_login.login_user(User(id=uuid.uuid4(), username="example", password=""))
+        yield
+
+
+def bulk_form(**data: typing.Any) -> WorkBulkForm:
+    return WorkBulkForm(formdata=werkzeug.datastructures.MultiDict(data))
+
+
+def compile_postgresql(where: typing.Any) -> str:
+    return str(where.compile(dialect=postgresql.dialect()))
+
+
+def test_split_tags() -> None:
+    assert WorkBulkForm.split_tags(" read, owned ,,read ") == {"read", "owned"}
+    assert WorkBulkForm.split_tags(None) == set()
+
+
+@pytest.mark.usefixtures("request_context")
+def test_where_selected() -> None:
+    work_ids = [uuid.uuid4(), uuid.uuid4()]
+    form = bulk_form(action="delete", scope="selected", work_id=[str(work_id) for work_id in work_ids])
+    assert form.validate(), form.errors
+    assert form.work_id.data == work_ids
+
+    where = compile_postgresql(form.where(WorkIndexArgs(formdata=werkzeug.datastructures.MultiDict())))
+    assert "work.id IN" in where
+    assert "work.user_id" not in where
+
+
+@pytest.mark.usefixtures("request_context")
+def test_where_selected_requires_works() -> None:
+    form = bulk_form(action="delete", scope="selected")
+    assert form.validate(), form.errors
+
+    with pytest.raises(ApplicationError):
+        form.where(WorkIndexArgs(formdata=werkzeug.datastructures.MultiDict()))
+
+
+@pytest.mark.usefixtures("request_context")
+def test_where_filter() -> None:
+    form = bulk_form(action="restore", scope="filter")
+    assert form.validate(), form.errors
+
+    where = compile_postgresql(form.where(WorkIndexArgs(formdata=werkzeug.datastructures.MultiDict({"shelf": "playing"}))))
+    assert "work.user_id" in where
+    assert "work.shelf" in where
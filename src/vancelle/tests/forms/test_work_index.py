@@ -0,0 +1,119 @@
+import datetime
+import itertools
+import typing
+import uuid
+
+import flask
+import flask_login
+import pytest
+import sqlalchemy
+import werkzeug.datastructures
+from sqlalchemy.dialects import postgresql
+
+from vancelle.extensions import db
+from vancelle.forms.work import WorkIndexArgs
+from vancelle.models import Record, User
+from vancelle.models.entry import Entry, GoodreadsPrivateBook, ImportedWork, TmdbMovie
+from vancelle.models.work import Book, Film, Work
+from vancelle.shelf import Shelf
+
+FILTERS = {
+    "work_type": ["any", "book"],
+    "shelf": ["any", "playing"],
+    "case": ["any", "upcoming"],
+    "deleted": ["no", "any", "yes"],
+    "has_entry_type": ["any", "goodreads.book", "tmdb.movie"],
+    "has_entries": ["any", "yes", "external", "imported", "no"],
+    "search": ["", "sand"],
+}
+
+MATRIX = [dict(zip(FILTERS, values)) for values in itertools.product(*FILTERS.values())]
+
+
+def legacy_statement(args: WorkIndexArgs) -> sqlalchemy.Select[tuple[uuid.UUID]]:
+    """The statement WorkIndexArgs used before filters on entries were planned as EXISTS subqueries."""
+    entry_type = args.has_entry_type.data
+    return (
+        sqlalchemy.select(Work.id)
+        .distinct()
+        .filter(Work.user_id == flask_login.current_user.id)
+        .filter(args._filter_work_type(args.work_type.data))
+        .filter(args._filter_shelf(args.shelf.data))
+        .filter(args._filter_case(args.case.data))
+        .filter(args._filter_deleted(args.deleted.data))
+        .filter(args._filter_has_entries(args.has_entries.data))
+        .filter(sqlalchemy.true() if entry_type == "any" else Entry.type == entry_type)
+        .filter(args._filter_search(args.search.data))
+        .join(Record, isouter=True)
+        .join(Entry, isouter=True)
+    )
+
+
+@pytest.fixture()
+def user() -> User:
+    return User(id=uuid.uuid4(), username="example", password="")
+
+
+@pytest.fixture()
+def request_context(app: flask.Flask, user: User) -> typing.Iterator[None]:
+    app.config["SECRET_KEY"] = "example"
+    with app.test_request_context():
+        flask_login.login_user(user)
+        yield
+
+
+def compile_postgresql(statement: sqlalchemy.Select) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.usefixtures("request_context")
+def test_statement_has_no_joins() -> None:
+    for filters in MATRIX:
+        args = WorkIndexArgs(formdata=werkzeug.datastructures.MultiDict(filters))
+        assert args.validate(), args.errors
+
+        for statement in (args._statement(), args._count_statement()):
+            sql = compile_postgresql(statement)
+            assert "JOIN" not in sql, filters
+            assert "DISTINCT" not in sql, filters
+
+
+@pytest.fixture()
+def database_request_context(database: flask.Flask, database_user: User) -> typing.Iterator[None]:
+    """A request by a user with works on a migrated PostgreSQL database."""
+    db.session.add_all(works(database_user))
+    db.session.commit()
+    with database.test_request_context():
+        flask_login.login_user(database_user)
+        yield
+
+
+def works(user: User) -> typing.Iterable[Work]:
+    shelves = [Shelf.PLAYING, Shelf.UPCOMING, Shelf.COMPLETED]
+    for i in range(24):
+        work = (Book if i % 2 else Film)(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            shelf=shelves[i % len(shelves)],
+            time_deleted=datetime.datetime.now() if i % 5 == 0 else None,
+        )
+        if i % 3 == 0:
+            work.entries.append(GoodreadsPrivateBook(id=f"{user.id}-{i}", title=f"Sand {i}", data={}))
+        if i % 4 == 0:
+            work.entries.append(TmdbMovie(id=f"{user.id}-{i}", title=f"Film {i}", data={}))
+        if i % 7 == 0:
+            work.entries.append(ImportedWork(id=f"{user.id}-{i}", title=f"Sand {i}", data={}))
+        for _ in range(i % 3):
+            work.records.append(Record(id=uuid.uuid4()))
+        yield work
+
+
+@pytest.mark.usefixtures("database_request_context")
+def test_statement_matches_legacy() -> None:
+    for filters in MATRIX:
+        args = WorkIndexArgs(formdata=werkzeug.datastructures.MultiDict(filters))
+        assert args.validate(), args.errors
+
+        expected = set(db.session.execute(legacy_statement(args)).scalars())
+        assert {work.id for work in db.session.execute(args._statement()).scalars()} == expected, filters
+        assert db.session.execute(args._count_statement()).scalar_one() == len(expected), filters
@@ -0,0 +1,14 @@
+import flask
+
+from vancelle.forms.work import WorkBulkForm
+from vancelle.html.vancelle.pages.work import WorkBulkFormGroup
+from vancelle.lib.heavymetal import render
+
+
+def test_bulk_form_renders_hidden_csrf_token(app: flask.Flask):
+    app.config["SECRET_KEY"] = "example"
+    with app.test_request_context():
+        html = render(WorkBulkFormGroup(WorkBulkForm()))
+
+    assert 'id="csrf_token" name="csrf_token" type="hidden"' in html
+    assert 'for="csrf_token"' not in html
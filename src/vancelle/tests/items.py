@@ -0,0 +1,33 @@
+"""
+A throwaway model for testing helpers that work with any mapped class, without a PostgreSQL database.
+"""
+
+import datetime
+import typing
+import uuid
+
+import sqlalchemy
+import sqlalchemy.orm
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "item"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(default="")
+    time_updated: Mapped[datetime.datetime | None] = mapped_column(default=None)
+
+
+def sqlite_engine(items: typing.Iterable[Item] = ()) -> sqlalchemy.Engine:
+    """An in-memory SQLite database with the item table, holding some items."""
+    engine = sqlalchemy.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sqlalchemy.orm.Session(engine) as session:
+        session.add_all(items)
+        session.commit()
+    return engine
@@ -0,0 +1,16 @@
+import pytest
+import sqlalchemy
+import sqlalchemy.orm
+
+from vancelle.models import Entry, Record, UserCount, Work, WorkDetails
+
+
+@pytest.mark.parametrize("column", [Work.user_id, Record.work_id, Entry.work_id, WorkDetails.work_id, UserCount.user_id])
+def test_foreign_keys_cascade(column: sqlalchemy.orm.InstrumentedAttribute) -> None:
+    (foreign_key,) = column.property.columns[0].foreign_keys
+    assert foreign_key.ondelete.lower() == "cascade"
+
+
+@pytest.mark.parametrize("relationship", [Work.records, Work.entries, Work.details])
+def test_relationships_delete_passively(relationship: sqlalchemy.orm.InstrumentedAttribute) -> None:
+    assert relationship.property.passive_deletes is True
@@ -0,0 +1,35 @@
+import typing
+
+import pytest
+import sqlalchemy
+import sqlalchemy.dialects.postgresql
+import sqlalchemy.orm
+
+from vancelle.models import Entry, Record, Work, WorkDetails
+from vancelle.models import loaders
+
+
+@pytest.mark.parametrize(
+    "relationship",
+    [Work.user, Work.records, Work.entries, Work.details, WorkDetails.work, Entry.work, Record.work],
+)
+def test_relationships_raise(relationship: sqlalchemy.orm.QueryableAttribute) -> None:
+    assert relationship.property.lazy == "raise"
+
+
+@pytest.mark.parametrize(
+    ("entity", "profile"),
+    [
+        (Work, loaders.work_list),
+        (Work, loaders.work_detail),
+        (Work, loaders.work_export),
+        (Entry, loaders.entry_row),
+        (Entry, loaders.entry_detail),
+        (Record, loaders.record_detail),
+    ],
+)
+def test_profiles_apply(entity: type[typing.Any], profile: typing.Callable[..., loaders.Profile]) -> None:
+    alias = sqlalchemy.orm.aliased(entity, sqlalchemy.select(entity).subquery())
+    for target in (entity, alias):
+        statement = sqlalchemy.select(target).options(*profile(target))
+        statement.compile(dialect=sqlalchemy.dialects.postgresql.dialect())
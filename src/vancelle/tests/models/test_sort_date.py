@@ -0,0 +1,42 @@
+import datetime
+import uuid
+
+import sqlalchemy
+
+from vancelle.extensions import db
+from vancelle.models import Record, User, Work
+from vancelle.models.entry import Entry, TmdbMovie
+from vancelle.models.work import Film
+
+
+def sort_dates(*works: Work) -> list[datetime.date | None]:
+    statement = sqlalchemy.select(Work.id, Work.sort_date).filter(Work.id.in_([work.id for work in works]))
+    dates = dict(db.session.execute(statement).tuples().all())
+    return [dates[work.id] for work in works]
+
+
+def test_sort_date_follows_batched_writes(database_user: User) -> None:
+    a = Film(id=uuid.uuid4(), user_id=database_user.id, release_date=datetime.date(2001, 1, 1))
+    b = Film(id=uuid.uuid4(), user_id=database_user.id, release_date=datetime.date(2002, 1, 1))
+    db.session.add_all([a, b])
+    db.session.commit()
+    assert sort_dates(a, b) == [datetime.date(2001, 1, 1), datetime.date(2002, 1, 1)]
+
+    # Entries and records for several works, each written with one statement.
+    entries = [
+        {"type": "tmdb.movie", "id": f"{a.id}-{i}", "work_id": a.id, "release_date": datetime.date(2010 + i, 1, 1)}
+        for i in range(3)
+    ]
+    db.session.execute(sqlalchemy.insert(TmdbMovie), entries)
+    records = [{"id": uuid.uuid4(), "work_id": b.id, "date_started": datetime.date(2020, 1, i)} for i in range(1, 4)]
+    db.session.execute(sqlalchemy.insert(Record), records)
+    assert sort_dates(a, b) == [datetime.date(2012, 1, 1), datetime.date(2020, 1, 3)]
+
+    # Moving an entry updates both works, and unrelated changes leave them alone.
+    statement = sqlalchemy.update(Entry).filter_by(id=f"{a.id}-2").values(work_id=b.id, release_date=datetime.date(2030, 1, 1))
+    db.session.execute(statement)
+    db.session.execute(sqlalchemy.update(Record).filter_by(work_id=b.id).values(date_started=None))
+    assert sort_dates(a, b) == [datetime.date(2011, 1, 1), datetime.date(2030, 1, 1)]
+
+    db.session.execute(sqlalchemy.delete(Entry).filter(Entry.work_id.in_([a.id, b.id])))
+    assert sort_dates(a, b) == [datetime.date(2001, 1, 1), datetime.date(2002, 1, 1)]
@@ -0,0 +1,43 @@
+import uuid
+
+import sqlalchemy
+
+from vancelle.controllers.user import UserController
+from vancelle.extensions import db
+from vancelle.models import User, UserCount, Work
+from vancelle.models.entry import Entry, TmdbMovie
+from vancelle.models.work import Book, Film
+from vancelle.shelf import Shelf
+
+
+def counts(user: User) -> set[tuple[str, str, int]]:
+    statement = sqlalchemy.select(UserCount.category, UserCount.key, UserCount.count).filter_by(user_id=user.id)
+    return set(db.session.execute(statement).tuples().all())
+
+
+def rebuilt_counts(user: User) -> set[tuple[str, str, int]]:
+    UserController().refresh_counts(user.id)
+    return counts(user)
+
+
+def test_user_count_follows_writes(database_user: User) -> None:
+    a = Film(id=uuid.uuid4(), user_id=database_user.id, shelf=Shelf.PLAYING)
+    b = Book(id=uuid.uuid4(), user_id=database_user.id, shelf=Shelf.PLAYING)
+    db.session.add_all([a, b])
+    db.session.flush()
+    assert counts(database_user) == {("work_type", "film", 1), ("work_type", "book", 1), ("shelf", "playing", 2)}
+
+    entries = [{"type": "tmdb.movie", "id": f"{a.id}-{i}", "work_id": a.id} for i in range(3)]
+    db.session.execute(sqlalchemy.insert(TmdbMovie), entries)
+    a.shelf = Shelf.COMPLETED
+    db.session.flush()
+    assert ("entry_type", "tmdb.movie", 3) in counts(database_user)
+    assert ("shelf", "playing", 1) in counts(database_user)
+    assert counts(database_user) == rebuilt_counts(database_user)
+
+    # Moving an entry between works, deleting one, and deleting a work with its entries.
+    db.session.execute(sqlalchemy.update(Entry).filter_by(id=f"{a.id}-0").values(work_id=b.id))
+    db.session.execute(sqlalchemy.delete(Entry).filter_by(id=f"{a.id}-1"))
+    db.session.execute(sqlalchemy.delete(Work).filter_by(id=a.id))
+    assert counts(database_user) == {("work_type", "book", 1), ("shelf", "playing", 1), ("entry_type", "tmdb.movie", 1)}
+    assert counts(database_user) == rebuilt_counts(database_user)
@@ -0,0 +1,33 @@
+import datetime
+import uuid
+
+import flask
+
+from vancelle.models.entry import GoodreadsPrivateBook, TmdbMovie
+from vancelle.models.work import Book
+
+
+def test_refresh_details_matches_resolve_details(app: flask.Flask) -> None:
+    work = Book(id=uuid.uuid4(), author="Work Author", tags=set())
+    work.entries.append(GoodreadsPrivateBook(id="1", title="Goodreads", cover="https://example.invalid/1.jpg"))
+    work.entries.append(TmdbMovie(id="2", title="TMDB", release_date=datetime.date(2000, 1, 1), background="https://x"))
+    work.entries.append(TmdbMovie(id="3", title="Deleted", time_deleted=datetime.datetime.now()))
+
+    with app.test_request_context():
+        work.refresh_details()
+        resolved, stored = work.resolve_details(), work.stored_details()
+
+    assert (stored.title, stored.author, stored.release_date) == (resolved.title, resolved.author, resolved.release_date)
+    assert (stored.cover, stored.background) == (resolved.cover, resolved.background)
+    assert work.count_entries() == 3
+
+
+def test_refresh_details_excludes_entries() -> None:
+    work = Book(id=uuid.uuid4())
+    entry = TmdbMovie(id="1", title="Removed")
+    work.entries.append(entry)
+
+    details = work.refresh_details(exclude={entry})
+
+    assert details.title is None
+    assert details.entry_count == 0
@@ -3,24 +3,14 @@ import pathlib
 import uuid
 
 from vancelle.models import User
-from vancelle.models.entry import GoodreadsPrivateBook
-from vancelle.models.record import Record
 from vancelle.shelf import Shelf
 from vancelle.clients.goodreads.csv import GoodreadsCsvImporter
 
 
-class MockGoodreadsCsvImporter(GoodreadsCsvImporter):
-    def get_entry(self, entry_id: str) -> GoodreadsPrivateBook | None:
-        return None
-
-    def get_record(self, record_id: uuid.UUID) -> Record | None:
-        return None
-
-
 class TestGoodreadsCsvImporter:
     def test_load(self, fixtures: pathlib.Path):
         path = fixtures / "goodreads-1.csv"
-        importer = MockGoodreadsCsvImporter(
+        importer = GoodreadsCsvImporter(
             shelf_mapping={"read": Shelf.COMPLETED},
             user=User(id=uuid.uuid4(), username="example", password=""),
         )
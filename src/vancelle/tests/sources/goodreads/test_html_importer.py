@@ -5,20 +5,10 @@ import uuid
 import pytest
 
 from vancelle.models import User
-from vancelle.models.entry import GoodreadsPrivateBook
-from vancelle.models.record import Record
 from vancelle.shelf import Shelf
 from vancelle.clients.goodreads.html import GoodreadsHtmlImporter
 
 
-class MockGoodreadsHtmlImporter(GoodreadsHtmlImporter):
-    def get_entry(self, entry_id: str) -> GoodreadsPrivateBook | None:
-        return None
-
-    def get_record(self, record_id: uuid.UUID) -> Record | None:
-        return None
-
-
 @pytest.mark.parametrize(
     "d",
     [
@@ -31,12 +21,12 @@ class MockGoodreadsHtmlImporter(GoodreadsHtmlImporter):
     ],
 )
 def test_parse_date(d: str):
-    assert MockGoodreadsHtmlImporter.parse_date(d)
+    assert GoodreadsHtmlImporter.parse_date(d)
 
 
 def test_html_import_tr(fixtures: pathlib.Path):
     path = fixtures / "goodreads-1.html"
-    importer = MockGoodreadsHtmlImporter(
+    importer = GoodreadsHtmlImporter(
         shelf_mapping={"read": Shelf.COMPLETED},
         user=User(id=uuid.uuid4(), username="example", password=""),
     )
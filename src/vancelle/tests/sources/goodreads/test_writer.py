@@ -0,0 +1,78 @@
+import datetime
+import typing
+import uuid
+
+import sqlalchemy
+
+from vancelle.clients.goodreads.common import GoodreadsImporter, GoodreadsWriter
+from vancelle.extensions import db
+from vancelle.models import Record, User, Work
+from vancelle.models.entry import GoodreadsPrivateBook
+from vancelle.models.work import Book
+from vancelle.shelf import Shelf
+
+
+def book(importer: GoodreadsImporter, entry_id: str, **values: typing.Any) -> GoodreadsPrivateBook:
+    defaults: dict[str, typing.Any] = {
+        "title": "",
+        "author": "",
+        "release_date": None,
+        "cover": None,
+        "shelf": Shelf.COMPLETED,
+        "tags": set(),
+        "date_started": None,
+        "date_stopped": None,
+        "isbn13": None,
+        "data": {},
+    }
+    return importer._build_book(entry_id=entry_id, **{**defaults, **values})
+
+
+def stored(entry_id: str) -> GoodreadsPrivateBook:
+    statement = sqlalchemy.select(GoodreadsPrivateBook).filter_by(id=entry_id)
+    return db.session.execute(statement.execution_options(populate_existing=True)).scalar_one()
+
+
+def test_writer_merges_into_earlier_imports(database_user: User) -> None:
+    importer = GoodreadsImporter(shelf_mapping={}, user=database_user)
+    entry_id = str(uuid.uuid4())
+
+    with GoodreadsWriter() as writer:
+        writer.add(
+            book(
+                importer,
+                entry_id,
+                title="Leviathan Wakes",
+                cover="https://example.invalid/cover.jpg",
+                date_started=datetime.date(2024, 1, 1),
+                data={"a": 1},
+            )
+        )
+    imported = stored(entry_id)
+    assert imported.work_id == importer.reproducible_uuid(entry_id)
+
+    # The book was moved to another work since it was imported.
+    moved = Book(id=uuid.uuid4(), user_id=database_user.id)
+    db.session.add(moved)
+    db.session.flush()
+    db.session.execute(sqlalchemy.update(GoodreadsPrivateBook).filter_by(id=entry_id).values(work_id=moved.id))
+    db.session.commit()
+
+    with GoodreadsWriter() as writer:
+        writer.add(
+            book(
+                importer, entry_id, title="Leviathan Wakes (Expanse, #1)", date_stopped=datetime.date(2024, 2, 1), data={"b": 2}
+            )
+        )
+    merged = stored(entry_id)
+
+    assert merged.work_id == moved.id
+    assert merged.title == "Leviathan Wakes (Expanse, #1)"
+    assert merged.cover == "https://example.invalid/cover.jpg"
+    assert merged.data == {"a": 1, "b": 2}
+
+    record = db.session.execute(sqlalchemy.select(Record).filter_by(id=importer.reproducible_uuid(entry_id))).scalar_one()
+    assert (record.date_started, record.date_stopped) == (datetime.date(2024, 1, 1), datetime.date(2024, 2, 1))
+
+    statement = sqlalchemy.select(sqlalchemy.func.count()).select_from(Work).filter_by(user_id=database_user.id)
+    assert db.session.execute(statement).scalar_one() == 2